@@ -0,0 +1,97 @@
+"""
+Per-request cost of ID-token verification: verifying the JWT every time (what
+`verify_id_token` did on each request) vs TokenVerifier serving it from its
+cache, using LocalKeyTokenBackend (RS256 with a local key, no network).
+
+Also checks that concurrent first requests for one token run one verification,
+that revocation is only checked when enabled, and that a revoked token is then
+rejected once its revocation check comes due; the script exits with status 1
+otherwise.
+
+    python -m benchmarks.bench_auth_tokens --requests 20000
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.security import LocalKeyTokenBackend, TokenVerifier
+
+
+class SlowBackend(LocalKeyTokenBackend):
+    """Adds a fixed delay per verification, like a certificate fetch on a cold instance."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def verify(self, id_token, check_revoked=False):
+        time.sleep(self.delay)
+        return super().verify(id_token, check_revoked)
+
+
+class CountingRevocations(LocalKeyTokenBackend):
+    """Counts the verifications that asked for a revocation check (a Firebase round trip)."""
+
+    def __init__(self):
+        super().__init__()
+        self.revocation_checks = 0
+
+    def verify(self, id_token, check_revoked=False):
+        self.revocation_checks += check_revoked
+        return super().verify(id_token, check_revoked)
+
+
+def per_request_us(verify, tokens: list[str], requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        verify(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=50, help="Distinct tokens in rotation")
+    args = parser.parse_args()
+
+    backend = LocalKeyTokenBackend()
+    tokens = [backend.issue(f"user-{i}", email=f"user{i}@example.com") for i in range(args.users)]
+    verifier = TokenVerifier(backend)
+
+    direct = per_request_us(lambda token: backend.verify(token), tokens, args.requests)
+    cached = per_request_us(verifier.verify, tokens, args.requests)
+    print(f"{args.requests} requests over {args.users} tokens:")
+    print(f"  verify every request : {direct:8.1f} us/request")
+    print(f"  TokenVerifier        : {cached:8.1f} us/request  {verifier.stats()}")
+
+    slow = SlowBackend(delay=0.05)
+    shared = TokenVerifier(slow, revocation_check_seconds=0)
+    token = slow.issue("cold-user")
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        uids = set(pool.map(lambda _: shared.verify(token)["uid"], range(32)))
+    single_flight = slow.verifications == 1 and uids == {"cold-user"}
+    print(f"  32 concurrent first requests: {slow.verifications} verification(s)")
+
+    counting = CountingRevocations()
+    TokenVerifier(counting, check_revoked=False).verify(counting.issue("plain-user"))
+    default_skips_revocation = counting.revocation_checks == 0
+    print(f"  revocation checks with check_revoked off: {counting.revocation_checks}")
+
+    revoking = TokenVerifier(backend, check_revoked=True, revocation_check_seconds=0.2)
+    revoked_token = backend.issue("revoked-user")
+    revoking.verify(revoked_token)
+    backend.revoke("revoked-user")
+    revoking.verify(revoked_token)  # still inside the revocation window
+    time.sleep(0.25)
+    try:
+        revoking.verify(revoked_token)
+        revoked_rejected = False
+    except ValueError:
+        revoked_rejected = True
+    print(f"  revoked token rejected after the check interval: {revoked_rejected}")
+
+    if not (single_flight and default_skips_revocation and revoked_rejected):
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,53 @@
+"""
+Chat time-to-first-token: the buffered `generate` call behind /chat vs the
+`stream_generate` call behind /chat/stream, against the fake Gemini server.
+
+    python -m benchmarks.bench_chat_stream --latency 2.0 --runs 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.fake_gemini import start_fake_gemini
+from core.llm import GeminiClient
+
+
+async def buffered(client: GeminiClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    await client.generate("Explain this loan agreement.")
+    total = time.perf_counter() - start
+    return total, total  # nothing is shown until the whole answer is back
+
+
+async def streamed(client: GeminiClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    async for _ in client.stream_generate("Explain this loan agreement."):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def run(base_url: str, runs: int) -> None:
+    client = GeminiClient(api_key="fake", base_url=base_url)
+    for name, fn in (("/chat (buffered)", buffered), ("/chat/stream", streamed)):
+        samples = [await fn(client) for _ in range(runs)]
+        ttft = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        print(f"  {name:18s} time to first token {ttft * 1000:7.0f}ms, total {total * 1000:7.0f}ms")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=2.0, help="Fake generation time in seconds")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_gemini(latency=args.latency)
+    try:
+        print(f"{args.latency}s simulated generation, median of {args.runs} runs")
+        asyncio.run(run(base_url, args.runs))
+    finally:
+        server.shutdown()
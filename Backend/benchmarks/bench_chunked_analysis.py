@@ -0,0 +1,74 @@
+"""
+Long-document analysis latency: one whole-document prompt vs the chunked
+map-reduce used by analyze_content, as the document grows. The fake Gemini
+server charges a per-character cost so long prompts are slower, as they are
+on the real model.
+
+    python -m benchmarks.bench_chunked_analysis --sizes 20 80 320 --latency 0.5 --per-kchar 0.01
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.bench_redaction import synthetic_contract
+from benchmarks.fake_gemini import start_fake_gemini
+from core.chunking import map_reduce, split_into_chunks
+from core.config import ANALYSIS_CHUNK_TOKENS, ANALYSIS_MAP_CONCURRENCY
+from core.llm import GeminiClient
+
+JSON_MODE = {"response_mime_type": "application/json"}
+
+
+def numbered_contract(size_bytes: int) -> str:
+    """Synthetic contract text laid out as numbered clauses, one per line."""
+    sentences = synthetic_contract(size_bytes).split(".\n")
+    return "\n".join(f"{number}. {sentence.strip()}." for number, sentence in enumerate(sentences, 1))
+
+
+async def whole_document(client: GeminiClient, text: str) -> dict:
+    return json.loads(await client.generate(f"Analyze this document:\n{text}", generation_config=JSON_MODE))
+
+
+async def chunked(client: GeminiClient, text: str, chunk_tokens: int, concurrency: int) -> dict:
+    chunks = split_into_chunks(text, chunk_tokens)
+
+    async def analyze_chunk(index: int, chunk: str) -> dict:
+        return json.loads(await client.generate(f"Analyze part {index + 1}:\n{chunk}", generation_config=JSON_MODE))
+
+    async def combine(reports: list[dict]) -> dict:
+        return json.loads(await client.generate(f"Combine:\n{json.dumps(reports)}", generation_config=JSON_MODE))
+
+    return await map_reduce(chunks, analyze_chunk, combine, concurrency)
+
+
+async def run(base_url: str, sizes: list[int], chunk_tokens: int, concurrency: int) -> None:
+    client = GeminiClient(api_key="fake", base_url=base_url)
+    print(f"chunk size {chunk_tokens} tokens, map concurrency {concurrency}")
+    for kb in sizes:
+        text = numbered_contract(kb * 1000)
+        start = time.perf_counter()
+        await whole_document(client, text)
+        single = time.perf_counter() - start
+        start = time.perf_counter()
+        await chunked(client, text, chunk_tokens, concurrency)
+        mapped = time.perf_counter() - start
+        chunks = len(split_into_chunks(text, chunk_tokens))
+        print(f"  {kb:5d} KB: whole prompt {single:6.2f}s | map-reduce {mapped:6.2f}s ({chunks} chunks)")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 80, 320], help="Document sizes in KB")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--per-kchar", type=float, default=0.01, help="Fake prefill cost, seconds per 1000 chars")
+    parser.add_argument("--chunk-tokens", type=int, default=ANALYSIS_CHUNK_TOKENS)
+    parser.add_argument("--concurrency", type=int, default=ANALYSIS_MAP_CONCURRENCY)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_gemini(latency=args.latency, latency_per_kchar=args.per_kchar)
+    try:
+        asyncio.run(run(base_url, args.sizes, args.chunk_tokens, args.concurrency))
+    finally:
+        server.shutdown()
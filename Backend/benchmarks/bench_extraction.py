@@ -0,0 +1,64 @@
+"""
+PDF text-extraction throughput of every backend registered in
+core/extraction.py, on Loan_Agreement.pdf and a generated many-page contract
+(or the PDFs given with --files). Reports pages and MB per second and how
+closely each backend's words match PyMuPDF's, then the cost of
+/documents/analyze extracting once vs twice (pdfplumber for the report plus
+PyPDF2 for the legacy summaries, as before).
+
+    python -m benchmarks.bench_extraction --pages 200 --repeat 3
+    python -m benchmarks.bench_extraction --files contracts/*.pdf
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_redaction import synthetic_contract
+from benchmarks.suite import LOAN_AGREEMENT, corpus_pdf
+from core.extraction import PDF, extraction
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def word_overlap(text: str, reference: str) -> float:
+    words, ref = set(text.split()), set(reference.split())
+    return len(words & ref) / len(words | ref) if words | ref else 1.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", nargs="*", help="PDFs to measure (default: Loan_Agreement.pdf and a generated contract)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the generated contract")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-extraction-") as workdir:
+        files = args.files
+        if not files:
+            generated = os.path.join(workdir, f"contract_{args.pages}p.pdf")
+            corpus_pdf(generated, synthetic_contract(args.pages * 3 * 1024), args.pages)
+            files = [LOAN_AGREEMENT, generated]
+
+        for path in files:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            reference = extraction.extract(path, PDF, "pymupdf")
+            print(f"{os.path.basename(path)}: {reference.units} pages, {size_mb:.2f} MB")
+            timings = {}
+            for backend in extraction.backends(PDF):
+                result = extraction.extract(path, PDF, backend)
+                timings[backend] = elapsed = best_time(lambda: extraction.extract(path, PDF, backend), args.repeat)
+                print(
+                    f"  {backend:11s}: {elapsed * 1000:9.1f} ms  {result.units / elapsed:8.1f} pages/s  "
+                    f"{size_mb / elapsed:7.2f} MB/s  {len(result.text):9d} chars  words vs pymupdf {word_overlap(result.text, reference.text):.2f}"
+                )
+            twice = timings["pdfplumber"] + timings["pypdf2"]
+            once = timings[extraction.backends(PDF)[0]]
+            print(f"  /documents/analyze extraction: before {twice * 1000:.1f} ms (pdfplumber + PyPDF2), now {once * 1000:.1f} ms (once, pymupdf)")
@@ -0,0 +1,71 @@
+"""
+Storage traffic for repeat files: the previous direct uploads (twice per
+/documents/analyze, once per /chat attachment) vs ContentStore, against an
+in-memory fake GCS with per-request latency and a fixed upload bandwidth.
+
+Each file is analyzed once and then attached to `--chats` chat messages;
+a second ContentStore then re-uploads everything to show a fresh instance
+(another Cloud Run container) only pays the existence checks.
+
+    python -m benchmarks.bench_gcs_dedup --files 5 --size-kb 2048 --chats 4
+"""
+import argparse
+import os
+import time
+
+from benchmarks.fake_storage import FakeStorageClient
+from core.clients import clients
+from core.gcs import ContentStore
+
+BUCKET = "bench-bucket"
+USER = "bench-user"
+
+
+def legacy_upload(client: FakeStorageClient, filename: str, data: bytes):
+    # What upload_file_to_gcs did in docs and chat: always send the bytes to docs/{uid}/{filename}
+    client.bucket(BUCKET).blob(f"docs/{USER}/{filename}").upload_from_string(data, content_type="application/pdf")
+
+
+def run(upload, files: dict[str, bytes], chats: int) -> float:
+    start = time.perf_counter()
+    for filename, data in files.items():
+        upload(filename, data)  # /documents/analyze, router
+        upload(filename, data)  # /documents/analyze, process_document
+        for _ in range(chats):
+            upload(filename, data)  # /chat with the same attachment
+    return time.perf_counter() - start
+
+
+def report(label: str, client: FakeStorageClient, elapsed: float):
+    print(f"  {label:24s}: {elapsed:6.2f}s, {client.requests:4d} requests, {client.bytes_uploaded / 1024 / 1024:8.1f} MB uploaded")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--chats", type=int, default=4, help="Chat messages re-attaching each file")
+    parser.add_argument("--latency", type=float, default=0.03, help="Fake GCS round trip in seconds")
+    args = parser.parse_args()
+
+    files = {f"contract_{i}.pdf": os.urandom(args.size_kb * 1024) for i in range(args.files)}
+    print(f"{args.files} files x {args.size_kb}KB, analyzed once and attached to {args.chats} chats each")
+
+    before = FakeStorageClient(latency=args.latency)
+    elapsed = run(lambda name, data: legacy_upload(before, name, data), files, args.chats)
+    report("direct uploads", before, elapsed)
+
+    after = FakeStorageClient(latency=args.latency)
+    clients.override("storage", after)
+    store = ContentStore(BUCKET)
+    elapsed = run(lambda name, data: store.put(USER, name, data, "application/pdf"), files, args.chats)
+    report("ContentStore", after, elapsed)
+
+    requests, uploaded = after.requests, after.bytes_uploaded
+    cold = ContentStore(BUCKET)
+    start = time.perf_counter()
+    for filename, data in files.items():
+        cold.put(USER, filename, data, "application/pdf")
+    elapsed = time.perf_counter() - start
+    print(f"  {'fresh instance, repeats':24s}: {elapsed:6.2f}s, {after.requests - requests:4d} requests, {(after.bytes_uploaded - uploaded) / 1024 / 1024:8.1f} MB uploaded")
+    print(f"  store stats: {store.stats()}")
@@ -0,0 +1,109 @@
+"""
+Cold-start budget: time `import main` in fresh interpreters and fail when the
+median is over STARTUP_IMPORT_BUDGET_MS, or when importing built a Google
+client or pulled in a library that should only load with its first request.
+
+    python -m benchmarks.bench_import_time --runs 5
+    python -m benchmarks.bench_import_time --budget-ms 800 --top 15
+
+Exits with status 1 when the budget is exceeded, so it can gate a build.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from core.config import STARTUP_IMPORT_BUDGET_MS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported by the routes that use them, never at startup
+LAZY_MODULES = [
+    "google.cloud.storage",
+    "google.cloud.translate_v2",
+    "google.cloud.vision",
+    "firebase_admin",
+    "fitz",
+    "pdfplumber",
+    "PyPDF2",
+    "docx",
+    "reportlab",
+]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+from core.clients import clients
+print(json.dumps({{
+    "ms": elapsed,
+    "clients": sorted(clients.loaded()),
+    "modules": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe_env() -> dict:
+    env = dict(os.environ)
+    # Startup checks only look for the key; nothing is sent anywhere
+    env.setdefault("GEMINI_API_KEY", "import-time-benchmark")
+    env.setdefault("JOB_STORE_BACKEND", "memory")
+    return env
+
+
+def import_once() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=probe_env(), capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"`import main` failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[tuple[int, str]]:
+    """Cumulative microseconds of the slowest modules, from `python -X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=probe_env(), capture_output=True, text=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    runs = [import_once() for _ in range(args.runs)]
+    timings = [run["ms"] for run in runs]
+    median = statistics.median(timings)
+    print(f"import main: median {median:.0f}ms, min {min(timings):.0f}ms, max {max(timings):.0f}ms over {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+
+    if args.top:
+        for cumulative, name in slowest_imports(args.top):
+            print(f"  {cumulative / 1000:8.1f}ms {name}")
+
+    problems = []
+    if median > args.budget_ms:
+        problems.append(f"median {median:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+    if runs[0]["clients"]:
+        problems.append(f"clients built at import: {', '.join(runs[0]['clients'])}")
+    if runs[0]["modules"]:
+        problems.append(f"imported eagerly: {', '.join(runs[0]['modules'])}")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK")
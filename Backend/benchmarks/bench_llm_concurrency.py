@@ -0,0 +1,61 @@
+"""
+Concurrency benchmark: blocking `requests.post` vs the shared async Gemini client.
+
+Simulates N requests arriving together on one uvicorn worker. The old
+`call_gemini` blocks the event loop, so requests are served one after another;
+the pooled async client overlaps the round trips.
+
+    python -m benchmarks.bench_llm_concurrency --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from benchmarks.fake_gemini import start_fake_gemini
+from core.llm import GeminiClient
+
+
+async def blocking_endpoint(base_url: str) -> str:
+    # Mirrors the previous call_gemini: new connection, blocks the loop
+    response = requests.post(
+        f"{base_url}/models/gemini-1.5-flash:generateContent?key=fake",
+        headers={"Content-Type": "application/json"},
+        json={"contents": [{"parts": [{"text": "Summarize"}]}]},
+    )
+    return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+
+
+async def async_endpoint(client: GeminiClient) -> str:
+    return await client.generate("Summarize")
+
+
+async def run(n: int, base_url: str) -> dict:
+    start = time.perf_counter()
+    await asyncio.gather(*(blocking_endpoint(base_url) for _ in range(n)))
+    blocking = time.perf_counter() - start
+
+    client = GeminiClient(api_key="fake", base_url=base_url)
+    start = time.perf_counter()
+    await asyncio.gather(*(async_endpoint(client) for _ in range(n)))
+    pooled = time.perf_counter() - start
+    await client.aclose()
+
+    return {"blocking_s": blocking, "async_s": pooled}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_gemini(latency=args.latency)
+    result = asyncio.run(run(args.requests, base_url))
+    server.shutdown()
+
+    print(f"{args.requests} concurrent requests, {args.latency}s simulated LLM latency")
+    print(f"  blocking requests.post : {result['blocking_s']:.2f}s")
+    print(f"  async pooled client    : {result['async_s']:.2f}s")
+    print(f"  speedup                : {result['blocking_s'] / result['async_s']:.1f}x")
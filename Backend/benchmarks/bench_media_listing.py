@@ -0,0 +1,89 @@
+"""
+Latency of GET /docs/{user_id} as a user's history grows: the previous
+bucket walk (every blob under docs/{user_id}/, a URL built per blob) vs one
+page from the per-user file index, both uncached and from the TTL cache.
+
+The bucket is an in-memory fake GCS (one round trip per 1000 listed blobs);
+the index is InMemoryFileIndex behind one simulated Firestore round trip per
+page query. Index latency must not grow with the number of files; the script
+exits with status 1 if the largest user's page takes over twice the smallest's.
+
+    python -m benchmarks.bench_media_listing --files 100 1000 5000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.fake_storage import FakeStorageClient
+from core.clients import clients
+from core.file_index import FileIndex, InMemoryFileIndex
+from core.gcs import ContentStore, GCSBackend
+
+BUCKET = "bench-bucket"
+
+
+class RoundTripIndex(InMemoryFileIndex):
+    """InMemoryFileIndex whose page queries cost one network round trip, like Firestore's."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def page(self, user_id, page_size, after):
+        time.sleep(self.latency)
+        return super().page(user_id, page_size, after)
+
+
+def legacy_list(store: ContentStore, user_id: str) -> list[dict]:
+    # What list_user_docs did: walk the whole prefix on every call
+    blobs = clients.storage().bucket(BUCKET).list_blobs(prefix=f"docs/{user_id}/")
+    return [{"filename": blob.name.split("/")[-1], "gcs_url": store.url_for(blob)} for blob in blobs if not blob.name.endswith("/")]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 1000, 5000], help="Files per user")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.03, help="Fake GCS / Firestore round trip in seconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fake = FakeStorageClient(latency=0, bytes_per_second=float("inf"))
+    clients.override("storage", fake)
+    index = FileIndex(RoundTripIndex(latency=0), ttl=30)
+    store = ContentStore(BUCKET, backend=GCSBackend(BUCKET), index=index)
+
+    for count in args.files:
+        for i in range(count):
+            store.put(f"user-{count}", f"doc_{i:05d}.pdf", f"{count}-{i}".encode(), "application/pdf")
+    fake.latency = index.store.latency = args.latency
+
+    print(f"page size {args.page_size}, {args.latency * 1000:.0f}ms round trip, median of {args.repeat}")
+    uncached = {}
+    for count in args.files:
+        user = f"user-{count}"
+
+        def index_uncached():
+            index.cache.invalidate(user)
+            index.list(user, args.page_size)
+
+        walk_ms = timed(lambda: legacy_list(store, user), args.repeat)
+        uncached[count] = timed(index_uncached, args.repeat)
+        cached_ms = timed(lambda: index.list(user, args.page_size), args.repeat)
+        print(f"  {count:6d} files: bucket walk {walk_ms:8.1f} ms | index page {uncached[count]:6.1f} ms | cached {cached_ms:6.3f} ms")
+
+    smallest, largest = uncached[min(args.files)], uncached[max(args.files)]
+    if largest > 2 * smallest:
+        print(f"FAIL: index page latency grew from {smallest:.1f}ms to {largest:.1f}ms")
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,63 @@
+"""
+Cost of the pipeline instrumentation in core/metrics.py: what one
+instrumented request adds (an @instrumented entry point with four stages and
+the byte/page counters, as in verify_document) and how long a /metrics scrape
+takes to render. Fails if a request pays more than --limit-us.
+
+    python -m benchmarks.bench_metrics_overhead --requests 100000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from core.metrics import BYTES_IN, OCR_PAGES, instrumented, registry, stage
+
+STAGES = ("ocr", "redaction", "upload", "analysis")
+
+
+async def bare(pages: int):
+    for _ in STAGES:
+        pass
+
+
+@instrumented("bench")
+async def measured(pages: int):
+    BYTES_IN.inc("bench", amount=1024)
+    for name in STAGES:
+        with stage("bench", name):
+            pass
+    for _ in range(pages):
+        OCR_PAGES.inc("text_layer")
+
+
+async def per_request_us(fn, requests: int, pages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await fn(pages)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--pages", type=int, default=3, help="OCR pages counted per request")
+    parser.add_argument("--limit-us", type=float, default=50)
+    args = parser.parse_args()
+
+    baseline = asyncio.run(per_request_us(bare, args.requests, args.pages))
+    instrumented_us = asyncio.run(per_request_us(measured, args.requests, args.pages))
+    overhead = instrumented_us - baseline
+
+    start = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.requests} requests, {len(STAGES)} stages and {args.pages} pages each:")
+    print(f"  uninstrumented : {baseline:6.2f} us/request")
+    print(f"  instrumented   : {instrumented_us:6.2f} us/request (+{overhead:.2f} us)")
+    print(f"  /metrics render: {render_ms:6.2f} ms, {len(text.splitlines())} lines")
+    if overhead > args.limit_us:
+        print(f"FAIL: instrumentation adds more than {args.limit_us}us per request")
+        sys.exit(1)
+    print("OK")
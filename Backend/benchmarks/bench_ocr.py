@@ -0,0 +1,78 @@
+"""
+OCR pipeline benchmark: the previous page-at-a-time loop vs OcrPipeline,
+both against FakeVisionClient.
+
+    python -m benchmarks.bench_ocr --pages 30 --latency 0.3
+"""
+import argparse
+import asyncio
+import time
+
+import fitz  # PyMuPDF
+from google.cloud import vision
+
+from benchmarks.fake_vision import FakeVisionClient
+from features.verify.ocr import OcrPipeline
+
+
+def synthetic_pdf(pages: int, scanned: bool = True) -> bytes:
+    """Contract pages with a text layer, or (scanned=True) the same pages flattened to images."""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"LOAN AGREEMENT - page {number + 1}", fontsize=14)
+        page.insert_text((72, 110), "The Borrower shall repay the Loan with interest at the agreed rate.", fontsize=11)
+    if scanned:
+        flat = fitz.open()
+        for page in doc:
+            image = flat.new_page(width=page.rect.width, height=page.rect.height)
+            image.insert_image(image.rect, pixmap=page.get_pixmap())
+        doc.close()
+        doc = flat
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def sequential_ocr(client, content: bytes) -> str:
+    # The loop _extract_text_from_document used before the pipeline
+    full_text = []
+    pdf_document = fitz.open(stream=content, filetype="pdf")
+    for page_num in range(len(pdf_document)):
+        pix = pdf_document.load_page(page_num).get_pixmap()
+        response = client.text_detection(image=vision.Image(content=pix.tobytes("png")))
+        if response.full_text_annotation:
+            full_text.append(response.full_text_annotation.text)
+    return "\n".join(full_text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--text-layer", action="store_true", help="Digitally-born pages instead of scans")
+    args = parser.parse_args()
+
+    content = synthetic_pdf(args.pages, scanned=not args.text_layer)
+
+    client = FakeVisionClient(latency=args.latency)
+    start = time.perf_counter()
+    sequential_ocr(client, content)
+    sequential = time.perf_counter() - start
+    sequential_calls = client.calls
+
+    client = FakeVisionClient(latency=args.latency)
+    pipeline = OcrPipeline(client, max_concurrency=args.concurrency, batch_size=args.batch_size)
+    pipeline.workers.start(preload=("features.verify.ocr",), wait=True)  # as at server startup
+    start = time.perf_counter()
+    pages = asyncio.run(pipeline.extract_pdf(content))
+    concurrent = time.perf_counter() - start
+    assert [page.page_number for page in pages] == list(range(1, args.pages + 1))
+
+    print(f"{args.pages}-page PDF, {args.latency}s simulated Vision latency")
+    print(f"  sequential text_detection : {sequential:6.2f}s ({sequential_calls} calls)")
+    print(f"  OcrPipeline (batched)     : {concurrent:6.2f}s ({client.calls} calls)")
+    print(f"  page sources              : {sorted(set(page.source for page in pages))}")
+    print(f"  speedup                   : {sequential / concurrent:.1f}x")
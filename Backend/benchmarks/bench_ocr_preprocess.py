@@ -0,0 +1,72 @@
+"""
+OCR preprocessing benchmark on the sample Loan_Agreement.pdf.
+
+Compares the previous rendering (default 72 DPI RGB PNG) with the
+preprocessing variants: bytes per page always, and with --live the OCR
+accuracy against the PDF's own text layer (needs Vision credentials).
+
+    python -m benchmarks.bench_ocr_preprocess
+    python -m benchmarks.bench_ocr_preprocess --live
+"""
+import argparse
+import difflib
+import os
+import time
+
+import fitz  # PyMuPDF
+
+from features.verify.preprocess import OcrImageOptions, render_page_for_ocr
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Loan_Agreement.pdf")
+
+VARIANTS = {
+    "grayscale png, adaptive dpi": OcrImageOptions(image_format="png"),
+    "grayscale jpeg q85, adaptive dpi": OcrImageOptions(image_format="jpeg"),
+    "grayscale png, 1 MP budget": OcrImageOptions(image_format="png", target_pixels=1_000_000),
+}
+
+
+def baseline_render(page) -> bytes:
+    return page.get_pixmap().tobytes("png")
+
+
+def word_accuracy(expected: str, actual: str) -> float:
+    return difflib.SequenceMatcher(None, expected.split(), actual.split(), autojunk=False).ratio()
+
+
+def ocr_text(client, image: bytes) -> str:
+    from google.cloud import vision
+
+    response = client.text_detection(image=vision.Image(content=image))
+    return response.full_text_annotation.text if response.full_text_annotation else ""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", default=SAMPLE_PDF)
+    parser.add_argument("--live", action="store_true", help="OCR with the real Vision API and score accuracy")
+    args = parser.parse_args()
+
+    client = None
+    if args.live:
+        from google.cloud import vision
+
+        client = vision.ImageAnnotatorClient()
+
+    doc = fitz.open(args.pdf)
+    truth = [page.get_text("text") for page in doc]
+    renderers = {"baseline 72 dpi rgb png": baseline_render}
+    renderers.update({name: (lambda page, o=options: render_page_for_ocr(page, o)) for name, options in VARIANTS.items()})
+
+    print(f"{os.path.basename(args.pdf)}: {len(doc)} pages")
+    for name, render in renderers.items():
+        start = time.perf_counter()
+        images = [render(page) for page in doc]
+        elapsed = time.perf_counter() - start
+        line = f"  {name:34s} bytes/page={[len(image) for image in images]} render={elapsed * 1000:.0f}ms"
+        if client is not None:
+            scores = [word_accuracy(expected, ocr_text(client, image)) for expected, image in zip(truth, images)]
+            line += f" accuracy={sum(scores) / len(scores):.3f}"
+        print(line)
+    if client is None:
+        print("  (run with --live and Vision credentials to score OCR accuracy)")
@@ -0,0 +1,79 @@
+"""
+Verification redaction: the previous whole-document Gemini prompt vs
+HybridRedactor, both against the fake Gemini server. Reports latency and
+the prompt characters sent (a proxy for LLM tokens).
+
+    python -m benchmarks.bench_pii_redaction --kb 40 --latency 1.0
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_redaction import synthetic_contract
+from benchmarks.fake_gemini import start_fake_gemini
+from core.llm import GeminiClient
+from features.verify.pii import HybridRedactor
+
+PARTIES = (
+    "This Agreement is made between Mr. Rahul Sharma (Borrower) and Apex Finance Ltd (Lender).\n"
+    "Address: Flat 12B, MG Road, Bengaluru 560001. DOB: 01/02/1990.\n"
+    "Witness: Priya Nair.\n"
+)
+
+
+class CountingClient(GeminiClient):
+    """GeminiClient that records how many prompt characters it sends."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+        self.prompt_chars = 0
+
+    async def generate(self, contents, generation_config=None, model=None):
+        self.calls += 1
+        self.prompt_chars += len(contents) if isinstance(contents, str) else 0
+        return await super().generate(contents, generation_config, model)
+
+
+async def legacy_redact(client: GeminiClient, text: str) -> str:
+    # Same shape as the prompt `_redact_sensitive_info` used to send: the whole document
+    prompt = f"You are a data privacy expert. Redact the sensitive information.\n---\n{text}\n---"
+    return await client.generate(prompt)
+
+
+async def run(base_url: str, text: str) -> None:
+    legacy = CountingClient(api_key="fake", base_url=base_url)
+    start = time.perf_counter()
+    await legacy_redact(legacy, text)
+    legacy_time = time.perf_counter() - start
+
+    hybrid = CountingClient(api_key="fake", base_url=base_url)
+    redactor = HybridRedactor(hybrid)
+    start = time.perf_counter()
+    result = await redactor.redact(text)
+    hybrid_time = time.perf_counter() - start
+
+    local = HybridRedactor(None)
+    start = time.perf_counter()
+    local.sensitive.redact(text)
+    local_time = time.perf_counter() - start
+
+    print(f"{len(text) / 1000:.0f} KB document, {len(result.spans)} spans redacted")
+    print(f"  whole-text LLM redaction : {legacy_time * 1000:7.0f}ms, {legacy.calls} call(s), {legacy.prompt_chars:8d} prompt chars")
+    print(f"  HybridRedactor           : {hybrid_time * 1000:7.0f}ms, {hybrid.calls} call(s), {hybrid.prompt_chars:8d} prompt chars")
+    print(f"  local detectors only     : {local_time * 1000:7.1f}ms")
+    await legacy.aclose()
+    await hybrid.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kb", type=float, default=40)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake Gemini latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_gemini(latency=args.latency)
+    try:
+        asyncio.run(run(base_url, PARTIES + synthetic_contract(int(args.kb * 1000))))
+    finally:
+        server.shutdown()
@@ -0,0 +1,139 @@
+"""
+Verification PDF throughput per ReportLanguage: the previous
+`generate_pdf_report` (re-parses the language's TTF files and rebuilds the
+stylesheet on every call) vs ReportTemplate with the lazy FontRegistry.
+
+The Noto/Poppins fonts are not checked in, so by default every family is
+stood in by ReportLab's bundled Vera TTFs; pass --fonts-dir to use real ones.
+
+    python -m benchmarks.bench_report_pdf --reports 30
+    python -m benchmarks.bench_report_pdf --fonts-dir features/verify/fonts
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO
+
+import reportlab
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Paragraph
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from features.verify.report import LANGUAGE_FONT_MAP, FontRegistry, ReportTemplate, font_files
+from features.verify.schemas import LANGUAGE_CODE_MAP, ReportLanguage, VerificationReport, VerificationStatus
+
+
+def stand_in_fonts() -> str:
+    """A fonts tree with the expected layout, every family backed by Vera."""
+    root = tempfile.mkdtemp(prefix="report-fonts-")
+    vera_dir = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+    for family in set(LANGUAGE_FONT_MAP.values()):
+        regular, bold = font_files(family, root)
+        os.makedirs(os.path.dirname(regular), exist_ok=True)
+        shutil.copy(os.path.join(vera_dir, "Vera.ttf"), regular)
+        shutil.copy(os.path.join(vera_dir, "VeraBd.ttf"), bold)
+    return root
+
+
+def legacy_generate_pdf_report(report_data: VerificationReport, fonts_dir: str) -> BytesIO:
+    # The per-call registration, stylesheet and drawing `generate_pdf_report` used before
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    report_font = LANGUAGE_FONT_MAP.get(report_data.report_language, 'Poppins')
+    header_font = 'Poppins'
+    if report_font != 'Poppins':
+        regular_font, bold_font = font_files(report_font, fonts_dir)
+        pdfmetrics.registerFont(TTFont(report_font, regular_font))
+        pdfmetrics.registerFont(TTFont(f'{report_font}-Bold', bold_font))
+        pdfmetrics.registerFontFamily(report_font, normal=report_font, bold=f'{report_font}-Bold')
+    styles = getSampleStyleSheet()
+    style_body = ParagraphStyle('BodyText', parent=styles['BodyText'], fontName=report_font, leading=14)
+    c.setFont(f"{header_font}-Bold", 16)
+    c.drawString(inch, height - inch, "Document Verification Report")
+    c.line(inch, height - inch - 5, width - inch, height - inch - 5)
+    report_items = [
+        ("Filename:", report_data.filename),
+        ("Storage URL:", report_data.storage_url or "N/A"),
+        ("Source Language:", report_data.detected_language.upper()),
+        ("Report Language:", report_data.report_language.upper()),
+        ("Verification Status:", str(report_data.verification_status)),
+        ("Confidence Score:", f"{report_data.confidence_score}%"),
+        ("Summary:", report_data.summary)
+    ]
+    text_y = height - 1.75 * inch
+    for label, value in report_items:
+        c.setFont(f"{header_font}-Bold", 11)
+        c.drawString(inch, text_y, label)
+        p = Paragraph(str(value), style_body)
+        p_width, p_height = p.wrapOn(c, width - 3.7 * inch, height)
+        p.drawOn(c, inch + 1.7 * inch, text_y - (p_height / 2) + 2)
+        text_y -= (p_height + 0.25 * inch)
+    c.setFont(f"{header_font}-Bold", 11)
+    c.drawString(inch, text_y, "Analysis Details:")
+    text_y -= 0.25 * inch
+    p_details = Paragraph(report_data.analysis_details.replace('\n', '<br/>'), style_body)
+    p_width_details, p_height_details = p_details.wrapOn(c, width - 2 * inch, height)
+    p_details.drawOn(c, inch, text_y - p_height_details)
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+def legacy_import_registration(fonts_dir: str):
+    # What importing features/verify/service.py used to do for all ten languages
+    for font_family in LANGUAGE_FONT_MAP.values():
+        regular_font, bold_font = font_files(font_family, fonts_dir)
+        pdfmetrics.registerFont(TTFont(font_family, regular_font))
+        pdfmetrics.registerFont(TTFont(f'{font_family}-Bold', bold_font))
+        pdfmetrics.registerFontFamily(font_family, normal=font_family, bold=f'{font_family}-Bold')
+
+
+def sample_report(language_code: str) -> VerificationReport:
+    return VerificationReport(
+        filename="Loan_Agreement.pdf",
+        storage_url="https://storage.googleapis.com/bucket/docs/user/Loan_Agreement.pdf.txt",
+        detected_language="en",
+        report_language=language_code,
+        verification_status=VerificationStatus.VERIFIED,
+        confidence_score=87,
+        summary="The document is consistent with a standard loan agreement between the named parties.",
+        analysis_details="\n".join(f"- Finding {i}: dates, amounts and parties are consistent across clauses." for i in range(12)),
+        extracted_text="...",
+    )
+
+
+def reports_per_second(render, report: VerificationReport, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        render(report)
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=30, help="Reports per language and variant")
+    parser.add_argument("--fonts-dir", default=None)
+    args = parser.parse_args()
+
+    fonts_dir = args.fonts_dir or stand_in_fonts()
+
+    start = time.perf_counter()
+    legacy_import_registration(fonts_dir)
+    startup = time.perf_counter() - start
+    print(f"previous import-time registration of all families: {startup * 1000:.0f}ms (now: 0ms, fonts load on first use)")
+
+    template = ReportTemplate(FontRegistry(fonts_dir))
+    print(f"{'language':10s} {'previous':>12s} {'template':>12s}")
+    for language in ReportLanguage:
+        report = sample_report(LANGUAGE_CODE_MAP[language.value])
+        before = reports_per_second(lambda r: legacy_generate_pdf_report(r, fonts_dir), report, args.reports)
+        after = reports_per_second(template.render, report, args.reports)
+        print(f"{language.value:10s} {before:9.1f}/s {after:9.1f}/s  ({after / before:.1f}x)")
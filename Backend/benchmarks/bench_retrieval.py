@@ -0,0 +1,76 @@
+"""
+Chat retrieval (core/retrieval.py): prompt size with the whole document
+pasted in vs the top-k retrieved passages, for documents of growing size,
+plus indexing throughput, search latency, reload time from disk and whether
+a planted clause is found across several earlier uploads.
+
+    python -m benchmarks.bench_retrieval --sizes-kb 50 500 5000 --docs 20
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_redaction import synthetic_contract
+from core.chunking import estimate_tokens
+from core.retrieval import RetrievalIndex
+from features.chat.service import build_chat_contents
+
+# Made of the synthetic contracts' own words, so every query walks long postings lists
+QUESTION = "What interest rate must the Borrower repay on the Loan after an Event of Default?"
+NEEDLE = "The late payment penalty is two and a half percent per month on the overdue instalment.\n"
+NEEDLE_QUESTION = "What is the penalty for late payment?"
+
+
+def prompt_tokens(contents: list) -> int:
+    return sum(estimate_tokens(part) for part in contents if isinstance(part, str))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[50, 500, 5000], help="Document sizes to compare")
+    parser.add_argument("--docs", type=int, default=20, help="Earlier uploads in the corpus for the search test")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-retrieval-")
+    try:
+        index = RetrievalIndex(directory)
+        print("prompt tokens per chat turn:")
+        for size_kb in args.sizes_kb:
+            text = synthetic_contract(size_kb * 1024, seed=size_kb)
+            start = time.perf_counter()
+            index.add("size-test", f"contract_{size_kb}kb.pdf", text)
+            indexed_s = time.perf_counter() - start
+            full = prompt_tokens(build_chat_contents(QUESTION, document_text=text))
+            retrieved = prompt_tokens(build_chat_contents(QUESTION, passages=index.search("size-test", QUESTION)))
+            print(
+                f"  {size_kb:6d} KB document: whole document {full:9d}  retrieved {retrieved:5d}  "
+                f"(indexed at {size_kb / 1024 / indexed_s:5.1f} MB/s)"
+            )
+
+        # The answer is in one earlier upload among --docs; no file is attached to the question
+        for number in range(args.docs):
+            text = synthetic_contract(200 * 1024, seed=1000 + number)
+            if number == args.docs // 2:
+                middle = len(text) // 2
+                text = text[:middle] + "\n" + NEEDLE + text[middle:]
+            index.add("corpus", f"upload_{number}.pdf", text)
+        latencies = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            passages = index.search("corpus", QUESTION)
+            latencies.append((time.perf_counter() - start) * 1000)
+        hits = index.search("corpus", NEEDLE_QUESTION)
+        found = next((rank for rank, passage in enumerate(hits, 1) if NEEDLE.strip() in passage.text), None)
+        print(f"corpus of {args.docs} x 200 KB uploads:")
+        print(f"  search          : median {statistics.median(latencies):.2f} ms, max {max(latencies):.2f} ms")
+        print(f"  planted clause  : {f'rank {found} in {hits[found - 1].filename}' if found else 'NOT FOUND'}")
+
+        start = time.perf_counter()
+        reloaded = RetrievalIndex(directory)
+        assert reloaded.search("corpus", QUESTION)[0].text == passages[0].text
+        print(f"  reload from disk: {(time.perf_counter() - start) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(directory)
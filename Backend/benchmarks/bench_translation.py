@@ -0,0 +1,63 @@
+"""
+Chat translation cost: one whole-answer Translate request per answer (the
+previous `translate_text`) vs SegmentTranslator, over a run of chat answers
+that share disclaimers and boilerplate paragraphs.
+
+    python -m benchmarks.bench_translation --answers 50 --language hi
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fake_translate import FakeTranslateClient
+from core.translation import SegmentTranslator
+
+BOILERPLATE = [
+    "Please note that this is general information and not legal advice.",
+    "For decisions about your specific situation, consult a qualified lawyer.",
+    "I hope this helps you understand the document better.",
+    "Here is a summary of the key points in your agreement:",
+]
+TOPICS = ["the termination clause", "the interest rate", "the security deposit", "the notice period", "the arbitration clause", "the penalty for late payment"]
+
+
+def chat_answers(count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(count):
+        topic = rng.choice(TOPICS)
+        body = [
+            f"- The agreement discusses {topic} in section {rng.randint(1, 30)}.",
+            f"- You should check how {topic} affects you before signing.",
+        ]
+        answers.append("\n".join([BOILERPLATE[3], *body, "", BOILERPLATE[0], BOILERPLATE[1], BOILERPLATE[2]]))
+    return answers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=50)
+    parser.add_argument("--language", default="hi")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake Translate round trip in seconds")
+    args = parser.parse_args()
+
+    answers = chat_answers(args.answers)
+
+    client = FakeTranslateClient(args.latency)
+    start = time.perf_counter()
+    for answer in answers:
+        client.translate(answer, target_language=args.language)
+    whole = time.perf_counter() - start
+    whole_chars = client.chars_billed
+
+    client = FakeTranslateClient(args.latency)
+    translator = SegmentTranslator(client)
+    start = time.perf_counter()
+    for answer in answers:
+        translator.translate(answer, args.language)
+    segmented = time.perf_counter() - start
+    stats = translator.stats()
+
+    print(f"{args.answers} chat answers -> '{args.language}'")
+    print(f"  whole answer per request : {whole:6.2f}s, {whole_chars:7d} chars billed, {args.answers} requests")
+    print(f"  SegmentTranslator        : {segmented:6.2f}s, {stats['chars_billed']:7d} chars billed, {stats['requests']} requests, hit ratio {stats['hit_ratio']:.2f}")
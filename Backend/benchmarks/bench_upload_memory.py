@@ -0,0 +1,115 @@
+"""
+Peak Python memory (tracemalloc) to accept and store one upload: the
+previous `await file.read()` path (bytes held in memory, written to two
+tempfiles and uploaded from memory) vs spool_upload + ContentStore.put_file
+(chunked spool, chunked resumable upload), for a fake GCS and the local
+filesystem backend.
+
+The streaming peak must stay under --limit-mb whatever the file size, and an
+upload over UPLOAD_MAX_BYTES must be rejected with 413 before it is all read;
+the script exits with status 1 otherwise. tests/test_uploads.py asserts the
+same bounds for the local backend under pytest.
+
+    python -m benchmarks.bench_upload_memory --size-mb 100
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from benchmarks.fake_storage import FakeStorageClient
+from core.clients import clients
+from core.gcs import ContentStore, GCSBackend, LocalBackend
+from core.uploads import spool_upload
+
+MIME = "application/pdf"
+
+
+def make_source(size_mb: int) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
+        block = os.urandom(1024 * 1024)
+        for i in range(size_mb):
+            f.write(block[:-8] + i.to_bytes(8, "big"))
+        return f.name
+
+
+def upload_file(path: str) -> UploadFile:
+    # What FastAPI hands the endpoint: the request body already spooled by Starlette
+    return UploadFile(file=open(path, "rb"), filename="scan.pdf", headers=Headers({"content-type": MIME}))
+
+
+async def legacy(path: str, store_client: FakeStorageClient):
+    file = upload_file(path)
+    file_bytes = await file.read()                      # analyze_document
+    for _ in range(2):                                  # run_analysis, then process_document
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp.write(file_bytes)
+        os.remove(tmp.name)
+    store_client.bucket("bench").blob("docs/u/scan.pdf").upload_from_string(file_bytes, content_type=MIME)
+    file.file.close()
+
+
+async def streaming(path: str, store: ContentStore):
+    file = upload_file(path)
+    with await spool_upload(file, max_bytes=os.path.getsize(path)) as upload:
+        await asyncio.to_thread(store.put_file, "u", upload.filename, upload.path, upload.content_type, upload.sha256, upload.size)
+    file.file.close()
+
+
+def peak_mb(coro_factory) -> float:
+    tracemalloc.start()
+    asyncio.run(coro_factory())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+async def rejects_oversized(path: str, max_bytes: int) -> bool:
+    file = upload_file(path)
+    try:
+        await spool_upload(file, max_bytes=max_bytes)
+    except HTTPException as e:
+        return e.status_code == 413 and file.file.tell() <= max_bytes + 1024 * 1024
+    finally:
+        file.file.close()
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--limit-mb", type=float, default=16, help="Allowed streaming peak")
+    args = parser.parse_args()
+
+    source = make_source(args.size_mb)
+    storage_root = tempfile.mkdtemp(prefix="upload-bench-")
+    try:
+        fake = FakeStorageClient(latency=0, bytes_per_second=float("inf"), keep_data=False)
+        clients.override("storage", fake)
+
+        results = {
+            "file.read() + upload_from_string": peak_mb(lambda: legacy(source, fake)),
+            "spool + resumable GCS upload": peak_mb(lambda: streaming(source, ContentStore("bench", backend=GCSBackend("bench")))),
+            "spool + local backend": peak_mb(lambda: streaming(source, ContentStore("bench", backend=LocalBackend(storage_root)))),
+        }
+        print(f"{args.size_mb}MB upload, peak traced memory:")
+        for label, peak in results.items():
+            print(f"  {label:36s}: {peak:8.1f} MB")
+
+        failures = [label for label, peak in list(results.items())[1:] if peak > args.limit_mb]
+        if failures:
+            print(f"FAIL: over the {args.limit_mb}MB limit: {', '.join(failures)}")
+        oversized_ok = asyncio.run(rejects_oversized(source, max_bytes=args.size_mb * 1024 * 1024 // 4))
+        print(f"  oversized upload rejected with 413 early: {oversized_ok}")
+        if failures or not oversized_ok:
+            sys.exit(1)
+        print("OK")
+    finally:
+        os.remove(source)
+        shutil.rmtree(storage_root, ignore_errors=True)
@@ -0,0 +1,79 @@
+"""
+CPU-bound work on threads vs the worker process pool (core/workers.py):
+--docs concurrent extractions of a generated many-page PDF, timing the batch
+and how long the event loop stalls meanwhile (a 10 ms ticker that should
+never be late). Then checks that a hung task fails with 504 and the pool
+recovers.
+
+    python -m benchmarks.bench_workers --docs 8 --pages 40 --processes 4
+    python -m benchmarks.bench_workers --backend pdfplumber
+
+Docs per second should grow with --processes up to the number of cores.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import HTTPException
+
+from benchmarks.bench_redaction import synthetic_contract
+from benchmarks.suite import corpus_pdf
+from core.extraction import PDF, extract_file
+from core.workers import WorkerPool
+
+
+async def loop_stall_ms(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst lateness of a coroutine that wakes every `interval` seconds."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst * 1000
+
+
+async def run_batch(pool: WorkerPool, path: str, backend: str, docs: int) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(loop_stall_ms(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(pool.run(extract_file, path, PDF, backend) for _ in range(docs)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    assert len({result.text for result in results}) == 1
+    return elapsed, await ticker
+
+
+def check_timeout(pool: WorkerPool, path: str, backend: str):
+    try:
+        pool.call(time.sleep, 5, timeout=0.5)
+        print("FAIL: the hung task was not stopped")
+    except HTTPException as e:
+        print(f"  hung task       : {e.status_code} {e.detail}")
+    start = time.perf_counter()
+    pool.call(extract_file, path, PDF, backend)
+    print(f"  after restart   : next task ok in {(time.perf_counter() - start) * 1000:.0f} ms, {pool.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=8, help="Concurrent extractions")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", default="pymupdf", help="PDF backend from core/extraction.py")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-workers-") as workdir:
+        path = os.path.join(workdir, "contract.pdf")
+        corpus_pdf(path, synthetic_contract(args.pages * 3 * 1024), args.pages)
+        print(f"{args.docs} concurrent {args.backend} extractions of a {args.pages}-page PDF, {os.cpu_count()} cores:")
+
+        for label, processes in (("threads", 0), (f"{args.processes} processes", args.processes)):
+            pool = WorkerPool(processes=processes, max_pending=args.docs)
+            pool.start(preload=("core.extraction",), wait=True)  # as at server startup
+            elapsed, stall = asyncio.run(run_batch(pool, path, args.backend, args.docs))
+            print(f"  {label:15s}: {elapsed:6.2f}s  {args.docs / elapsed:6.2f} docs/s  event loop stalled up to {stall:7.1f} ms")
+            if processes:
+                check_timeout(pool, path, args.backend)
+            pool.shutdown()
@@ -0,0 +1,116 @@
+"""
+Local stand-in for the Gemini REST API.
+
+Answers `models/{model}:generateContent` after a fixed latency (plus an
+optional cost per 1000 prompt characters, like prefill on the real model) so
+LLM-bound code paths can be exercised and timed offline.
+`:streamGenerateContent?alt=sse` spreads the same latency over
+STREAM_CHUNKS server-sent events, so the first one arrives early.
+
+    python -m benchmarks.fake_gemini --port 8765 --latency 0.5
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta uvicorn main:app
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _reply_for(payload: dict) -> str:
+    """Builds a deterministic reply; schema-constrained requests get valid JSON."""
+    config = payload.get("generationConfig") or {}
+    schema = config.get("response_schema") or config.get("responseSchema") or {}
+    if "redact" in schema.get("properties", {}):
+        return json.dumps({"redact": []})  # PII review: keep every candidate
+    if config.get("response_mime_type") == "application/json" or config.get("responseMimeType") == "application/json":
+        return json.dumps({
+            "summary": "Fake summary.",
+            "riskAnalysis": "Fake risk analysis.",
+            "keyPoints": ["Fake key point."],
+            "risks": ["Fake risk."],
+            "recommendations": ["Fake recommendation."],
+            "legalTerms": [{"term": "Indemnity", "definition": "A promise to cover losses."}],
+            "confidence": 90,
+        })
+    return "Fake Gemini response."
+
+
+STREAM_REPLY = (
+    "This agreement is a standard loan contract between the borrower and the lender. "
+    "The borrower must repay the principal with interest in monthly instalments. "
+    "Late payments attract a penalty of two percent per month.\n"
+    "The lender may recall the loan on any event of default. "
+    "You should read the termination clause carefully before signing."
+)
+STREAM_CHUNKS = 10
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+    latency_per_kchar = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompt_chars = sum(
+            len(part.get("text", ""))
+            for content in payload.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        prefill = self.latency_per_kchar * prompt_chars / 1000
+        if ":streamGenerateContent" in self.path:
+            self._stream(prefill)
+            return
+        time.sleep(self.latency + prefill)
+
+        body = json.dumps({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": _reply_for(payload)}]}}]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, prefill: float):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        size = -(-len(STREAM_REPLY) // STREAM_CHUNKS)
+        time.sleep(prefill)
+        for start in range(0, len(STREAM_REPLY), size):
+            time.sleep(self.latency / STREAM_CHUNKS)
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": STREAM_REPLY[start:start + size]}]}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_gemini(port: int = 0, latency: float = 0.5, latency_per_kchar: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Starts the server on a background thread; returns it with its base URL."""
+    handler = type("Handler", (FakeGeminiHandler,), {"latency": latency, "latency_per_kchar": latency_per_kchar})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini HTTP server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds to wait before answering")
+    parser.add_argument("--latency-per-kchar", type=float, default=0.0, help="Extra seconds per 1000 prompt characters")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_gemini(args.port, args.latency, args.latency_per_kchar)
+    print(f"Fake Gemini listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
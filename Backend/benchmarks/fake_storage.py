@@ -0,0 +1,130 @@
+"""
+Local stand-in for `google.cloud.storage.Client`.
+
+Objects are kept in memory. Every request sleeps a fixed round-trip latency,
+and transfers add time proportional to their size, so upload paths can be
+timed offline. Requests and bytes sent are counted. Only the blob and bucket
+methods the services call are modelled; `if_generation_match=0` behaves like
+GCS and refuses to overwrite an existing object, and `upload_from_file` on a
+blob with a `chunk_size` reads the file one chunk per request, like a
+resumable upload. `list_blobs` costs one request per 1000 results, the
+GCS page size. With keep_data=False object bytes are counted, not kept.
+"""
+import datetime
+import threading
+import time
+
+from google.api_core.exceptions import PreconditionFailed
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str, chunk_size: int | None = None):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+        self.metadata = None
+        self.content_type = None
+        self.size = None
+        self.updated = None
+
+    @property
+    def public_url(self) -> str:
+        return f"https://storage.googleapis.com/{self.bucket.name}/{self.name}"
+
+    def exists(self) -> bool:
+        self.bucket.client._request()
+        return self.name in self.bucket.objects
+
+    def upload_from_string(self, data, content_type: str | None = None, if_generation_match: int | None = None, **kwargs):
+        data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        client = self.bucket.client
+        client._request(len(data))
+        with client._lock:
+            if if_generation_match == 0 and self.name in self.bucket.objects:
+                raise PreconditionFailed(f"{self.name} already exists")
+            self.bucket.objects[self.name] = (data if client.keep_data else b"", content_type, dict(self.metadata or {}))
+            self.bucket.updated[self.name] = datetime.datetime.now(datetime.timezone.utc)
+            client.bytes_uploaded += len(data)
+        self.size = len(data)
+
+    def upload_from_file(self, fileobj, size: int | None = None, content_type: str | None = None, if_generation_match: int | None = None, **kwargs):
+        if not self.chunk_size:
+            self.upload_from_string(fileobj.read(), content_type=content_type, if_generation_match=if_generation_match)
+            return
+        client = self.bucket.client
+        client._request()  # start the resumable session
+        if if_generation_match == 0 and self.name in self.bucket.objects:
+            raise PreconditionFailed(f"{self.name} already exists")
+        chunks, total = [], 0
+        while chunk := fileobj.read(self.chunk_size):
+            client._request(len(chunk))
+            total += len(chunk)
+            with client._lock:
+                client.bytes_uploaded += len(chunk)
+            if client.keep_data:
+                chunks.append(chunk)
+        with client._lock:
+            self.bucket.objects[self.name] = (b"".join(chunks), content_type, dict(self.metadata or {}))
+            self.bucket.updated[self.name] = datetime.datetime.now(datetime.timezone.utc)
+        self.size = total
+
+    def upload_from_filename(self, path: str, content_type: str | None = None, **kwargs):
+        with open(path, "rb") as f:
+            self.upload_from_file(f, content_type=content_type, **kwargs)
+
+    def download_as_bytes(self) -> bytes:
+        data = self.bucket.objects[self.name][0]
+        self.bucket.client._request(len(data))
+        return data
+
+    def download_to_filename(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.download_as_bytes())
+
+
+class FakeBucket:
+    def __init__(self, client: "FakeStorageClient", name: str):
+        self.client = client
+        self.name = name
+        self.objects: dict[str, tuple[bytes, str | None, dict]] = {}
+        self.updated: dict[str, datetime.datetime] = {}
+
+    def blob(self, name: str, chunk_size: int | None = None) -> FakeBlob:
+        return FakeBlob(self, name, chunk_size)
+
+    def _loaded(self, name: str) -> FakeBlob:
+        data, content_type, metadata = self.objects[name]
+        blob = FakeBlob(self, name)
+        blob.metadata, blob.content_type, blob.size = dict(metadata) or None, content_type, len(data)
+        blob.updated = self.updated.get(name)
+        return blob
+
+    def get_blob(self, name: str) -> FakeBlob | None:
+        self.client._request()
+        return self._loaded(name) if name in self.objects else None
+
+    def list_blobs(self, prefix: str = ""):
+        names = [name for name in sorted(self.objects) if name.startswith(prefix)]
+        for _ in range(max(1, -(-len(names) // 1000))):
+            self.client._request()
+        return [self._loaded(name) for name in names]
+
+
+class FakeStorageClient:
+    def __init__(self, latency: float = 0.03, bytes_per_second: float = 20 * 1024 * 1024, keep_data: bool = True):
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.keep_data = keep_data
+        self.requests = 0
+        self.bytes_uploaded = 0
+        self._buckets: dict[str, FakeBucket] = {}
+        self._lock = threading.Lock()
+
+    def _request(self, size: int = 0):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency + size / self.bytes_per_second)
+
+    def bucket(self, name: str) -> FakeBucket:
+        with self._lock:
+            return self._buckets.setdefault(name, FakeBucket(self, name))
@@ -0,0 +1,27 @@
+"""
+Local stand-in for `google.cloud.translate_v2.Client`.
+
+Sleeps a fixed round-trip latency per request, "translates" by tagging the
+text, and counts requests and characters billed. Like the real client,
+`translate` takes a string or a list of strings.
+"""
+import threading
+import time
+
+
+class FakeTranslateClient:
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.requests = 0
+        self.chars_billed = 0
+        self._lock = threading.Lock()
+
+    def translate(self, values, target_language: str, **kwargs):
+        single = isinstance(values, str)
+        items = [values] if single else list(values)
+        with self._lock:
+            self.requests += 1
+            self.chars_billed += sum(len(item) for item in items)
+        time.sleep(self.latency)
+        results = [{"translatedText": f"[{target_language}] {item}", "input": item} for item in items]
+        return results[0] if single else results
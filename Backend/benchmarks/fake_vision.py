@@ -0,0 +1,63 @@
+"""
+Local stand-in for `google.cloud.vision.ImageAnnotatorClient`.
+
+Each call sleeps for a fixed round-trip latency (plus a small per-image cost)
+and answers with deterministic text, so OCR code paths can be timed offline.
+Only the attributes the services read are modelled.
+"""
+import threading
+import time
+
+
+class _Error:
+    def __init__(self, message: str = ""):
+        self.message = message
+
+
+class _TextAnnotation:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeAnnotateImageResponse:
+    def __init__(self, text: str = "", error: str = ""):
+        self.error = _Error(error)
+        self.full_text_annotation = _TextAnnotation(text) if text else None
+
+
+class FakeBatchAnnotateImagesResponse:
+    def __init__(self, responses: list[FakeAnnotateImageResponse]):
+        self.responses = responses
+
+
+class FakeVisionClient:
+    def __init__(self, latency: float = 0.3, per_image_latency: float = 0.02, text: str = "FAKE OCR TEXT", fail_every: int = 0):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.text = text
+        self.fail_every = fail_every  # make every Nth image fail, 0 disables
+        self.calls = 0
+        self.images = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, content: bytes) -> FakeAnnotateImageResponse:
+        with self._lock:
+            self.images += 1
+            self.bytes_received += len(content)
+            index = self.images
+        if self.fail_every and index % self.fail_every == 0:
+            return FakeAnnotateImageResponse(error="Simulated OCR failure")
+        return FakeAnnotateImageResponse(text=f"{self.text} #{index}")
+
+    def text_detection(self, image, **kwargs) -> FakeAnnotateImageResponse:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + self.per_image_latency)
+        return self._answer(image.content)
+
+    def batch_annotate_images(self, requests, **kwargs) -> FakeBatchAnnotateImagesResponse:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + self.per_image_latency * len(requests))
+        return FakeBatchAnnotateImagesResponse([self._answer(request.image.content) for request in requests])
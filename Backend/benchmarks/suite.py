@@ -0,0 +1,335 @@
+"""
+Offline benchmark suite: times each document stage on its own, with local
+fakes for every external service, and saves the results as JSON so runs on
+different commits can be compared.
+
+Stages and inputs (Loan_Agreement.pdf plus generated corpora):
+    extract_text_from_file      docs: PDF, many-page PDF, DOCX and plain text
+    redact_text                 docs: regex redaction of the loan text and a large corpus
+    _extract_text_from_document verify: text-layer PDF and a scanned PDF (fake Vision)
+    _redact_sensitive_info      verify: local detectors + fake Gemini review
+    generate_pdf_report         verify: ReportLab rendering (Vera stand-in fonts)
+    list_user_docs              media: one page of the file index, uncached and cached
+
+Gemini is the fake HTTP server (benchmarks/fake_gemini.py); Vision, Translate
+and GCS are the in-process fakes registered through core.clients; the file
+index is in memory. Nothing touches the network or needs credentials.
+
+    python -m benchmarks.suite                      # writes benchmarks/results/<commit>.json
+    python -m benchmarks.suite --quick --only redact_text list_user_docs
+    python -m benchmarks.suite --compare benchmarks/results/<older commit>.json
+
+Results depend on the machine, so benchmarks/results/ is not committed;
+compare runs made on the same host.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_gemini import start_fake_gemini
+from benchmarks.fake_storage import FakeStorageClient
+from benchmarks.fake_translate import FakeTranslateClient
+from benchmarks.fake_vision import FakeVisionClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOAN_AGREEMENT = os.path.join(BACKEND_DIR, "Loan_Agreement.pdf")
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT = "text/plain"
+
+
+def configure_environment(gemini_url: str):
+    """Points the services at the fakes. Must run before anything imports core.config."""
+    if "core.config" in sys.modules:
+        raise RuntimeError("core.config was imported before the benchmark environment was set")
+    os.environ.update({
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": gemini_url,
+        "GCS_BUCKET_NAME": "bench-bucket",
+        "STORAGE_BACKEND": "gcs",
+        "FILE_INDEX_BACKEND": "memory",
+        "ANALYSIS_CACHE_BACKEND": "memory",
+        # Stages are timed in this process (the report stage patches its fonts here); see bench_workers.py for the pool
+        "WORKER_PROCESSES": "0",
+    })
+
+
+def install_fakes(vision_latency: float, translate_latency: float) -> dict:
+    from core.clients import clients
+    fakes = {
+        "storage": FakeStorageClient(latency=0, bytes_per_second=float("inf")),
+        "vision": FakeVisionClient(latency=vision_latency, per_image_latency=0),
+        "translate": FakeTranslateClient(latency=translate_latency),
+    }
+    for name, client in fakes.items():
+        clients.override(name, client)
+    return fakes
+
+
+# --- Inputs ---
+
+def corpus_pdf(path: str, text: str, pages: int):
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    per_page = -(-len(text) // pages)
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (54, 54, -54, -54), text[number * per_page:(number + 1) * per_page], fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def corpus_docx(path: str, text: str):
+    from docx import Document
+    doc = Document()
+    for paragraph in text.split("\n"):
+        doc.add_paragraph(paragraph)
+    doc.save(path)
+
+
+def build_inputs(workdir: str, corpus_kb: int, pages: int, scanned_pages: int) -> dict:
+    from benchmarks.bench_ocr import synthetic_pdf
+    from benchmarks.bench_redaction import synthetic_contract
+    from features.docs.service import extract_text_from_file
+
+    corpus = synthetic_contract(corpus_kb * 1024)
+    files = {
+        "loan_agreement.pdf": (LOAN_AGREEMENT, PDF),
+        f"corpus_{pages}p.pdf": (os.path.join(workdir, "corpus.pdf"), PDF),
+        f"corpus_{corpus_kb}kb.docx": (os.path.join(workdir, "corpus.docx"), DOCX),
+        f"corpus_{corpus_kb}kb.txt": (os.path.join(workdir, "corpus.txt"), TEXT),
+    }
+    corpus_pdf(files[f"corpus_{pages}p.pdf"][0], corpus, pages)
+    corpus_docx(files[f"corpus_{corpus_kb}kb.docx"][0], corpus)
+    with open(files[f"corpus_{corpus_kb}kb.txt"][0], "w", encoding="utf-8") as f:
+        f.write(corpus)
+
+    with open(LOAN_AGREEMENT, "rb") as f:
+        loan_bytes = f.read()
+    return {
+        "files": files,
+        "loan_text": extract_text_from_file(LOAN_AGREEMENT, PDF),
+        "corpus_text": corpus,
+        "loan_pdf": loan_bytes,
+        "scanned_pdf": synthetic_pdf(scanned_pages, scanned=True),
+        "scanned_pages": scanned_pages,
+    }
+
+
+# --- Measurement ---
+
+def measure(fn, repeat: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def bench_extract_text_from_file(inputs: dict, repeat: int, loop) -> list[dict]:
+    from features.docs.service import extract_text_from_file
+    results = []
+    for case, (path, mime_type) in inputs["files"].items():
+        timing = measure(lambda: extract_text_from_file(path, mime_type), repeat)
+        results.append({"case": case, "input_bytes": os.path.getsize(path), **timing})
+    return results
+
+
+def bench_redact_text(inputs: dict, repeat: int, loop) -> list[dict]:
+    from features.docs.service import redact_text
+    results = []
+    for case, text in (("loan_agreement", inputs["loan_text"]), ("corpus", inputs["corpus_text"])):
+        timing = measure(lambda: redact_text(text), repeat)
+        results.append({"case": case, "input_bytes": len(text.encode("utf-8")), **timing})
+    return results
+
+
+def bench_extract_text_from_document(inputs: dict, repeat: int, loop) -> list[dict]:
+    from features.verify.service import verification_service
+    cases = (
+        ("loan_agreement.pdf", inputs["loan_pdf"]),
+        (f"scanned_{inputs['scanned_pages']}p.pdf", inputs["scanned_pdf"]),
+    )
+    results = []
+    for case, content in cases:
+        run = lambda: loop.run_until_complete(verification_service._extract_text_from_document(content, case))
+        results.append({"case": case, "input_bytes": len(content), **measure(run, repeat)})
+    return results
+
+
+def bench_redact_sensitive_info(inputs: dict, repeat: int, loop) -> list[dict]:
+    from benchmarks.bench_pii_redaction import PARTIES
+    from features.verify.service import verification_service
+    cases = (
+        ("loan_agreement", inputs["loan_text"]),
+        ("corpus_40kb", PARTIES + inputs["corpus_text"][:40 * 1024]),
+    )
+    results = []
+    for case, text in cases:
+        run = lambda: loop.run_until_complete(verification_service._redact_sensitive_info(text, "en"))
+        results.append({"case": case, "input_bytes": len(text.encode("utf-8")), **measure(run, repeat)})
+    return results
+
+
+def bench_generate_pdf_report(inputs: dict, repeat: int, loop) -> list[dict]:
+    import features.verify.report as report
+    from benchmarks.bench_report_pdf import sample_report, stand_in_fonts
+    from features.verify.service import verification_service
+
+    # The Noto/Poppins fonts are not checked in; render with ReportLab's Vera in their place
+    report.report_template = report.ReportTemplate(report.FontRegistry(stand_in_fonts()))
+    results = []
+    for case, language_code in (("en", "en"), ("hi", "hi")):
+        data = sample_report(language_code)
+        size = verification_service.generate_pdf_report(data).getbuffer().nbytes
+        timing = measure(lambda: verification_service.generate_pdf_report(data), repeat)
+        results.append({"case": case, "output_bytes": size, **timing})
+    return results
+
+
+def bench_list_user_docs(inputs: dict, repeat: int, loop) -> list[dict]:
+    from core.config import LISTING_PAGE_SIZE
+    from core.file_index import file_index
+    from features.media.service import list_user_docs
+
+    results = []
+    for count in (100, 5000):
+        user_id = f"bench-user-{count}"
+        for i in range(count):
+            file_index.record(user_id, f"docs/{user_id}/doc_{i:05d}.pdf", PDF, 1024, f"{i:064x}", f"https://example.com/{i}")
+        file_index.mark_ready(user_id)
+
+        def uncached():
+            file_index.cache.invalidate(user_id)
+            list_user_docs(user_id, LISTING_PAGE_SIZE)
+
+        results.append({"case": f"{count}_files_uncached", **measure(uncached, repeat)})
+        results.append({"case": f"{count}_files_cached", **measure(lambda: list_user_docs(user_id, LISTING_PAGE_SIZE), repeat)})
+    return results
+
+
+STAGES = {
+    "extract_text_from_file": bench_extract_text_from_file,
+    "redact_text": bench_redact_text,
+    "_extract_text_from_document": bench_extract_text_from_document,
+    "_redact_sensitive_info": bench_redact_sensitive_info,
+    "generate_pdf_report": bench_generate_pdf_report,
+    "list_user_docs": bench_list_user_docs,
+}
+
+
+# --- Results ---
+
+def git_revision() -> tuple[str, bool]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return commit, dirty
+
+
+def compare(current: dict, baseline: dict, threshold: float, noise_ms: float) -> list[str]:
+    """
+    Prints median changes against `baseline`; returns the cases slower by more
+    than `threshold` times and by more than `noise_ms` (sub-millisecond cases jitter).
+    """
+    before = {(r["stage"], r["case"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\ncompared with {baseline['commit']}{' (dirty)' if baseline.get('dirty') else ''}:")
+    for result in current["results"]:
+        old = before.get((result["stage"], result["case"]))
+        if old is None or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        flag = "  REGRESSION" if ratio > threshold and result["median_ms"] - old["median_ms"] > noise_ms else ""
+        print(f"  {result['stage']:28s} {result['case']:24s} {old['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:5.2f}{flag}")
+        if flag:
+            regressions.append(f"{result['stage']}/{result['case']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=sorted(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="Smaller corpora and fewer repeats, for a smoke run")
+    parser.add_argument("--corpus-kb", type=int, default=1024)
+    parser.add_argument("--pages", type=int, default=60, help="Pages in the generated text-layer PDF")
+    parser.add_argument("--scanned-pages", type=int, default=8)
+    parser.add_argument("--gemini-latency", type=float, default=0.05)
+    parser.add_argument("--vision-latency", type=float, default=0.05)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--noise-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.corpus_kb, args.pages, args.scanned_pages = 2, 128, 10, 2
+
+    server, gemini_url = start_fake_gemini(latency=args.gemini_latency)
+    configure_environment(gemini_url)
+    install_fakes(args.vision_latency, translate_latency=0)
+    loop = asyncio.new_event_loop()
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "repeat": args.repeat,
+            "corpus_kb": args.corpus_kb,
+            "pages": args.pages,
+            "scanned_pages": args.scanned_pages,
+            "gemini_latency": args.gemini_latency,
+            "vision_latency": args.vision_latency,
+        },
+        "results": [],
+    }
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-suite-") as workdir:
+            inputs = build_inputs(workdir, args.corpus_kb, args.pages, args.scanned_pages)
+            for name in args.only or STAGES:
+                for result in STAGES[name](inputs, args.repeat, loop):
+                    result = {"stage": name, **result}
+                    report["results"].append(result)
+                    print(f"  {name:28s} {result['case']:24s} median {result['median_ms']:10.2f} ms  (min {result['min_ms']:.2f}, max {result['max_ms']:.2f})")
+    finally:
+        from core.llm import gemini_client
+        loop.run_until_complete(gemini_client.aclose())
+        loop.close()
+        server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold, args.noise_ms)
+        if regressions:
+            print(f"FAIL: {len(regressions)} case(s) slower than x{args.threshold}: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from core.clients import clients
+
+
+def _size_of(value) -> int:
+    """Approximate memory footprint of a JSON-serializable value, in bytes."""
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache evicting by total value size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def set(self, key: str, value, size: int | None = None):
+        size = _size_of(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._items)
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache whose entries expire `ttl` seconds after
+    they are set. Keys are (group, key) pairs so every entry of one group
+    (e.g. one user) can be dropped at once.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: OrderedDict[tuple[str, str], tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, group: str, key: str):
+        with self._lock:
+            item = self._items.get((group, key))
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._items[(group, key)]
+                return None
+            self._items.move_to_end((group, key))
+            return item[1]
+
+    def set(self, group: str, key: str, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._items[(group, key)] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end((group, key))
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, group: str):
+        with self._lock:
+            for item_key in [k for k in self._items if k[0] == group]:
+                del self._items[item_key]
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskCacheStore:
+    """Persistent tier: one JSON file per key in a local directory, under a subdirectory per user."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, user_id: str | None = None) -> str:
+        if user_id is None:
+            return os.path.join(self.directory, f"{key}.json")
+        # User ids are hashed so they are always safe path components
+        user_dir = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, user_dir, f"{key}.json")
+
+    def get(self, key: str, user_id: str | None = None):
+        try:
+            with open(self._path(key, user_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value, user_id: str | None = None):
+        path = self._path(key, user_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, default=str)
+        os.replace(tmp_path, path)
+
+
+class FirestoreCacheStore:
+    """Persistent tier stored per user under users/{uid}/analysis_cache/{key}."""
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        # Resolved on first use so importing the store does not initialize Firebase
+        return self._db or clients.firestore()
+
+    def _ref(self, key: str, user_id: str):
+        return self.db.collection("users").document(user_id).collection("analysis_cache").document(key)
+
+    def get(self, key: str, user_id: str | None = None):
+        if not user_id:
+            return None
+        snapshot = self._ref(key, user_id).get()
+        return snapshot.to_dict().get("value") if snapshot.exists else None
+
+    def set(self, key: str, value, user_id: str | None = None):
+        if user_id:
+            self._ref(key, user_id).set({"value": value})
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for document analysis results.
+    Lookups hit the in-process LRU first, then the persistent store; hits
+    from the store are promoted into memory. Both tiers are scoped to
+    `user_id`, so a hit never depends on which instance served it and never
+    returns another user's analysis.
+    """
+
+    def __init__(self, max_bytes: int, store=None):
+        self.memory = LRUCache(max_bytes)
+        self.store = store
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _memory_key(key: str, user_id: str | None) -> str:
+        return key if user_id is None else f"{user_id}:{key}"
+
+    async def get(self, key: str, user_id: str | None = None):
+        value = self.memory.get(self._memory_key(key, user_id))
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.store is not None:
+            try:
+                value = await asyncio.to_thread(self.store.get, key, user_id)
+            except Exception as e:
+                logging.warning(f"Analysis cache store read failed: {e}")
+                value = None
+            if value is not None:
+                self.store_hits += 1
+                self.memory.set(self._memory_key(key, user_id), value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value, user_id: str | None = None):
+        self.memory.set(self._memory_key(key, user_id), value)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.set, key, value, user_id)
+            except Exception as e:
+                logging.warning(f"Analysis cache store write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes,
+            "memory_max_bytes": self.memory.max_bytes,
+        }
+
+
+def analysis_cache_key(file_sha256: str, document_type: str, model: str, prompt_version: str, extractor: str = "") -> str:
+    """
+    Content address for an analysis: SHA-256 of the file plus everything that shapes the output,
+    including the text-extraction backend, since backends extract slightly different text.
+    """
+    return hashlib.sha256(f"{file_sha256}|{document_type}|{model}|{prompt_version}|{extractor}".encode("utf-8")).hexdigest()
@@ -0,0 +1,86 @@
+import math
+import re
+from typing import Any, Awaitable, Callable
+
+from core.concurrency import gather_settled
+
+# Gemini averages about four characters of English per token; close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Split points, just after a newline: blank lines, headings such as
+# "ARTICLE 5" / "Section 2" / "SCHEDULE A", numbered clauses ("4.", "4.2", "12)")
+# and lettered sub-clauses ("(a)", "(iv)")
+_SECTION_BOUNDARY = re.compile(
+    r"(?<=\n)(?="
+    r"[ \t]*\n"
+    r"|[ \t]*(?:ARTICLE|Article|SECTION|Section|CLAUSE|Clause|SCHEDULE|Schedule|ANNEXURE|Annexure)\b"
+    r"|[ \t]*\(?\d+(?:\.\d+)*[.)]\s"
+    r"|[ \t]*\([a-z]{1,4}\)\s"
+    r")"
+)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.;!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _pieces(text: str, max_chars: int) -> list[str]:
+    """Section/clause blocks, with oversized blocks broken at sentences, then hard-cut."""
+    pieces = []
+    for block in _SECTION_BOUNDARY.split(text):
+        if len(block) <= max_chars:
+            pieces.append(block)
+            continue
+        for sentence in _SENTENCE_BOUNDARY.split(block):
+            for start in range(0, len(sentence), max_chars):
+                pieces.append(sentence[start:start + max_chars] + " ")
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Splits `text` into chunks of at most about `max_tokens`, preferring to
+    cut between sections and clauses so each chunk reads on its own.
+    Short texts come back as a single chunk.
+    """
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks, current, size = [], [], 0
+    for piece in _pieces(text, max_chars):
+        if current and size + len(piece) > max_chars:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece)
+    if current:
+        chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+async def map_reduce(
+    chunks: list[str],
+    map_fn: Callable[[int, str], Awaitable[Any]],
+    reduce_fn: Callable[[list[Any]], Awaitable[Any]],
+    max_concurrency: int,
+    timeout: float | None = None,
+) -> Any:
+    """
+    Runs `map_fn(index, chunk)` over the chunks in parallel and combines the
+    results, in chunk order, with `reduce_fn`. A single chunk skips the reduce.
+    Chunks that fail are left out of the reduce; if every chunk fails the
+    first error is raised.
+    """
+    if len(chunks) == 1:
+        return await map_fn(0, chunks[0])
+
+    results, errors = await gather_settled(
+        {str(i): (lambda i=i, chunk=chunk: map_fn(i, chunk)) for i, chunk in enumerate(chunks)},
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+    )
+    if not results:
+        raise RuntimeError(f"All {len(chunks)} chunks failed: {next(iter(errors.values()), 'no chunks')}")
+    return await reduce_fn([results[str(i)] for i in range(len(chunks)) if str(i) in results])
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from core.config import GOOGLE_APPLICATION_CREDENTIALS, FIREBASE_SERVICE_ACCOUNT
+
+
+def _storage_client():
+    from google.cloud import storage
+    # Use service account key locally if provided, else Cloud Run default credentials
+    if GOOGLE_APPLICATION_CREDENTIALS:
+        return storage.Client.from_service_account_json(GOOGLE_APPLICATION_CREDENTIALS)
+    return storage.Client()
+
+
+def _firestore_client():
+    from firebase_admin import firestore
+    return firestore.client(clients.firebase_app())
+
+
+def _translate_client():
+    from google.cloud import translate_v2 as translate
+    return translate.Client()
+
+
+def _vision_client():
+    from google.cloud import vision
+    return vision.ImageAnnotatorClient()
+
+
+def _firebase_app():
+    import firebase_admin
+    from firebase_admin import credentials
+    if firebase_admin._apps:
+        return firebase_admin.get_app()
+    # Service account key from FIREBASE_SERVICE_ACCOUNT, else the Cloud Run default credentials
+    cred = credentials.Certificate(FIREBASE_SERVICE_ACCOUNT) if FIREBASE_SERVICE_ACCOUNT else None
+    return firebase_admin.initialize_app(cred)
+
+
+def _firebase_auth():
+    # firebase_admin.auth talks to the default app, so make sure it exists first
+    clients.firebase_app()
+    from firebase_admin import auth
+    return auth
+
+
+class ClientRegistry:
+    """
+    One instance of each Google client per process, built on first use.
+    Importing a module that needs a client costs nothing; the SDK import and
+    the credential lookup happen on the first request that calls `get`.
+    `override` swaps in a ready-made instance (fakes for benchmarks, or a
+    client built with custom options) before or after first use.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._instances: dict[str, Any] = {}
+        self._load_ms: dict[str, float] = {}
+        self._building: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._factories and name not in self._instances:
+                raise KeyError(f"No client registered as '{name}'")
+            # One lock per client: concurrent first requests build it once, and a
+            # factory can `get` its own dependencies without deadlocking
+            building = self._building.setdefault(name, threading.Lock())
+        with building:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._load_ms[name] = (time.perf_counter() - start) * 1000
+                logging.info(f"Initialized {name} client in {self._load_ms[name]:.0f}ms")
+            return self._instances[name]
+
+    def override(self, name: str, instance: Any):
+        with self._lock:
+            self._instances[name] = instance
+            self._load_ms.pop(name, None)
+
+    def reset(self, name: str | None = None):
+        """Drops built instances so the next `get` calls the factory again."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._load_ms.clear()
+            else:
+                self._instances.pop(name, None)
+                self._load_ms.pop(name, None)
+
+    def loaded(self) -> dict[str, float]:
+        """Names of the clients built so far, with the milliseconds each took."""
+        with self._lock:
+            return {name: round(self._load_ms.get(name, 0.0), 1) for name in self._instances}
+
+    def storage(self):
+        return self.get("storage")
+
+    def firestore(self):
+        return self.get("firestore")
+
+    def translate(self):
+        return self.get("translate")
+
+    def vision(self):
+        return self.get("vision")
+
+    def firebase_app(self):
+        return self.get("firebase_app")
+
+    def auth(self):
+        return self.get("auth")
+
+
+# Shared by every feature; nothing is built until first use
+clients = ClientRegistry()
+clients.register("storage", _storage_client)
+clients.register("firestore", _firestore_client)
+clients.register("translate", _translate_client)
+clients.register("vision", _vision_client)
+clients.register("firebase_app", _firebase_app)
+clients.register("auth", _firebase_auth)
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+
+async def gather_settled(
+    stages: dict[str, Callable[[], Awaitable[Any]]],
+    max_concurrency: int,
+    timeout: float | None = None,
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """
+    Runs independent async stages concurrently.
+
+    At most `max_concurrency` stages run at once and all of them share one
+    `timeout` budget. A failing or timed-out stage does not cancel the others:
+    returns `(results, errors)` keyed by stage name.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(factory):
+        async with semaphore:
+            return await factory()
+
+    tasks = {name: asyncio.create_task(run(factory)) for name, factory in stages.items()}
+    if not tasks:
+        return {}, {}
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results, errors = {}, {}
+    for name, task in tasks.items():
+        if task in pending:
+            errors[name] = f"Timed out after {timeout}s"
+        elif task.exception() is not None:
+            exc = task.exception()
+            errors[name] = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+        else:
+            results[name] = task.result()
+
+    for name, error in errors.items():
+        logging.warning(f"Stage '{name}' failed: {error}")
+    return results, errors
@@ -3,4 +3,137 @@ from dotenv import load_dotenv
 
 load_dotenv()  # load .env file
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
\ No newline at end of file
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# Point at a local fake server (see benchmarks/fake_gemini.py) to run offline
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+
+# --- Shared LLM HTTP client ---
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+
+# --- /documents/analyze fan-out ---
+ANALYZE_MAX_CONCURRENCY = int(os.getenv("ANALYZE_MAX_CONCURRENCY", "3"))
+ANALYZE_TIMEOUT = float(os.getenv("ANALYZE_TIMEOUT", "120"))
+# "combined": one structured Gemini call; "legacy": separate summary/risk prompts
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "combined")
+
+# --- Long documents: token-aware chunking with parallel map-reduce ---
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "8000"))
+ANALYSIS_MAP_CONCURRENCY = int(os.getenv("ANALYSIS_MAP_CONCURRENCY", "8"))
+
+# --- Analysis cache ---
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# "disk", "firestore" or "none" (memory tier only)
+ANALYSIS_CACHE_BACKEND = os.getenv("ANALYSIS_CACHE_BACKEND", "disk")
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", "/tmp/docqulio-analysis-cache")
+
+# --- Verification OCR ---
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))  # Vision allows up to 16 images per batch request
+# Images sent to Vision are scaled to about this many pixels (adaptive DPI for PDF pages)
+OCR_TARGET_PIXELS = int(os.getenv("OCR_TARGET_PIXELS", str(2_000_000)))
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "100"))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"
+# "auto" (PNG for rendered PDF pages, JPEG for photos), "jpeg" or "png"
+OCR_IMAGE_FORMAT = os.getenv("OCR_IMAGE_FORMAT", "auto")
+OCR_JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "85"))
+# Raw image bytes allowed in one Vision request (the API caps requests at 10 MB after base64)
+OCR_REQUEST_BYTE_BUDGET = int(os.getenv("OCR_REQUEST_BYTE_BUDGET", str(7 * 1024 * 1024)))
+
+# --- Verification PII redaction ---
+# Characters of text either side of an ambiguous span (name/address) sent for LLM review
+PII_REVIEW_CONTEXT_CHARS = int(os.getenv("PII_REVIEW_CONTEXT_CHARS", "80"))
+PII_REVIEW_BATCH_SIZE = int(os.getenv("PII_REVIEW_BATCH_SIZE", "40"))
+# Non-Latin-script documents are reviewed whole, in windows of this many characters
+PII_REVIEW_WINDOW_CHARS = int(os.getenv("PII_REVIEW_WINDOW_CHARS", "4000"))
+
+# --- Background jobs (/documents/verify and /documents/analyze with job=true) ---
+# "firestore" (users/{uid}/jobs) or "memory" for local runs
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "firestore")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "50"))
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "900"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))  # seconds finished jobs stay in the memory store
+# Bucket for job results and reports too large for a Firestore document (jobs/{uid}/{job_id}/{name})
+JOB_ARTIFACT_BUCKET = os.getenv("JOB_ARTIFACT_BUCKET", "docquliobucket")
+
+# --- Chat translation (segment cache, see core/translation.py) ---
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Characters and segments per Translation API request (v2 recommends at most 5K chars and 128 segments)
+TRANSLATE_MAX_REQUEST_CHARS = int(os.getenv("TRANSLATE_MAX_REQUEST_CHARS", "5000"))
+TRANSLATE_MAX_SEGMENTS = int(os.getenv("TRANSLATE_MAX_SEGMENTS", "128"))
+
+# --- Verification PDF reports ---
+REPORT_FONTS_DIR = os.getenv(
+    "REPORT_FONTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "features", "verify", "fonts"),
+)
+
+# --- Google clients (built lazily, see core/clients.py) ---
+GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+FIREBASE_SERVICE_ACCOUNT = os.getenv("FIREBASE_SERVICE_ACCOUNT")
+# Budget for `import main` checked by benchmarks/bench_import_time.py
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# --- Content-addressed file storage (see core/gcs.py) ---
+GCS_CONTENT_PREFIX = os.getenv("GCS_CONTENT_PREFIX", "content")
+GCS_KNOWN_OBJECTS_CACHE_BYTES = int(os.getenv("GCS_KNOWN_OBJECTS_CACHE_BYTES", str(1024 * 1024)))
+
+# --- Uploads: streamed in chunks to a spool file, then to storage ---
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Spool files go to the system temp dir unless set (on Cloud Run /tmp is in-memory; mount a volume for large files)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+# Resumable upload chunk; GCS requires a multiple of 256KB
+GCS_UPLOAD_CHUNK_SIZE = int(os.getenv("GCS_UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
+# "gcs" or "local" (files under STORAGE_LOCAL_DIR/<bucket>, for running without GCS)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "gcs")
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", "/tmp/docqulio-storage")
+
+# --- Document listings (per-user file index, see core/file_index.py) ---
+# "firestore" or "memory"
+FILE_INDEX_BACKEND = os.getenv("FILE_INDEX_BACKEND", "firestore")
+# Seconds a listing page is served from the in-process cache
+LISTING_CACHE_TTL = float(os.getenv("LISTING_CACHE_TTL", "30"))
+LISTING_CACHE_MAX_ENTRIES = int(os.getenv("LISTING_CACHE_MAX_ENTRIES", "1024"))
+LISTING_PAGE_SIZE = int(os.getenv("LISTING_PAGE_SIZE", "50"))
+LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", "200"))
+
+# --- Auth: cached ID-token verification (see core/security.py) ---
+# Also ask Firebase whether a token was revoked; off by default, as each check is a network round trip
+AUTH_CHECK_REVOKED = os.getenv("AUTH_CHECK_REVOKED", "false").lower() == "true"
+# With AUTH_CHECK_REVOKED, seconds between revocation checks of a cached token; 0 checks only on first use
+AUTH_REVOCATION_CHECK_SECONDS = float(os.getenv("AUTH_REVOCATION_CHECK_SECONDS", "300"))
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# --- Text extraction (see core/extraction.py) ---
+# Default PDF backend: "pymupdf" (fastest), "pdfplumber" or "pypdf2"
+EXTRACTION_PDF_BACKEND = os.getenv("EXTRACTION_PDF_BACKEND", "pymupdf")
+# Extracted text kept per upload so every feature reuses one extraction
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# --- CPU-bound work (parsing, page rendering, PDF reports) in worker processes (see core/workers.py) ---
+# 0 runs the tasks on a thread of the API process instead
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+# A worker process is replaced after this many tasks, so leaks in the parsers do not accumulate
+WORKER_MAX_TASKS_PER_CHILD = int(os.getenv("WORKER_MAX_TASKS_PER_CHILD", "100"))
+# Tasks queued or running before new ones are refused with 503
+WORKER_MAX_PENDING = int(os.getenv("WORKER_MAX_PENDING", "64"))
+# Seconds before a task fails with 504 and the worker processes are restarted
+WORKER_TASK_TIMEOUT = float(os.getenv("WORKER_TASK_TIMEOUT", "120"))
+
+# --- Chat retrieval (per-user BM25 index of redacted documents, see core/retrieval.py) ---
+# Local to each instance; on Cloud Run /tmp is in memory, so mount a volume to keep indexes across restarts
+RETRIEVAL_INDEX_DIR = os.getenv("RETRIEVAL_INDEX_DIR", "/tmp/docqulio-retrieval")
+RETRIEVAL_PASSAGE_TOKENS = int(os.getenv("RETRIEVAL_PASSAGE_TOKENS", "256"))
+# Passages sent with each chat prompt, so prompt size does not depend on document size
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+# A file attached to the question is sent whole up to this size; longer ones get matching passages plus a spread across the file
+RETRIEVAL_FULL_DOCUMENT_TOKENS = int(os.getenv("RETRIEVAL_FULL_DOCUMENT_TOKENS", "8000"))
+# Users whose indexes stay loaded in memory
+RETRIEVAL_MAX_LOADED_USERS = int(os.getenv("RETRIEVAL_MAX_LOADED_USERS", "256"))
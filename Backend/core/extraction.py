@@ -0,0 +1,160 @@
+import re
+import unicodedata
+from typing import Callable, Iterator, NamedTuple
+
+from core.cache import LRUCache
+from core.config import EXTRACTION_CACHE_MAX_BYTES, EXTRACTION_PDF_BACKEND
+from core.workers import WorkerPool, worker_pool
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_BLOCK_SIZE = 64 * 1024  # chars per chunk when streaming plain-text files
+
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+_BLANK_RUN = re.compile(r"\n{3,}")
+
+
+def normalize(text: str) -> str:
+    """Same text whichever library read it: NFC, \\n line ends, no trailing spaces or runs of blank lines."""
+    text = unicodedata.normalize("NFC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x0c", "\n").replace("\x00", "")
+    text = _TRAILING_SPACE.sub("\n", text)
+    return _BLANK_RUN.sub("\n\n", text)
+
+
+# --- Backends: each yields a file's text one page, paragraph or block at a time ---
+
+def _pdf_pymupdf(local_path: str) -> Iterator[str]:
+    import fitz  # PyMuPDF
+    with fitz.open(local_path) as pdf:
+        for page in pdf:
+            yield page.get_text("text") + "\n"
+
+
+def _pdf_pdfplumber(local_path: str) -> Iterator[str]:
+    import pdfplumber
+    with pdfplumber.open(local_path) as pdf:
+        for page in pdf.pages:
+            yield (page.extract_text() or "") + "\n"
+            page.close()  # drop the parsed layout so memory does not grow with page count
+
+
+def _pdf_pypdf2(local_path: str) -> Iterator[str]:
+    from PyPDF2 import PdfReader
+    for page in PdfReader(local_path).pages:
+        yield (page.extract_text() or "") + "\n"
+
+
+def _docx_python_docx(local_path: str) -> Iterator[str]:
+    from docx import Document
+    for paragraph in Document(local_path).paragraphs:
+        yield paragraph.text + "\n"
+
+
+def _plain_text(local_path: str) -> Iterator[str]:
+    with open(local_path, "r", encoding="utf-8") as f:
+        while block := f.read(TEXT_BLOCK_SIZE):
+            yield block
+
+
+class ExtractedText(NamedTuple):
+    text: str
+    mime_type: str
+    backend: str
+    units: int  # pages (PDF), paragraphs (DOCX) or blocks (text)
+
+
+class ExtractionEngine:
+    """
+    Text extraction for every feature, with a registry of backends per MIME
+    type ("text/*" matches any text type). Output is normalized, so switching
+    backend does not change what redaction, caching and prompts see.
+    `extract_upload` keeps one result per upload (by SHA-256), so the
+    analysis, legacy summaries and chat all reuse a single extraction.
+    """
+
+    def __init__(self, cache_max_bytes: int = EXTRACTION_CACHE_MAX_BYTES, workers: WorkerPool | None = None):
+        self._backends: dict[str, dict[str, Callable[[str], Iterator[str]]]] = {}
+        self._defaults: dict[str, str] = {}
+        self.cache = LRUCache(cache_max_bytes)
+        self.workers = workers
+
+    def register(self, mime_type: str, name: str, backend: Callable[[str], Iterator[str]]):
+        """Adds a backend; the first one registered for a type is its default."""
+        self._backends.setdefault(mime_type, {})[name] = backend
+        self._defaults.setdefault(mime_type, name)
+
+    def set_default(self, mime_type: str, name: str):
+        if name not in self._backends.get(mime_type, {}):
+            raise ValueError(f"No extraction backend {name!r} for {mime_type}")
+        self._defaults[mime_type] = name
+
+    def _key(self, mime_type: str) -> str:
+        if mime_type in self._backends:
+            return mime_type
+        wildcard = mime_type.split("/")[0] + "/*"
+        if wildcard in self._backends:
+            return wildcard
+        raise ValueError(f"Unsupported file type: {mime_type}")
+
+    def default_backend(self, mime_type: str) -> str:
+        """The backend `extract` uses for this type when none is named (e.g. EXTRACTION_PDF_BACKEND for PDFs)."""
+        return self._defaults[self._key(mime_type)]
+
+    def backends(self, mime_type: str) -> list[str]:
+        return list(self._backends[self._key(mime_type)])
+
+    def supports(self, mime_type: str | None) -> bool:
+        try:
+            self._key(mime_type or "")
+            return True
+        except ValueError:
+            return False
+
+    def _backend(self, mime_type: str, name: str | None) -> tuple[str, Callable[[str], Iterator[str]]]:
+        key = self._key(mime_type)
+        name = name or self._defaults[key]
+        if name not in self._backends[key]:
+            raise ValueError(f"No extraction backend {name!r} for {mime_type}; available: {', '.join(self._backends[key])}")
+        return name, self._backends[key][name]
+
+    def iter_text(self, local_path: str, mime_type: str, backend: str | None = None) -> Iterator[str]:
+        """Normalized text one page/paragraph/block at a time, for streaming consumers."""
+        _, read = self._backend(mime_type, backend)
+        for unit in read(local_path):
+            yield normalize(unit)
+
+    def extract(self, local_path: str, mime_type: str, backend: str | None = None) -> ExtractedText:
+        name, _ = self._backend(mime_type, backend)
+        units = list(self.iter_text(local_path, mime_type, name))
+        return ExtractedText("".join(units), mime_type, name, len(units))
+
+    def extract_upload(self, upload, backend: str | None = None) -> ExtractedText:
+        """
+        The text of a core.uploads.SpooledUpload, extracted once per content
+        hash, in a worker process when the engine has a pool. Blocking.
+        """
+        name, _ = self._backend(upload.content_type, backend)
+        key = f"{upload.sha256}:{upload.content_type}:{name}"
+        result = self.cache.get(key)
+        if result is None:
+            if self.workers is not None:
+                result = self.workers.call(extract_file, upload.path, upload.content_type, name)
+            else:
+                result = self.extract(upload.path, upload.content_type, name)
+            self.cache.set(key, result, size=len(result.text))
+        return result
+
+
+def extract_file(local_path: str, mime_type: str, backend: str | None = None) -> ExtractedText:
+    """`extraction.extract` as a module-level function, for worker processes (which register the same backends on import)."""
+    return extraction.extract(local_path, mime_type, backend)
+
+
+extraction = ExtractionEngine(workers=worker_pool)
+extraction.register(PDF, "pymupdf", _pdf_pymupdf)
+extraction.register(PDF, "pdfplumber", _pdf_pdfplumber)
+extraction.register(PDF, "pypdf2", _pdf_pypdf2)
+extraction.set_default(PDF, EXTRACTION_PDF_BACKEND)  # PyMuPDF unless configured otherwise
+extraction.register(DOCX, "python-docx", _docx_python_docx)
+extraction.register("text/*", "text", _plain_text)
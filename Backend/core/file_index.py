@@ -0,0 +1,156 @@
+import base64
+import datetime
+import hashlib
+import threading
+
+from core.cache import TTLCache
+from core.clients import clients
+from core.config import FILE_INDEX_BACKEND, LISTING_CACHE_TTL, LISTING_CACHE_MAX_ENTRIES
+
+# Listings (/docs/{user_id}) cover docs/{user_id}/ in this bucket
+LISTED_BUCKET = "docquliobucket"
+
+# Fields stored for every file; listings may select a subset
+FILE_FIELDS = ("filename", "gcs_url", "content_type", "size", "content_sha256", "last_modified")
+
+
+def file_id(path: str) -> str:
+    """Stable index ID for a user-visible path, so re-uploading a filename replaces its entry."""
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()[:32]
+
+
+def _encode_token(value: str) -> str:
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+    except Exception:
+        raise ValueError("Invalid page token")
+
+
+class InMemoryFileIndex:
+    """File records kept in this process; for local runs and benchmarks."""
+
+    def __init__(self):
+        self._files: dict[str, dict[str, dict]] = {}
+        self._ready: set[str] = set()
+        self._lock = threading.Lock()
+
+    def upsert(self, user_id: str, entry_id: str, record: dict):
+        with self._lock:
+            self._files.setdefault(user_id, {})[entry_id] = dict(record)
+
+    def page(self, user_id: str, page_size: int, after: str | None) -> tuple[list[tuple[str, dict]], bool]:
+        with self._lock:
+            entries = sorted(self._files.get(user_id, {}).items(), key=lambda item: (item[1]["last_modified"], item[0]), reverse=True)
+        start = 0
+        if after is not None:
+            ids = [entry_id for entry_id, _ in entries]
+            if after not in ids:
+                raise ValueError("Invalid page token")
+            start = ids.index(after) + 1
+        window = entries[start:start + page_size + 1]
+        return window[:page_size], len(window) > page_size
+
+    def is_ready(self, user_id: str) -> bool:
+        return user_id in self._ready
+
+    def mark_ready(self, user_id: str):
+        self._ready.add(user_id)
+
+
+class FirestoreFileIndex:
+    """File records under users/{uid}/files/{file_id}, newest first by last_modified."""
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        # Resolved on first use so importing the index does not initialize Firebase
+        return self._db or clients.firestore()
+
+    def _files(self, user_id: str):
+        return self.db.collection("users").document(user_id).collection("files")
+
+    def upsert(self, user_id: str, entry_id: str, record: dict):
+        self._files(user_id).document(entry_id).set(record)
+
+    def page(self, user_id: str, page_size: int, after: str | None) -> tuple[list[tuple[str, dict]], bool]:
+        from google.cloud.firestore import Query
+        files = self._files(user_id)
+        query = files.order_by("last_modified", direction=Query.DESCENDING).limit(page_size + 1)
+        if after is not None:
+            cursor = files.document(after).get()
+            if not cursor.exists:
+                raise ValueError("Invalid page token")
+            query = query.start_after(cursor)
+        snapshots = list(query.stream())
+        return [(snapshot.id, snapshot.to_dict()) for snapshot in snapshots[:page_size]], len(snapshots) > page_size
+
+    def is_ready(self, user_id: str) -> bool:
+        snapshot = self.db.collection("users").document(user_id).get()
+        return bool(snapshot.exists and (snapshot.to_dict() or {}).get("files_index_ready"))
+
+    def mark_ready(self, user_id: str):
+        self.db.collection("users").document(user_id).set({"files_index_ready": True}, merge=True)
+
+
+class FileIndex:
+    """
+    Per-user index of stored files, written when a file is uploaded.
+    Listings read one page of the index (cost independent of how many files
+    a user has) through a short-TTL cache; an upload drops that user's
+    cached pages on this instance.
+    """
+
+    def __init__(self, store, ttl: float = LISTING_CACHE_TTL, max_entries: int = LISTING_CACHE_MAX_ENTRIES):
+        self.store = store
+        self.cache = TTLCache(ttl, max_entries)
+
+    def record(self, user_id: str, path: str, content_type: str, size: int, content_sha256: str, url: str, last_modified: datetime.datetime | None = None):
+        """Adds or replaces the entry for `path` (docs/{user_id}/{filename}). Blocking."""
+        self.store.upsert(user_id, file_id(path), {
+            "filename": path.split("/")[-1],
+            "gcs_url": url,
+            "content_type": content_type,
+            "size": size,
+            "content_sha256": content_sha256,
+            "last_modified": last_modified or datetime.datetime.now(datetime.timezone.utc),
+        })
+        self.cache.invalidate(user_id)
+
+    def list(self, user_id: str, page_size: int, page_token: str | None = None) -> tuple[list[dict], str | None]:
+        """One page of the user's files, newest first, and the token for the next page (None at the end). Blocking."""
+        cache_key = f"{page_size}:{page_token}"
+        cached = self.cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        after = _decode_token(page_token) if page_token else None
+        entries, more = self.store.page(user_id, page_size, after)
+        result = ([record for _, record in entries], _encode_token(entries[-1][0]) if more and entries else None)
+        self.cache.set(user_id, cache_key, result)
+        return result
+
+    def is_ready(self, user_id: str) -> bool:
+        return self.store.is_ready(user_id)
+
+    def mark_ready(self, user_id: str):
+        self.store.mark_ready(user_id)
+
+
+def _default_store():
+    if FILE_INDEX_BACKEND == "memory":
+        return InMemoryFileIndex()
+    return FirestoreFileIndex()
+
+
+# Shared by the upload paths (through ContentStore) and the media listing
+file_index = FileIndex(_default_store())
+
+
+def index_for_bucket(bucket_name: str | None) -> FileIndex | None:
+    """The index a ContentStore writing to `bucket_name` must record into: the file index for the listed bucket, else none."""
+    return file_index if bucket_name == LISTED_BUCKET else None
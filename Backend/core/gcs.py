@@ -1,25 +1,270 @@
-from google.cloud import storage
+import hashlib
+import io
+import json
+import logging
 import os
-from google.cloud import translate
+import pathlib
+import shutil
+import tempfile
+import threading
+from typing import BinaryIO, Callable, NamedTuple
 
-client = translate.TranslationServiceClient()
-
-# Use service account key locally if provided, else Cloud Run default credentials
-key_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-
-if key_path:
-    client = storage.Client.from_service_account_json(key_path)
-else:
-    client = storage.Client()  # Cloud Run automatically provides credentials
+from core.cache import LRUCache
+from core.clients import clients
+from core.config import GCS_CONTENT_PREFIX, GCS_KNOWN_OBJECTS_CACHE_BYTES, GCS_UPLOAD_CHUNK_SIZE
+from core.config import STORAGE_BACKEND, STORAGE_LOCAL_DIR, UPLOAD_CHUNK_SIZE
+from core.metrics import BYTES_IN, BYTES_OUT, stage
+from core.uploads import file_sha256
 
 def upload_file(local_path: str, bucket_name: str, destination_blob_name: str):
-    bucket = client.bucket(bucket_name)
+    bucket = clients.storage().bucket(bucket_name)
     blob = bucket.blob(destination_blob_name)
-    blob.upload_from_filename(local_path)
+    with stage("storage", "upload"):
+        blob.upload_from_filename(local_path)
+    BYTES_OUT.inc("storage", amount=os.path.getsize(local_path))
     return f"gs://{bucket_name}/{destination_blob_name}"
 
 def download_file(blob_name: str, bucket_name: str, local_path: str):
-    bucket = client.bucket(bucket_name)
+    bucket = clients.storage().bucket(bucket_name)
     blob = bucket.blob(blob_name)
-    blob.download_to_filename(local_path)
+    with stage("storage", "download"):
+        blob.download_to_filename(local_path)
+    BYTES_IN.inc("storage", amount=os.path.getsize(local_path))
     return local_path
+
+
+# Metadata keys on a filename pointer object
+CONTENT_HASH_KEY = "content_sha256"
+CONTENT_OBJECT_KEY = "content_object"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class StoredFile(NamedTuple):
+    """Where an upload ended up: the user-visible pointer and the shared content object."""
+    path: str            # docs/{user_id}/{filename}
+    content_object: str  # content/sha256/<hash>
+    content_hash: str
+    url: str             # public URL of the content object
+    uploaded: bool       # False when the bytes were already stored
+
+
+class GCSBackend:
+    """Objects in a GCS bucket. File bytes are sent as a resumable upload, one chunk at a time."""
+
+    def __init__(self, bucket_name: str, chunk_size: int = GCS_UPLOAD_CHUNK_SIZE):
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+
+    @property
+    def bucket(self):
+        return clients.storage().bucket(self.bucket_name)
+
+    def exists(self, name: str) -> bool:
+        return self.bucket.blob(name).exists()
+
+    def upload_if_absent(self, name: str, fileobj: BinaryIO, size: int, content_type: str) -> bool:
+        """Streams `fileobj` to `name` unless it exists; returns True when the bytes were sent."""
+        from google.api_core.exceptions import PreconditionFailed
+        # Files that fit in one chunk go up in a single request
+        blob = self.bucket.blob(name, chunk_size=self.chunk_size if size > self.chunk_size else None)
+        try:
+            # Generation 0 = only if absent: concurrent uploads of the same bytes store one object
+            blob.upload_from_file(fileobj, size=size, content_type=content_type, if_generation_match=0)
+            return True
+        except PreconditionFailed:
+            return False
+
+    def write_pointer(self, path: str, metadata: dict, content_type: str):
+        pointer = self.bucket.blob(path)
+        pointer.metadata = metadata
+        pointer.upload_from_string(b"", content_type=content_type)
+
+    def read_pointer(self, path: str) -> dict | None:
+        """Metadata of the object at `path`, or None when it does not exist."""
+        blob = self.bucket.get_blob(path)
+        return None if blob is None else (blob.metadata or {})
+
+    def download(self, name: str, local_path: str):
+        self.bucket.blob(name).download_to_filename(local_path)
+
+    def url(self, name: str) -> str:
+        return self.bucket.blob(name).public_url
+
+
+class LocalBackend:
+    """Objects as files under a local directory, pointers as JSON files; for local runs and benchmarks."""
+
+    def __init__(self, root: str = STORAGE_LOCAL_DIR, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def upload_if_absent(self, name: str, fileobj: BinaryIO, size: int, content_type: str) -> bool:
+        target = self._path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(target), delete=False) as tmp:
+            shutil.copyfileobj(fileobj, tmp, self.chunk_size)
+        try:
+            # Hard links fail if the target exists, like the GCS generation precondition
+            os.link(tmp.name, target)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp.name)
+
+    def write_pointer(self, path: str, metadata: dict, content_type: str):
+        target = self._path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump({**metadata, "content_type": content_type}, f)
+
+    def read_pointer(self, path: str) -> dict | None:
+        try:
+            with open(self._path(path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def download(self, name: str, local_path: str):
+        shutil.copyfile(self._path(name), local_path)
+
+    def url(self, name: str) -> str:
+        return pathlib.Path(self._path(name)).absolute().as_uri()
+
+
+def storage_backend(bucket_name: str):
+    """The backend selected by STORAGE_BACKEND ("gcs" or "local")."""
+    if STORAGE_BACKEND == "local":
+        return LocalBackend(os.path.join(STORAGE_LOCAL_DIR, bucket_name or "default"))
+    return GCSBackend(bucket_name)
+
+
+class ContentStore:
+    """
+    Content-addressed file storage.
+    File bytes live once, under `content/sha256/<hash>`; an upload whose hash
+    already exists sends nothing. The filename a user sees,
+    docs/{user_id}/{filename}, is a zero-byte pointer object whose metadata
+    names the content object, so listings by prefix keep working.
+    Content hashes known to exist are remembered in a small LRU, so repeat
+    uploads in the same process send no bytes; the pointer is read back
+    each time, since another instance may have repointed it.
+    Files are read from local paths in chunks; memory use does not depend on file size.
+    With an `index` (core.file_index.FileIndex), each new pointer is also
+    recorded there so listings need not walk the bucket.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str = GCS_CONTENT_PREFIX, known_max_bytes: int = GCS_KNOWN_OBJECTS_CACHE_BYTES, backend=None, index=None):
+        self.bucket_name = bucket_name
+        self.backend = backend or storage_backend(bucket_name)
+        self.index = index
+        self.prefix = prefix.strip("/")
+        self._known = LRUCache(known_max_bytes)
+        self.uploads = 0
+        self.dedup_hits = 0
+        self.bytes_uploaded = 0
+        self.bytes_skipped = 0
+        self._lock = threading.Lock()
+
+    def content_object(self, digest: str) -> str:
+        return f"{self.prefix}/sha256/{digest}"
+
+    @staticmethod
+    def pointer_path(user_id: str, filename: str) -> str:
+        return f"docs/{user_id}/{filename}"
+
+    def _ensure_content(self, open_file: Callable[[], BinaryIO], size: int, digest: str, content_type: str) -> bool:
+        """Uploads the bytes unless the object exists; returns True when they were sent."""
+        name = self.content_object(digest)
+        if self._known.get(name):
+            return False
+        uploaded = False
+        if not self.backend.exists(name):
+            with open_file() as fileobj:
+                uploaded = self.backend.upload_if_absent(name, fileobj, size, content_type)
+        self._known.set(name, True, size=len(name))
+        return uploaded
+
+    def _write_pointer(self, path: str, digest: str, content_type: str) -> bool:
+        """Points `path` at the content object; returns False when the stored pointer already did."""
+        # Checked against storage, not a local cache: other instances write the same pointers
+        current = self.backend.read_pointer(path)
+        if current is not None and current.get(CONTENT_HASH_KEY) == digest:
+            return False
+        self.backend.write_pointer(path, {CONTENT_HASH_KEY: digest, CONTENT_OBJECT_KEY: self.content_object(digest)}, content_type)
+        return True
+
+    def _record(self, user_id: str, path: str, digest: str, size: int, content_type: str, url: str):
+        try:
+            self.index.record(user_id, path, content_type, size, digest, url)
+        except Exception as e:
+            # The upload itself succeeded; only the listing misses this file
+            logging.error(f"Failed to index {path}: {e}")
+
+    def _store(self, user_id: str, filename: str, open_file: Callable[[], BinaryIO], size: int, digest: str, content_type: str) -> StoredFile:
+        path = self.pointer_path(user_id, filename)
+        url = self.backend.url(self.content_object(digest))
+        with stage("storage", "put"):
+            uploaded = self._ensure_content(open_file, size, digest, content_type)
+            if self._write_pointer(path, digest, content_type) and self.index is not None:
+                self._record(user_id, path, digest, size, content_type, url)
+
+        with self._lock:
+            if uploaded:
+                self.uploads += 1
+                self.bytes_uploaded += size
+                BYTES_OUT.inc("storage", amount=size)
+            else:
+                self.dedup_hits += 1
+                self.bytes_skipped += size
+        if not uploaded:
+            logging.info(f"Skipped upload of {path}: content {digest[:12]} already stored")
+        return StoredFile(path, self.content_object(digest), digest, url, uploaded)
+
+    def put(self, user_id: str, filename: str, data: bytes, content_type: str) -> StoredFile:
+        """Stores in-memory `data` as the user's `filename`. Blocking; run it with asyncio.to_thread."""
+        return self._store(user_id, filename, lambda: io.BytesIO(data), len(data), content_hash(data), content_type)
+
+    def put_file(self, user_id: str, filename: str, local_path: str, content_type: str, digest: str | None = None, size: int | None = None) -> StoredFile:
+        """
+        Stores the file at `local_path` as the user's `filename`, reading it in chunks.
+        Pass `digest` and `size` when already known (see core.uploads.SpooledUpload). Blocking.
+        """
+        if digest is None or size is None:
+            digest, size = file_sha256(local_path)
+        return self._store(user_id, filename, lambda: open(local_path, "rb"), size, digest, content_type)
+
+    def resolve(self, blob) -> str:
+        """Name of the object holding a listed blob's bytes (itself unless it is a pointer)."""
+        return (blob.metadata or {}).get(CONTENT_OBJECT_KEY) or blob.name
+
+    def url_for(self, blob) -> str:
+        return self.backend.url(self.resolve(blob))
+
+    def download(self, path: str, local_path: str) -> str:
+        """Downloads the user's file at `path` (a pointer or a plain object) to `local_path`."""
+        metadata = self.backend.read_pointer(path)
+        if metadata is None:
+            raise FileNotFoundError(f"{self.bucket_name}/{path}")
+        with stage("storage", "download"):
+            self.backend.download(metadata.get(CONTENT_OBJECT_KEY) or path, local_path)
+        BYTES_IN.inc("storage", amount=os.path.getsize(local_path))
+        return local_path
+
+    def stats(self) -> dict:
+        return {
+            "uploads": self.uploads,
+            "dedup_hits": self.dedup_hits,
+            "bytes_uploaded": self.bytes_uploaded,
+            "bytes_skipped": self.bytes_skipped,
+            "known_objects": len(self._known),
+        }
@@ -0,0 +1,357 @@
+import asyncio
+import datetime
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from core.clients import clients
+from core.config import JOB_STORE_BACKEND, JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TIMEOUT, JOB_POLL_INTERVAL, JOB_RETENTION, JOB_ARTIFACT_BUCKET
+
+# Job lifecycle, stored in the job's `status` field
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETE = "complete"
+JOB_FAILED = "failed"
+TERMINAL_STATUSES = (JOB_COMPLETE, JOB_FAILED)
+
+# Firestore documents are capped at 1 MiB; larger artifacts go to Cloud Storage
+MAX_FIRESTORE_ARTIFACT_BYTES = 900 * 1024
+
+# A finished job's full result is stored as this artifact; the job record keeps a summary
+RESULT_ARTIFACT = "result.json"
+# Result fields copied into the job record's `result_summary` (short scalars only)
+MAX_SUMMARY_VALUE_CHARS = 256
+
+
+class JobQueueFull(Exception):
+    """Raised by `submit` when the bounded queue has no room left."""
+
+
+class JobNotFound(Exception):
+    pass
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+class InMemoryJobStore:
+    """Jobs and artifacts kept in this process; for local runs and testing."""
+
+    def __init__(self, retention: float = JOB_RETENTION):
+        self.retention = retention
+        self._jobs: dict[str, dict] = {}
+        self._artifacts: dict[tuple[str, str], tuple[bytes, str]] = {}
+        self._finished_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention
+        for job_id in [j for j, t in self._finished_at.items() if t < cutoff]:
+            self._jobs.pop(job_id, None)
+            self._finished_at.pop(job_id, None)
+            for key in [k for k in self._artifacts if k[0] == job_id]:
+                del self._artifacts[key]
+
+    def create(self, job: dict):
+        with self._lock:
+            self._prune()
+            self._jobs[job["job_id"]] = dict(job)
+
+    def update(self, job_id: str, user_id: str, fields: dict):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+            if fields.get("status") in TERMINAL_STATUSES:
+                self._finished_at[job_id] = time.monotonic()
+
+    def get(self, job_id: str, user_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job and job["user_id"] == user_id else None
+
+    def put_artifact(self, job_id: str, user_id: str, name: str, data: bytes, content_type: str):
+        with self._lock:
+            self._artifacts[(job_id, name)] = (data, content_type)
+            self._jobs[job_id]["artifacts"] = {**self._jobs[job_id].get("artifacts", {}), name: content_type}
+
+    def get_artifact(self, job_id: str, user_id: str, name: str) -> tuple[bytes, str] | None:
+        with self._lock:
+            if self._jobs.get(job_id, {}).get("user_id") != user_id:
+                return None
+            return self._artifacts.get((job_id, name))
+
+
+class FirestoreJobStore:
+    """
+    Jobs stored under users/{uid}/jobs/{job_id}, next to users/{uid}/documents,
+    with results and PDF reports in an `artifacts` subcollection. Artifacts
+    over the Firestore document limit are written to `bucket_name` as
+    jobs/{uid}/{job_id}/{name}, and the subcollection keeps a reference.
+    """
+
+    def __init__(self, db=None, bucket_name: str = JOB_ARTIFACT_BUCKET):
+        self._db = db
+        self.bucket_name = bucket_name
+
+    @property
+    def db(self):
+        # Resolved on first use so importing the store does not initialize Firebase
+        return self._db or clients.firestore()
+
+    def _blob(self, job_id: str, user_id: str, name: str):
+        return clients.storage().bucket(self.bucket_name).blob(f"jobs/{user_id}/{job_id}/{name}")
+
+    def _ref(self, job_id: str, user_id: str):
+        return self.db.collection("users").document(user_id).collection("jobs").document(job_id)
+
+    def create(self, job: dict):
+        self._ref(job["job_id"], job["user_id"]).set(job)
+
+    def update(self, job_id: str, user_id: str, fields: dict):
+        self._ref(job_id, user_id).update(fields)
+
+    def get(self, job_id: str, user_id: str) -> dict | None:
+        snapshot = self._ref(job_id, user_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def put_artifact(self, job_id: str, user_id: str, name: str, data: bytes, content_type: str):
+        ref = self._ref(job_id, user_id).collection("artifacts").document(name)
+        if len(data) > MAX_FIRESTORE_ARTIFACT_BYTES:
+            blob = self._blob(job_id, user_id, name)
+            blob.upload_from_string(data, content_type=content_type)
+            ref.set({"gcs_object": blob.name, "content_type": content_type})
+        else:
+            ref.set({"data": data, "content_type": content_type})
+        self._ref(job_id, user_id).update({f"artifacts.{name}": content_type})
+
+    def get_artifact(self, job_id: str, user_id: str, name: str) -> tuple[bytes, str] | None:
+        snapshot = self._ref(job_id, user_id).collection("artifacts").document(name).get()
+        if not snapshot.exists:
+            return None
+        value = snapshot.to_dict()
+        if "gcs_object" in value:
+            return self._blob(job_id, user_id, name).download_as_bytes(), value["content_type"]
+        return value["data"], value["content_type"]
+
+
+def result_summary(result: Any) -> dict:
+    """The short scalar fields of a result (ids, filenames, status), for the job record."""
+    if not isinstance(result, dict):
+        return {}
+    return {
+        key: value for key, value in result.items()
+        if isinstance(value, (str, int, float, bool, type(None))) and len(str(value)) <= MAX_SUMMARY_VALUE_CHARS
+    }
+
+
+class JobContext:
+    """Handed to a job handler to report progress and save binary results."""
+
+    def __init__(self, queue: "JobQueue", job: dict):
+        self._queue = queue
+        self.job_id = job["job_id"]
+        self.user_id = job["user_id"]
+        self.stages = job.get("stages", [])
+
+    async def progress(self, stage: str):
+        """Marks `stage` as the one now running."""
+        done = self.stages.index(stage) if stage in self.stages else 0
+        await self._queue._update(self.job_id, self.user_id, {
+            "stage": stage,
+            "progress": round(done / len(self.stages), 2) if self.stages else 0.0,
+        })
+
+    async def save_artifact(self, name: str, data: bytes, content_type: str):
+        await asyncio.to_thread(self._queue.store.put_artifact, self.job_id, self.user_id, name, data, content_type)
+
+
+JobHandler = Callable[[JobContext, dict], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Background processing for long document pipelines.
+    `submit` stores the job and returns at once; a pool of worker tasks takes
+    jobs off a bounded asyncio.Queue, runs the handler registered for the
+    job's kind and records status, stage and result in the store. Watchers
+    are woken on every change made by this process, and fall back to polling
+    the store for jobs another instance is running.
+
+    Jobs are executed by the instance that accepted them; on Cloud Run the
+    service needs CPU allocated outside requests for workers to progress.
+    """
+
+    def __init__(self, store, workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_SIZE, timeout: float = JOB_TIMEOUT):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.timeout = timeout
+        self.handlers: dict[str, tuple[JobHandler, list[str]]] = {}
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._changed: dict[str, asyncio.Event] = {}
+
+    def register(self, kind: str, handler: JobHandler, stages: list[str]):
+        """Declares how jobs of `kind` run and the stage names they report."""
+        self.handlers[kind] = (handler, stages)
+
+    def _start(self):
+        # Started lazily so the queue and workers bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, kind: str, user_id: str, payload: dict, meta: dict | None = None) -> dict:
+        """
+        Queues a job and returns its record. `payload` stays in memory; `meta` is stored.
+        Payload values with a `close` method (e.g. a SpooledUpload) are closed once the job ends or is dropped.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self._start()
+        if self._queue.full():
+            raise JobQueueFull(f"{self._queue.qsize()} jobs already queued")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "user_id": user_id,
+            "status": JOB_QUEUED,
+            "stage": None,
+            "stages": self.handlers[kind][1],
+            "progress": 0.0,
+            "meta": meta or {},
+            "result_artifact": None,
+            "result_summary": None,
+            "error": None,
+            "artifacts": {},
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        await asyncio.to_thread(self.store.create, job)
+        try:
+            self._queue.put_nowait((job, payload))
+        except asyncio.QueueFull:
+            await self._update(job["job_id"], user_id, {"status": JOB_FAILED, "error": "Job queue is full"})
+            raise JobQueueFull(f"{self._queue.qsize()} jobs already queued")
+        return job
+
+    async def get(self, job_id: str, user_id: str) -> dict | None:
+        return await asyncio.to_thread(self.store.get, job_id, user_id)
+
+    async def get_artifact(self, job_id: str, user_id: str, name: str) -> tuple[bytes, str] | None:
+        return await asyncio.to_thread(self.store.get_artifact, job_id, user_id, name)
+
+    async def watch(self, job_id: str, user_id: str) -> AsyncIterator[dict]:
+        """Yields the job each time it changes, ending once it is complete or failed."""
+        last = None
+        while True:
+            event = self._changed.setdefault(job_id, asyncio.Event())
+            job = await self.get(job_id, user_id)
+            if job is None:
+                raise JobNotFound(job_id)
+            snapshot = (job.get("status"), job.get("stage"), job.get("progress"))
+            if snapshot != last:
+                last = snapshot
+                yield job
+            if job.get("status") in TERMINAL_STATUSES:
+                self._changed.pop(job_id, None)
+                return
+            try:
+                await asyncio.wait_for(event.wait(), timeout=JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+
+    async def _update(self, job_id: str, user_id: str, fields: dict):
+        fields = {**fields, "updated_at": _now()}
+        await asyncio.to_thread(self.store.update, job_id, user_id, fields)
+        event = self._changed.get(job_id)
+        if event is not None:
+            event.set()
+
+    async def _run(self, job: dict, payload: dict):
+        handler, _ = self.handlers[job["kind"]]
+        job_id, user_id = job["job_id"], job["user_id"]
+        await self._update(job_id, user_id, {"status": JOB_RUNNING, "started_at": _now()})
+        try:
+            result = await asyncio.wait_for(handler(JobContext(self, job), payload), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            await self._update(job_id, user_id, {"status": JOB_FAILED, "error": f"Timed out after {self.timeout}s"})
+        except Exception as e:
+            logging.error(f"Job {job_id} ({job['kind']}) failed: {e}", exc_info=True)
+            error = getattr(e, "detail", None) or str(e) or type(e).__name__
+            await self._update(job_id, user_id, {"status": JOB_FAILED, "error": error})
+        else:
+            try:
+                # The full result can exceed a Firestore document (e.g. redacted text); it is kept as an artifact
+                data = json.dumps(result, default=str).encode("utf-8")
+                await asyncio.to_thread(self.store.put_artifact, job_id, user_id, RESULT_ARTIFACT, data, "application/json")
+                await self._update(job_id, user_id, {
+                    "status": JOB_COMPLETE,
+                    "progress": 1.0,
+                    "result_artifact": RESULT_ARTIFACT,
+                    "result_summary": result_summary(result),
+                    "finished_at": _now(),
+                })
+            except Exception as e:
+                await self._update(job_id, user_id, {"status": JOB_FAILED, "error": f"Could not store the job result: {e}"})
+        finally:
+            self._changed.pop(job_id, None)
+
+    async def _worker(self):
+        while True:
+            job, payload = await self._queue.get()
+            try:
+                await self._run(job, payload)
+            except Exception as e:
+                # Store writes failing must not take the worker down
+                logging.error(f"Job worker error on {job['job_id']}: {e}")
+            finally:
+                # Handlers normally release these themselves; this covers jobs that failed before their handler ran
+                _release_payload(job, payload)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "kinds": sorted(self.handlers),
+        }
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            # Jobs that never ran still own their payload's resources (e.g. upload spool files)
+            while not self._queue.empty():
+                job, payload = self._queue.get_nowait()
+                _release_payload(job, payload)
+        self._queue = None
+
+
+def _release_payload(job: dict, payload: dict):
+    """Closes the payload values that hold resources, such as a core.uploads.SpooledUpload."""
+    for value in payload.values():
+        close = getattr(value, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logging.error(f"Could not release the payload of job {job['job_id']}: {e}")
+
+
+def _default_store():
+    if JOB_STORE_BACKEND == "memory":
+        return InMemoryJobStore()
+    return FirestoreJobStore()
+
+
+# Shared queue; features register their handlers at import time
+job_queue = JobQueue(_default_store())
@@ -0,0 +1,162 @@
+import base64
+import json
+from typing import AsyncIterator
+import httpx
+from core.metrics import LLM_TOKENS, stage
+from core.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_BASE_URL,
+    LLM_CONNECT_TIMEOUT,
+    LLM_READ_TIMEOUT,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+class GeminiError(Exception):
+    """Raised when the Gemini API returns an error or an unusable response."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _to_part(item) -> dict:
+    """Convert a prompt item into a Gemini REST `part`."""
+    if isinstance(item, str):
+        return {"text": item}
+    if isinstance(item, dict) and "data" in item:
+        # Same shape the google.generativeai SDK accepts: {'mime_type': ..., 'data': bytes}
+        return {
+            "inline_data": {
+                "mime_type": item["mime_type"],
+                "data": base64.b64encode(item["data"]).decode("ascii"),
+            }
+        }
+    if isinstance(item, dict):
+        return item
+    raise TypeError(f"Unsupported prompt part: {type(item).__name__}")
+
+
+class GeminiClient:
+    """
+    Async Gemini REST client shared by every feature.
+    One pooled `httpx.AsyncClient` keeps TLS connections alive between calls,
+    so concurrent requests on a worker never block each other.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = GEMINI_API_KEY,
+        model: str = GEMINI_MODEL,
+        base_url: str = GEMINI_BASE_URL,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        read_timeout: float = LLM_READ_TIMEOUT,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_MAX_KEEPALIVE_CONNECTIONS,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Built lazily so the client binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits)
+        return self._client
+
+    def _url(self, method: str, model: str | None = None) -> str:
+        return f"{self.base_url}/models/{model or self.model}:{method}"
+
+    def _payload(self, contents, generation_config: dict | None) -> dict:
+        if not isinstance(contents, (list, tuple)):
+            contents = [contents]
+        payload = {"contents": [{"role": "user", "parts": [_to_part(c) for c in contents]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        return payload
+
+    async def generate(self, contents, generation_config: dict | None = None, model: str | None = None) -> str:
+        """Send a prompt (string or list of parts) and return the response text."""
+        try:
+            with stage("gemini", "generate"):
+                response = await self.http.post(
+                    self._url("generateContent", model),
+                    params={"key": self.api_key},
+                    json=self._payload(contents, generation_config),
+                )
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Gemini API request failed: {e}") from e
+
+        if response.status_code != 200:
+            raise GeminiError(
+                f"Gemini API request failed: {response.status_code}, {response.text}",
+                status_code=response.status_code,
+            )
+
+        result = response.json()
+        self._record_usage(result)
+        return self._text_of(result)
+
+    @staticmethod
+    def _record_usage(result: dict):
+        usage = result.get("usageMetadata") or {}
+        LLM_TOKENS.inc("prompt", amount=usage.get("promptTokenCount", 0))
+        LLM_TOKENS.inc("response", amount=usage.get("candidatesTokenCount", 0))
+
+    @staticmethod
+    def _text_of(result: dict) -> str:
+        candidates = result.get("candidates") or []
+        if not candidates:
+            raise GeminiError(f"Gemini API returned no candidates: {result.get('promptFeedback')}")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def stream_generate(self, contents, generation_config: dict | None = None, model: str | None = None) -> AsyncIterator[str]:
+        """Like `generate`, but yields text fragments as Gemini produces them (server-sent events)."""
+        usage = {}
+        try:
+            async with self.http.stream(
+                "POST",
+                self._url("streamGenerateContent", model),
+                params={"key": self.api_key, "alt": "sse"},
+                json=self._payload(contents, generation_config),
+            ) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise GeminiError(
+                        f"Gemini API request failed: {response.status_code}, {body}",
+                        status_code=response.status_code,
+                    )
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    result = json.loads(line[len("data:"):])
+                    # Each event repeats the running usage; the last one is the total
+                    usage = result.get("usageMetadata") or usage
+                    if not result.get("candidates"):
+                        continue  # e.g. a final usage-only event
+                    text = self._text_of(result)
+                    if text:
+                        yield text
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Gemini API request failed: {e}") from e
+        finally:
+            self._record_usage({"usageMetadata": usage})
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Single instance imported by the routers and services
+gemini_client = GeminiClient()
@@ -0,0 +1,225 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Prometheus text exposition format served by GET /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits through multi-minute LLM pipelines
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items]
+
+
+class Counter(_Metric):
+    """Monotonic total per label set: `counter.inc("verify", amount=len(data))`."""
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Current value per label set (e.g. requests in flight)."""
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets; cumulative counts are built only when scraped."""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts (last one is +Inf), sum]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackCounter(_Metric):
+    """
+    Counter read from existing stats at scrape time, so hot paths that already
+    count (cache hits and misses) pay nothing extra. Each source returns
+    {label values: total}.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        super().__init__(name, description, labelnames)
+        self._sources: list[Callable[[], dict[tuple, float]]] = []
+
+    def source(self, fn: Callable[[], dict[tuple, float]]):
+        self._sources.append(fn)
+
+    def samples(self) -> list[str]:
+        lines = []
+        for fn in list(self._sources):
+            for labels, value in fn().items():
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, description, labelnames))
+
+    def histogram(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, description, labelnames, buckets))
+
+    def callback_counter(self, name: str, description: str, labelnames: tuple = ()) -> CallbackCounter:
+        return self._add(CallbackCounter(name, description, labelnames))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Document pipelines ---
+STAGE_SECONDS = registry.histogram("docqulio_stage_seconds", "Time spent in each pipeline stage", ("pipeline", "stage"))
+STAGE_ERRORS = registry.counter("docqulio_stage_errors_total", "Pipeline stages that raised", ("pipeline", "stage"))
+IN_FLIGHT = registry.gauge("docqulio_in_flight", "Pipeline calls currently running", ("pipeline",))
+BYTES_IN = registry.counter("docqulio_bytes_in_total", "Bytes received by a pipeline (uploads, downloads)", ("pipeline",))
+BYTES_OUT = registry.counter("docqulio_bytes_out_total", "Bytes produced by a pipeline (stored files, reports, replies)", ("pipeline",))
+LLM_TOKENS = registry.counter("docqulio_llm_tokens_total", "Gemini tokens as reported by usageMetadata", ("kind",))
+OCR_PAGES = registry.counter("docqulio_ocr_pages_total", "Document pages read, by where their text came from", ("source",))
+CACHE_LOOKUPS = registry.callback_counter("docqulio_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+
+
+class stage:
+    """
+    Times a block into docqulio_stage_seconds{pipeline, stage}; a block that
+    raises is also counted in docqulio_stage_errors_total.
+
+        with stage("verify", "ocr"):
+            pages = await self.ocr.extract_pdf(content)
+    """
+    __slots__ = ("labels", "start")
+
+    def __init__(self, pipeline: str, name: str):
+        self.labels = (pipeline, name)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(*self.labels, value=time.perf_counter() - self.start)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(*self.labels)
+
+
+def instrumented(pipeline: str):
+    """
+    Decorator for a pipeline's entry point (sync or async): counts it in
+    docqulio_in_flight while it runs and times it as stage "total".
+    """
+    def decorate(fn):
+        if not inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                IN_FLIGHT.inc(pipeline)
+                try:
+                    with stage(pipeline, "total"):
+                        return fn(*args, **kwargs)
+                finally:
+                    IN_FLIGHT.dec(pipeline)
+            return wrapper
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            IN_FLIGHT.inc(pipeline)
+            try:
+                with stage(pipeline, "total"):
+                    return await fn(*args, **kwargs)
+            finally:
+                IN_FLIGHT.dec(pipeline)
+        return async_wrapper
+    return decorate
@@ -0,0 +1,134 @@
+import re
+from typing import Iterable, Iterator, NamedTuple
+
+
+class RedactionSpan(NamedTuple):
+    start: int
+    end: int
+    type: str
+
+
+class RedactionResult(NamedTuple):
+    text: str
+    spans: list[RedactionSpan]
+
+
+# --- Detectors, in priority order (earlier wins when two match at the same position) ---
+# Every detector must start with a character from FIRST_CHARS; the scanner
+# uses that to skip ordinary prose without trying each alternative.
+DEFAULT_DETECTORS = {
+    # Matched from the "@" and widened left over the local part in `scan`
+    "email": r"@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "aadhaar": r"\b\d{4}\s\d{4}\s\d{4}\b",
+    "phone": r"\b\d{10}\b",
+    "pincode": r"\b\d{6}\b",  # Indian postal codes
+    "pan": r"\b[A-Z]{5}\d{4}[A-Z]\b",
+    "house_no": r"(?:\b(?:Flat|House|Plot|No\.?)|#)\s?\d+[A-Za-z0-9/-]*\b",
+    # Up to three capitalised words before the street keyword, e.g. "MG Road"
+    "street": r"\b(?:[A-Z][\w.'-]*\s+){0,3}(?:Street|St|Road|Rd|Nagar|Colony|Avenue|Ave|Lane|Ln|Block)\b",
+}
+FIRST_CHARS = "0-9A-Z#@"
+
+# Streaming: text held back at each chunk boundary (longer than any realistic match),
+# and already-emitted characters kept so word boundaries still see their left neighbour
+STREAM_OVERLAP = 256
+STREAM_CONTEXT = 64
+
+_EMAIL_LOCAL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-")
+
+
+class RedactionEngine:
+    """
+    Single-pass PII scanner.
+    All detectors are compiled into one alternation of named groups, so the
+    text is scanned once and every span is reported against the original input.
+    """
+
+    def __init__(self, detectors: dict[str, str] = DEFAULT_DETECTORS, placeholder: str = "[HIDDEN]", first_chars: str | None = FIRST_CHARS):
+        self.detectors = dict(detectors)
+        self.placeholder = placeholder
+        combined = "|".join(f"(?P<{name}>{pattern})" for name, pattern in self.detectors.items())
+        # The leading lookahead lets the regex engine jump straight to candidate characters
+        if first_chars:
+            combined = f"(?=[{first_chars}])(?:{combined})"
+        self._scanner = re.compile(combined)
+        # A detector may wrap the part to hide in a `<name>_value` group, so a
+        # label such as "DOB:" is matched for context but left in the text
+        self._value_groups = {name: f"{name}_value" for name in self.detectors if f"{name}_value" in self._scanner.groupindex}
+
+    def scan(self, text: str, pos: int = 0) -> list[RedactionSpan]:
+        """Returns the non-overlapping sensitive spans in `text[pos:]`."""
+        spans = []
+        last_end = pos
+        for match in self._scanner.finditer(text, pos):
+            start, end, kind = match.start(), match.end(), match.lastgroup
+            if kind in self._value_groups:
+                start, end = match.span(self._value_groups[kind])
+            if kind == "email":
+                while start > last_end and text[start - 1] in _EMAIL_LOCAL_CHARS:
+                    start -= 1
+                if spans and spans[-1].end == start and text[start - 1] in _EMAIL_LOCAL_CHARS:
+                    # The local part runs into the previous span (e.g. the phone number
+                    # in "9876543210@gmail.com"): widen that span over the whole address
+                    spans[-1] = RedactionSpan(spans[-1].start, end, kind)
+                    last_end = end
+                    continue
+                if start == match.start():
+                    continue  # "@domain" with no local part is not an address
+            spans.append(RedactionSpan(start, end, kind))
+            last_end = end
+        return spans
+
+    def apply(self, text: str, spans: list[RedactionSpan], start: int = 0, end: int | None = None) -> str:
+        """Replaces the given spans with the placeholder in `text[start:end]`."""
+        parts = []
+        pos = start
+        for span in spans:
+            parts.append(text[pos:span.start])
+            parts.append(self.placeholder)
+            pos = span.end
+        parts.append(text[pos:end])
+        return "".join(parts)
+
+    def redact(self, text: str) -> RedactionResult:
+        spans = self.scan(text)
+        return RedactionResult(self.apply(text, spans), spans)
+
+    def redact_stream(self, chunks: Iterable[str], overlap: int = STREAM_OVERLAP) -> Iterator[str]:
+        """
+        Redacts text arriving in chunks (e.g. one PDF page at a time).
+        The last `overlap` characters of each chunk are held back until the next
+        one arrives, so a match split across a boundary is still found whole.
+        Memory stays bounded by the largest chunk plus the overlap.
+        """
+        buffer = ""
+        pos = 0  # start of not-yet-emitted text; buffer[:pos] is context only
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer += chunk
+            safe = len(buffer) - overlap
+            if safe <= pos:
+                continue
+
+            cut = safe
+            emitted = []
+            for span in self.scan(buffer, pos):
+                if span.start >= safe:
+                    break
+                if span.end >= safe:
+                    # Straddles or touches the cut (an address may continue it): keep it for the next round
+                    cut = span.start
+                    break
+                emitted.append(span)
+            yield self.apply(buffer, emitted, pos, cut)
+
+            context_start = max(0, cut - STREAM_CONTEXT)
+            buffer = buffer[context_start:]
+            pos = cut - context_start
+
+        yield self.apply(buffer, self.scan(buffer, pos), pos)
+
+
+# Shared default engine
+redactor = RedactionEngine()
@@ -0,0 +1,220 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+
+from core.chunking import split_into_chunks
+from core.config import RETRIEVAL_INDEX_DIR, RETRIEVAL_PASSAGE_TOKENS, RETRIEVAL_TOP_K, RETRIEVAL_MAX_LOADED_USERS
+
+# Okapi BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words, including the combining vowel signs of Indic scripts (Devanagari through Malayalam)
+_WORD = re.compile(r"[\w\u0900-\u0d7f]+")
+# Question words and glue that would otherwise match every passage
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its me my of on or "
+    "our so that the their there this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+class Passage(NamedTuple):
+    filename: str
+    text: str
+    score: float = 0.0
+
+
+class UserIndex:
+    """
+    BM25 over one user's passages. Postings are arrays of passage ids and
+    term counts; a replaced document's passages are left as tombstones
+    (text None) until the index is next loaded from disk.
+    """
+
+    def __init__(self):
+        self.docs: dict[str, tuple[str, range]] = {}  # filename -> (content sha256, passage ids)
+        self.texts: list[str | None] = []
+        self.sources: list[str] = []
+        self.lengths = array("I")
+        self.postings: dict[str, tuple[array, array]] = {}
+        self.live_passages = 0
+        self.live_tokens = 0
+        self.lock = threading.Lock()
+
+    def add(self, filename: str, sha256: str, passages: list[str]):
+        self.remove(filename)
+        first = len(self.texts)
+        for passage in passages:
+            passage_id = len(self.texts)
+            terms = tokenize(passage)
+            self.texts.append(passage)
+            self.sources.append(filename)
+            self.lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                ids, counts = self.postings.setdefault(term, (array("I"), array("I")))
+                ids.append(passage_id)
+                counts.append(count)
+            self.live_passages += 1
+            self.live_tokens += len(terms)
+        self.docs[filename] = (sha256, range(first, len(self.texts)))
+
+    def remove(self, filename: str):
+        entry = self.docs.pop(filename, None)
+        if entry is None:
+            return
+        for passage_id in entry[1]:
+            self.texts[passage_id] = None
+            self.live_passages -= 1
+            self.live_tokens -= self.lengths[passage_id]
+
+    def search(self, query: str, k: int) -> list[Passage]:
+        terms = set(tokenize(query))
+        if not terms or not self.live_passages:
+            return []
+        average_length = self.live_tokens / self.live_passages or 1
+        has_tombstones = self.live_passages < len(self.texts)
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            live = list(zip(*postings))
+            if has_tombstones:
+                live = [(passage_id, count) for passage_id, count in live if self.texts[passage_id] is not None]
+            if not live:
+                continue
+            idf = math.log(1 + (self.live_passages - len(live) + 0.5) / (len(live) + 0.5))
+            for passage_id, count in live:
+                norm = 1 - BM25_B + BM25_B * self.lengths[passage_id] / average_length
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [Passage(self.sources[passage_id], self.texts[passage_id], score) for passage_id, score in best]
+
+    def passages(self, filename: str) -> list[Passage]:
+        """Every passage of a document, in order."""
+        entry = self.docs.get(filename)
+        if entry is None:
+            return []
+        return [Passage(filename, self.texts[passage_id]) for passage_id in entry[1]]
+
+
+class RetrievalIndex:
+    """
+    Per-user BM25 indexes of redacted document text, so chat can send the
+    passages relevant to a question instead of whole documents, across
+    everything the user has uploaded.
+
+    Each user's files live in `directory/<hash of user id>/`: one JSON file
+    of passages per distinct document content and a manifest mapping
+    filenames to content hashes. A filename indexed again with new content
+    replaces the old passages; the same content again is a no-op. Indexes
+    are loaded on first use and the `max_users` most recently used stay in
+    memory.
+    """
+
+    def __init__(
+        self,
+        directory: str = RETRIEVAL_INDEX_DIR,
+        passage_tokens: int = RETRIEVAL_PASSAGE_TOKENS,
+        max_users: int = RETRIEVAL_MAX_LOADED_USERS,
+    ):
+        self.directory = directory
+        self.passage_tokens = passage_tokens
+        self.max_users = max(1, max_users)
+        self._loaded: OrderedDict[str, UserIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user_dir(self, user_id: str) -> str:
+        # User ids are hashed so they are always safe path components
+        return os.path.join(self.directory, hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32])
+
+    def _read_json(self, path: str, default):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def _write_json(self, path: str, value):
+        # Write-then-rename so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _load(self, user_id: str) -> UserIndex:
+        with self._lock:
+            index = self._loaded.get(user_id)
+            if index is not None:
+                self._loaded.move_to_end(user_id)
+                return index
+        index = UserIndex()
+        user_dir = self._user_dir(user_id)
+        for filename, sha256 in self._read_json(os.path.join(user_dir, "manifest.json"), {}).items():
+            stored = self._read_json(os.path.join(user_dir, f"{sha256}.json"), None)
+            if stored is None:
+                logging.warning(f"Retrieval index for {user_id} lists {filename} but its passages are missing")
+                continue
+            index.add(filename, sha256, stored["passages"])
+        with self._lock:
+            # Another request may have loaded the same user meanwhile; keep the first
+            index = self._loaded.setdefault(user_id, index)
+            self._loaded.move_to_end(user_id)
+            while len(self._loaded) > self.max_users:
+                self._loaded.popitem(last=False)
+        return index
+
+    def add(self, user_id: str, filename: str, text: str) -> bool:
+        """Indexes a document's (redacted) text; False when this exact text is already indexed under `filename`. Blocking."""
+        sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        index = self._load(user_id)
+        with index.lock:
+            previous = index.docs.get(filename)
+            if previous is not None and previous[0] == sha256:
+                return False
+            passages = [passage for passage in split_into_chunks(text, self.passage_tokens) if passage.strip()]
+            index.add(filename, sha256, passages)
+            manifest = {name: entry[0] for name, entry in index.docs.items()}
+            try:
+                user_dir = self._user_dir(user_id)
+                os.makedirs(user_dir, exist_ok=True)
+                self._write_json(os.path.join(user_dir, f"{sha256}.json"), {"passages": passages})
+                self._write_json(os.path.join(user_dir, "manifest.json"), manifest)
+                if previous is not None and previous[0] not in manifest.values():
+                    os.remove(os.path.join(user_dir, f"{previous[0]}.json"))
+            except OSError as e:
+                # Still searchable from memory; it is lost when this process restarts
+                logging.error(f"Could not save the retrieval index of {user_id}: {e}")
+        return True
+
+    def search(self, user_id: str, query: str, k: int = RETRIEVAL_TOP_K) -> list[Passage]:
+        """The `k` passages across the user's documents that best match `query`, best first. Blocking."""
+        index = self._load(user_id)
+        with index.lock:
+            return index.search(query, k)
+
+    def document(self, user_id: str, filename: str) -> list[Passage]:
+        """All passages of one of the user's documents, in order; empty if it is not indexed. Blocking."""
+        index = self._load(user_id)
+        with index.lock:
+            return index.passages(filename)
+
+    def documents(self, user_id: str) -> list[str]:
+        index = self._load(user_id)
+        with index.lock:
+            return list(index.docs)
+
+
+retrieval_index = RetrievalIndex()
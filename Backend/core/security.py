@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from core.clients import clients
+from core.config import AUTH_CHECK_REVOKED, AUTH_REVOCATION_CHECK_SECONDS, AUTH_TOKEN_CACHE_MAX_ENTRIES
+from core.metrics import CACHE_LOOKUPS
+
+
+class FirebaseTokenBackend:
+    """
+    Verification through the Firebase Admin SDK: signature, expiry, audience and issuer.
+    The SDK fetches Google's signing certificates through a cache-control aware
+    session, so keys are only refetched when their max-age runs out.
+    """
+
+    def verify(self, id_token: str, check_revoked: bool = False) -> dict:
+        return clients.auth().verify_id_token(id_token, check_revoked=check_revoked)
+
+
+class LocalKeyTokenBackend:
+    """
+    Stand-in for Firebase that signs and verifies ID tokens with a local RSA key,
+    for tests and benchmarks; no network or service account needed.
+    """
+
+    def __init__(self, project_id: str = "local-project"):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from google.auth import crypt
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+        public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        self.project_id = project_id
+        self.signer = crypt.RSASigner.from_string(private_pem, key_id="local")
+        self.certs = {"local": public_pem}
+        self.revoked: set[str] = set()
+        self.verifications = 0
+
+    def issue(self, uid: str, lifetime: int = 3600, **claims) -> str:
+        """A signed ID token for `uid`, valid for `lifetime` seconds."""
+        from google.auth import jwt
+        now = int(time.time())
+        payload = {
+            "iss": f"https://securetoken.google.com/{self.project_id}",
+            "aud": self.project_id,
+            "sub": uid,
+            "uid": uid,
+            "iat": now,
+            "auth_time": now,
+            "exp": now + lifetime,
+            **claims,
+        }
+        return jwt.encode(self.signer, payload).decode("utf-8")
+
+    def revoke(self, uid: str):
+        self.revoked.add(uid)
+
+    def verify(self, id_token: str, check_revoked: bool = False) -> dict:
+        from google.auth import jwt
+        self.verifications += 1
+        claims = jwt.decode(id_token, certs=self.certs, audience=self.project_id)
+        if claims.get("iss") != f"https://securetoken.google.com/{self.project_id}":
+            raise ValueError("Token has an incorrect issuer")
+        if check_revoked and claims["sub"] in self.revoked:
+            raise ValueError("The Firebase ID token has been revoked")
+        return claims
+
+
+class _Entry(NamedTuple):
+    claims: dict
+    expires_at: float     # the token's exp
+    checked_at: float     # last revocation check
+
+
+class TokenVerifier:
+    """
+    ID-token verification with a cache keyed by the token's SHA-256.
+    A verified token is served from memory until its `exp`, so repeat requests
+    skip the signature check. Like a plain `verify_id_token`, revocation is not
+    checked unless `check_revoked` is set (AUTH_CHECK_REVOKED), since that is a
+    round trip to Firebase; then the first verification checks it and a cached
+    token is verified again every `revocation_check_seconds` (0 = first use
+    only). Concurrent first requests for the same token share one
+    verification. Failures are not cached.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        check_revoked: bool = AUTH_CHECK_REVOKED,
+        revocation_check_seconds: float = AUTH_REVOCATION_CHECK_SECONDS,
+        max_entries: int = AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    ):
+        self.backend = backend or FirebaseTokenBackend()
+        self.check_revoked = check_revoked
+        self.revocation_check_seconds = revocation_check_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, _Entry] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+    def _fresh(self, entry: _Entry | None, now: float) -> bool:
+        if entry is None or now >= entry.expires_at:
+            return False
+        if not self.check_revoked or not self.revocation_check_seconds:
+            return True
+        return now - entry.checked_at < self.revocation_check_seconds
+
+    def verify(self, id_token: str) -> dict:
+        """Decoded claims (uid, email, ...) of a valid token; raises like the Firebase SDK otherwise. Blocking."""
+        key = self._key(id_token)
+        now = time.time()
+        entry = self._entries.get(key)
+        if self._fresh(entry, now):
+            self.hits += 1
+            return dict(entry.claims)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return dict(future.result())
+
+        try:
+            claims = self.backend.verify(id_token, check_revoked=self.check_revoked)
+            self.misses += 1
+            self._store(key, _Entry(claims, float(claims["exp"]), time.time()))
+            future.set_result(claims)
+            return dict(claims)
+        except BaseException as e:
+            self._entries.pop(key, None)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: str, entry: _Entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                now = time.time()
+                for expired in [k for k, e in self._entries.items() if e.expires_at <= now]:
+                    del self._entries[expired]
+                while len(self._entries) > self.max_entries:
+                    # Oldest insertion first
+                    del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "cached_tokens": len(self._entries)}
+
+
+# Shared by the auth dependency and /auth/login
+token_verifier = TokenVerifier()
+CACHE_LOOKUPS.source(lambda: {("id_token", "hit"): token_verifier.hits, ("id_token", "miss"): token_verifier.misses})
@@ -0,0 +1,139 @@
+import hashlib
+import re
+import threading
+
+from core.cache import LRUCache
+from core.clients import clients
+from core.config import TRANSLATION_CACHE_MAX_BYTES, TRANSLATE_MAX_REQUEST_CHARS, TRANSLATE_MAX_SEGMENTS
+
+# Segments end after sentence punctuation (including the Devanagari danda) or at line breaks;
+# the captured separator is kept so the translated text has the same layout
+_SEGMENT_BOUNDARY = re.compile(r"((?<=[.!?।])[ \t]+|[ \t]*\n\s*)")
+# Segments with nothing to translate (numbers, bullets, punctuation) are passed through
+_HAS_LETTERS = re.compile(r"[^\W\d_]")
+
+
+def split_segments(text: str, max_chars: int = TRANSLATE_MAX_REQUEST_CHARS) -> list[str]:
+    """
+    Splits text into alternating [segment, separator, segment, ...] pieces.
+    Joining the list gives back the input; no segment is longer than `max_chars`.
+    """
+    pieces = []
+    for index, piece in enumerate(_SEGMENT_BOUNDARY.split(text)):
+        if index % 2 or len(piece) <= max_chars:
+            pieces.append(piece)
+            continue
+        # One enormous sentence: cut at the last space before the limit
+        while len(piece) > max_chars:
+            cut = piece.rfind(" ", 0, max_chars)
+            if cut > 0:
+                pieces.extend([piece[:cut], " "])
+                piece = piece[cut + 1:]
+            else:
+                pieces.extend([piece[:max_chars], ""])
+                piece = piece[max_chars:]
+        pieces.append(piece)
+    return pieces
+
+
+class SegmentTranslator:
+    """
+    Sentence/paragraph-level translation with an LRU cache.
+    Each segment is looked up by (SHA-256 of the segment, target language);
+    only misses are sent to the Translation API, de-duplicated and grouped
+    into requests of at most `max_request_chars` characters and
+    `max_segments` segments, then reassembled in order.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_bytes: int = TRANSLATION_CACHE_MAX_BYTES,
+        max_request_chars: int = TRANSLATE_MAX_REQUEST_CHARS,
+        max_segments: int = TRANSLATE_MAX_SEGMENTS,
+    ):
+        self._client = client
+        self.cache = LRUCache(max_bytes)
+        self.max_request_chars = max_request_chars
+        self.max_segments = max_segments
+        self.hits = 0
+        self.misses = 0
+        self.chars_billed = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # The shared Translation client unless one was passed in; built on first translation
+        return self._client or clients.translate()
+
+    @staticmethod
+    def _key(segment: str, target_language: str) -> str:
+        return f"{target_language}:{hashlib.sha256(segment.encode('utf-8')).hexdigest()}"
+
+    def _batches(self, segments: list[str]):
+        batch, size = [], 0
+        for segment in segments:
+            if batch and (size + len(segment) > self.max_request_chars or len(batch) == self.max_segments):
+                yield batch
+                batch, size = [], 0
+            batch.append(segment)
+            size += len(segment)
+        if batch:
+            yield batch
+
+    def translate(self, text: str, target_language: str) -> str:
+        """Blocking; raises if a Translation API request fails."""
+        if not text or not target_language:
+            return text
+        pieces = split_segments(text, self.max_request_chars)
+
+        translated: dict[str, str] = {}
+        missing: list[str] = []
+        seen = set()
+        hits = misses = 0
+        for index in range(0, len(pieces), 2):
+            segment = pieces[index]
+            if segment in seen or not _HAS_LETTERS.search(segment):
+                continue
+            seen.add(segment)
+            cached = self.cache.get(self._key(segment, target_language))
+            if cached is not None:
+                translated[segment] = cached
+                hits += 1
+            else:
+                missing.append(segment)
+                misses += 1
+
+        billed = requests = 0
+        for batch in self._batches(missing):
+            results = self.client.translate(batch, target_language=target_language, format_="text")
+            requests += 1
+            billed += sum(len(segment) for segment in batch)
+            for segment, result in zip(batch, results):
+                translated[segment] = result["translatedText"]
+                self.cache.set(self._key(segment, target_language), result["translatedText"])
+
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.chars_billed += billed
+            self.requests += requests
+
+        return "".join(
+            translated.get(piece, piece) if index % 2 == 0 else piece
+            for index, piece in enumerate(pieces)
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "segment_hits": self.hits,
+            "segment_misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "chars_billed": self.chars_billed,
+            "requests": self.requests,
+            "cache_entries": len(self.cache),
+            "cache_bytes": self.cache.current_bytes,
+            "cache_max_bytes": self.cache.max_bytes,
+        }
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+
+from core.config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES, UPLOAD_SPOOL_DIR
+
+
+class SpooledUpload:
+    """
+    An upload copied to a local spool file, with its size and SHA-256.
+    Extraction and storage read the spool file in chunks, so nothing holds
+    the whole file in memory. `close` (or leaving a `with` block) deletes it.
+    """
+
+    def __init__(self, path: str, filename: str, content_type: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+
+    def open(self):
+        return open(self.path, "rb")
+
+    def read_bytes(self) -> bytes:
+        """The whole file; only for APIs that take the bytes inline (Gemini, Vision)."""
+        with self.open() as f:
+            return f.read()
+
+    def close(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    spool_dir: str | None = UPLOAD_SPOOL_DIR,
+) -> SpooledUpload:
+    """
+    Copies an upload to a spool file `chunk_size` bytes at a time, hashing as it goes.
+    Raises 413 as soon as the upload passes `max_bytes`; the partial file is removed.
+    """
+    suffix = os.path.splitext(file.filename or "")[1]
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=spool_dir) as tmp:
+        try:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File is larger than the upload limit of {max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return SpooledUpload(tmp.name, file.filename, file.content_type, size, digest.hexdigest())
+
+
+def file_sha256(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> tuple[str, int]:
+    """(SHA-256, size) of a local file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
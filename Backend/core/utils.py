@@ -1,15 +1,19 @@
-import os
-from PyPDF2 import PdfReader
-from docx import Document
+import mimetypes
+
+from core.extraction import DOCX, extraction
+
+
+def _mime_type(local_path):
+    if local_path.lower().endswith((".docx", ".doc")):
+        return DOCX
+    mime_type = mimetypes.guess_type(local_path)[0]
+    return mime_type if extraction.supports(mime_type) else "text/plain"  # anything else is read as text
+
+
+def iter_file_content(local_path):
+    """Yield a file's text one page/paragraph at a time instead of building one big string"""
+    return extraction.iter_text(local_path, _mime_type(local_path))
+
 
 def read_file_content(local_path):
-    ext = os.path.splitext(local_path)[1].lower()
-    if ext == ".pdf":
-        reader = PdfReader(local_path)
-        return "\n".join([page.extract_text() for page in reader.pages])
-    elif ext in [".docx", ".doc"]:
-        doc = Document(local_path)
-        return "\n".join([p.text for p in doc.paragraphs])
-    else:
-        with open(local_path, "r", encoding="utf-8") as f:
-            return f.read()
+    return "".join(iter_file_content(local_path))
@@ -0,0 +1,165 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from core.config import WORKER_PROCESSES, WORKER_MAX_TASKS_PER_CHILD, WORKER_MAX_PENDING, WORKER_TASK_TIMEOUT
+
+
+def _preload(modules: tuple[str, ...]):
+    for name in modules:
+        importlib.import_module(name)
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound functions (PDF/DOCX parsing, page rendering, ReportLab)
+    in a pool of worker processes, so they use every core and never hold the
+    API process's GIL. Functions and their arguments must be picklable:
+    module-level functions taking paths, bytes or plain objects.
+
+    - At most `max_pending` tasks are queued or running; more are refused
+      with 503 instead of piling up.
+    - A task that runs past its timeout fails with 504 and the workers are
+      restarted, since a running task cannot be cancelled. Other tasks lost
+      with them are retried once.
+    - Each worker is replaced after `max_tasks_per_child` tasks, so memory
+      leaked by a parser is given back.
+    - With `processes=0` tasks run on a thread of this process instead.
+
+    The pool starts with its first task, or with `start`. Workers are
+    spawned, not forked, so they never inherit the gRPC/HTTP client threads
+    of the API process.
+    """
+
+    def __init__(
+        self,
+        processes: int = WORKER_PROCESSES,
+        max_tasks_per_child: int = WORKER_MAX_TASKS_PER_CHILD,
+        max_pending: int = WORKER_MAX_PENDING,
+        timeout: float = WORKER_TASK_TIMEOUT,
+    ):
+        self.processes = max(0, processes)
+        self.max_tasks_per_child = max(1, max_tasks_per_child)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor, reason: str):
+        """Kills `executor`'s workers; the next task starts a fresh pool."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # already replaced by another task
+            self._executor = None
+            self.restarts += 1
+        logging.warning(f"Restarting worker processes: {reason}")
+        # There is no public way to stop a running task, so its process is terminated
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable, args: tuple) -> tuple[ProcessPoolExecutor, Future]:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server is busy: {self.max_pending} processing tasks already pending",
+                headers={"Retry-After": "5"},
+            )
+        try:
+            executor = self._pool()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._restart(executor, "a worker process died")
+                executor = self._pool()
+                future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return executor, future
+
+    def _timed_out(self, executor: ProcessPoolExecutor, fn: Callable, timeout: float) -> HTTPException:
+        self._restart(executor, f"{fn.__name__} ran for more than {timeout}s")
+        return HTTPException(status_code=504, detail=f"Processing took longer than {timeout} seconds")
+
+    def call(self, fn: Callable, *args, timeout: float | None = None) -> Any:
+        """Blocking; for code that already runs on a thread (e.g. via asyncio.to_thread)."""
+        if not self.processes:
+            return fn(*args)
+        timeout = timeout or self.timeout
+        for attempt in (1, 2):
+            executor, future = self._submit(fn, args)
+            try:
+                return future.result(timeout=timeout)
+            except TimeoutError:
+                raise self._timed_out(executor, fn, timeout)
+            except BrokenProcessPool:
+                self._restart(executor, "a worker process died")
+                if attempt == 2:
+                    raise
+                logging.warning(f"Worker process lost while running {fn.__name__}; retrying once")
+
+    async def run(self, fn: Callable, *args, timeout: float | None = None) -> Any:
+        """`call` for the event loop: awaits the task without blocking the loop or a thread."""
+        if not self.processes:
+            return await asyncio.to_thread(fn, *args)
+        timeout = timeout or self.timeout
+        for attempt in (1, 2):
+            executor, future = self._submit(fn, args)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except TimeoutError:
+                raise self._timed_out(executor, fn, timeout)
+            except BrokenProcessPool:
+                self._restart(executor, "a worker process died")
+                if attempt == 2:
+                    raise
+                logging.warning(f"Worker process lost while running {fn.__name__}; retrying once")
+
+    def start(self, preload: tuple[str, ...] = (), wait: bool = False):
+        """Starts every worker now, importing the `preload` modules, rather than with the first tasks."""
+        if not self.processes:
+            return
+        executor = self._pool()
+        futures = [executor.submit(_preload, preload) for _ in range(self.processes)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def stats(self) -> dict:
+        executor = self._executor
+        return {
+            "processes": self.processes,
+            "workers_alive": len(executor._processes or {}) if executor else 0,
+            "pending": self.max_pending - self._slots._value,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+worker_pool = WorkerPool()
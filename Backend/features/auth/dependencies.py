@@ -1,5 +1,5 @@
 from fastapi import Depends, HTTPException, Header
-from firebase_admin import auth
+from core.security import token_verifier
 
 def get_current_user(authorization: str = Header(...)):
     """
@@ -11,7 +11,7 @@ def get_current_user(authorization: str = Header(...)):
             raise HTTPException(status_code=401, detail="Invalid authorization header format")
 
         id_token = authorization.split(" ")[1]
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = token_verifier.verify(id_token)  # cached until the token expires
         return decoded_token  # contains uid, email, etc.
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token ❌")
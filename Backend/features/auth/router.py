@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from .schemas import SignUpRequest, AuthResponse
 from .service import create_user, get_custom_token
-from firebase_admin import auth
+from core.security import token_verifier
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -29,7 +29,7 @@ def login(payload: LoginRequest):
     to get this idToken and send it here.
     """
     try:
-        decoded_token = auth.verify_id_token(payload.id_token)
+        decoded_token = token_verifier.verify(payload.id_token)
         uid = decoded_token["uid"]
         email = decoded_token.get("email")
         return {"msg": "User authenticated ✅", "uid": uid, "email": email}
@@ -1,22 +1,21 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi.responses import StreamingResponse
+from core.uploads import spool_upload
 from . import service, schemas
 
 router = APIRouter()
 
-@router.post("/chat", response_model=schemas.ChatResponse)
-async def chat_endpoint(
-    user_id: str = Form(...),   # ✅ NEW: Accept user_id
-    prompt: str = Form(...),
-    target_language: schemas.Language | None = Form(None),
-    file: UploadFile | None = File(None)
-):
+
+async def _prepare_inputs(user_id: str, prompt: str, target_language: schemas.Language | None, file: UploadFile | None):
     """
-    Handles chat interactions. The user can submit a text prompt with or without a file.
-    Files are stored in GCS under docs/{user_id}/{filename}.
+    Validates, stores and indexes the upload, then retrieves the passages of
+    the user's documents relevant to `prompt`; returns (language_code,
+    passages, file_data, mime_type).
     """
-    document_text = None
     file_data = None
     mime_type = None
+    attached = None
 
     # --- Convert the user-friendly language name to a two-letter code ---
     language_code = None
@@ -36,25 +35,47 @@ async def chat_endpoint(
                 detail="Unsupported file type. Supported types are PDF, DOCX, PNG, JPEG."
             )
 
-        mime_type = file.content_type
-        file_data = await file.read()
+        # ✅ Stream to a spool file in chunks (size-limited), then store into GCS under docs/{user_id}/{filename}
+        with await spool_upload(file) as upload:
+            gcs_url = await asyncio.to_thread(service.upload_file_to_gcs, user_id, upload)
 
-        # ✅ Store file into GCS under docs/{user_id}/{filename}
-        gcs_url = service.upload_file_to_gcs(user_id, file.filename, file_data, mime_type)
+            # DOCX and PDFs with a text layer join the user's retrieval index; only relevant passages are sent
+            indexed = False
+            if not file.content_type.startswith("image/"):
+                indexed = await asyncio.to_thread(service.index_upload, user_id, upload)
+            if indexed:
+                attached = upload.filename
+            else:
+                # Images and scanned PDFs are sent to Gemini inline, so only they are read into memory
+                mime_type = file.content_type
+                file_data = upload.read_bytes()
 
-        if file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            # Extract text for AI
-            document_text = service.extract_text_from_file(file)
-            file_data = None
-            mime_type = None
+    # Earlier uploads are searched too, so questions about them need no re-upload
+    passages = await asyncio.to_thread(service.retrieve_passages, user_id, prompt, attached)
+    return language_code, passages, file_data, mime_type
+
+
+@router.post("/chat", response_model=schemas.ChatResponse)
+async def chat_endpoint(
+    user_id: str = Form(...),   # ✅ NEW: Accept user_id
+    prompt: str = Form(...),
+    target_language: schemas.Language | None = Form(None),
+    file: UploadFile | None = File(None)
+):
+    """
+    Handles chat interactions. The user can submit a text prompt with or without a file.
+    Files are stored in GCS under docs/{user_id}/{filename}; the prompt is answered
+    from the passages of all the user's documents that match it.
+    """
+    language_code, passages, file_data, mime_type = await _prepare_inputs(user_id, prompt, target_language, file)
 
     try:
-        response_text = service.generate_chat_response(
+        response_text = await service.generate_chat_response(
             prompt=prompt,
-            document_text=document_text,
             file_data=file_data,
             mime_type=mime_type,
-            target_language=language_code
+            target_language=language_code,
+            passages=passages
         )
         return schemas.ChatResponse(response=response_text)
     except HTTPException as e:
@@ -64,3 +85,36 @@ async def chat_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(
+    user_id: str = Form(...),
+    prompt: str = Form(...),
+    target_language: schemas.Language | None = Form(None),
+    file: UploadFile | None = File(None)
+):
+    """
+    Same inputs as /chat, answered as Server-Sent Events: `token` events as
+    Gemini writes (translated sentence by sentence when target_language is
+    set), then `metrics` with time to first token, then `done`.
+    """
+    language_code, passages, file_data, mime_type = await _prepare_inputs(user_id, prompt, target_language, file)
+
+    return StreamingResponse(
+        service.stream_chat_response(
+            prompt=prompt,
+            file_data=file_data,
+            mime_type=mime_type,
+            target_language=language_code,
+            passages=passages
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chat/translation/stats")
+async def translation_stats():
+    """Segment cache hit ratio and characters sent to the Translation API"""
+    return service.translator.stats()
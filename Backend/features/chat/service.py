@@ -1,45 +1,44 @@
 import os
-import io
-import docx
-import google.generativeai as genai
-from fastapi import HTTPException, UploadFile, status
-from PIL import Image
-from pypdf import PdfReader
-from google.cloud import translate_v2 as translate
-from google.cloud import storage  # ✅ For GCS
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import AsyncIterator
+from fastapi import HTTPException, status
+from core.config import GEMINI_API_KEY, RETRIEVAL_TOP_K, RETRIEVAL_FULL_DOCUMENT_TOKENS
+from core.chunking import estimate_tokens
+from core.file_index import index_for_bucket
+from core.gcs import ContentStore  # ✅ For GCS
+from core.uploads import SpooledUpload
+from core.extraction import DOCX, extraction
+from core.llm import gemini_client
+from core.redaction import redactor
+from core.retrieval import Passage, retrieval_index
+from core.translation import SegmentTranslator
+from core.metrics import BYTES_IN, BYTES_OUT, CACHE_LOOKUPS, instrumented, stage
 
 # --- AI Configuration ---
-try:
-    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-    model = genai.GenerativeModel('gemini-1.5-flash')
-except KeyError:
+if not GEMINI_API_KEY:
     raise RuntimeError("GEMINI_API_KEY environment variable not set.")
 
-# --- Initialize the Translation client ---
-try:
-    translate_client = translate.Client()
-except Exception as e:
-    raise RuntimeError(f"Failed to initialize Google Translate client. Ensure authentication is configured. Error: {str(e)}")
+# Sentence-level cache in front of the Translation client: repeated boilerplate is translated once per language
+translator = SegmentTranslator()
+CACHE_LOOKUPS.source(lambda: {("translation", "hit"): translator.hits, ("translation", "miss"): translator.misses})
 
-# --- Initialize the GCS client ---
-try:
-    storage_client = storage.Client()
-    bucket_name = os.environ.get("GCS_BUCKET_NAME")  # ✅ set in your env
-    bucket = storage_client.bucket(bucket_name)
-except Exception as e:
-    raise RuntimeError(f"Failed to initialize GCS client. Error: {str(e)}")
+bucket_name = os.environ.get("GCS_BUCKET_NAME")  # ✅ set in your env
+# Attachments are stored once per content hash; re-sending a file uploads nothing.
+# In the listed bucket they are recorded in the file index, so /docs/{user_id} shows them
+content_store = ContentStore(bucket_name, index=index_for_bucket(bucket_name))
 
 
-def upload_file_to_gcs(user_id: str, filename: str, file_data: bytes, content_type: str) -> str:
+def upload_file_to_gcs(user_id: str, upload: SpooledUpload) -> str:
     """
-    Uploads file to Google Cloud Storage in path docs/{user_id}/{filename}.
+    Stores file in Google Cloud Storage as docs/{user_id}/{filename}, streamed from its spool file.
     Returns the public GCS URL.
     """
     try:
-        blob_path = f"docs/{user_id}/{filename}"
-        blob = bucket.blob(blob_path)
-        blob.upload_from_string(file_data, content_type=content_type)
-        return blob.public_url
+        return content_store.put_file(user_id, upload.filename, upload.path, upload.content_type, upload.sha256, upload.size).url
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -47,18 +46,47 @@ def upload_file_to_gcs(user_id: str, filename: str, file_data: bytes, content_ty
         )
 
 
-def extract_text_from_file(file: UploadFile) -> str:
-    """Extracts text from a DOCX file."""
+def index_upload(user_id: str, upload: SpooledUpload) -> bool:
+    """
+    Adds the upload's redacted text to the user's retrieval index (see core/retrieval.py).
+    Returns False when a PDF has no text layer, so the caller sends the file itself.
+    """
     try:
-        file.file.seek(0)
-        doc = docx.Document(io.BytesIO(file.file.read()))
-        file.file.seek(0)
-        return "\n".join([para.text for para in doc.paragraphs])
+        text = extraction.extract_upload(upload).text
     except Exception as e:
+        if upload.content_type != DOCX:
+            logging.warning(f"Could not extract text from {upload.filename}; sending the file inline: {e}")
+            return False
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process DOCX file: {str(e)}"
         )
+    if not text.strip():
+        return False
+    retrieval_index.add(user_id, upload.filename, redactor.redact(text).text)
+    return True
+
+
+def retrieve_passages(user_id: str, prompt: str, attached: str | None = None) -> list[Passage]:
+    """
+    The passages of the user's documents most relevant to `prompt`.
+    A question sent with a file is about that file, so when the file fits in
+    RETRIEVAL_FULL_DOCUMENT_TOKENS it is sent whole (e.g. for "summarize
+    this"), followed by matches from the user's other documents. A longer
+    file contributes its matching passages; when none match, passages spread
+    evenly from its start to its end are sent instead of unrelated ones.
+    """
+    passages = retrieval_index.search(user_id, prompt)
+    if not attached:
+        return passages
+    document = retrieval_index.document(user_id, attached)
+    if sum(estimate_tokens(passage.text) for passage in document) <= RETRIEVAL_FULL_DOCUMENT_TOKENS:
+        return document + [passage for passage in passages if passage.filename != attached]
+    if not any(passage.filename == attached for passage in passages):
+        count = max(1, RETRIEVAL_TOP_K // 2)
+        spread = [document[i * (len(document) - 1) // max(1, count - 1)] for i in range(count)]
+        passages = spread + passages[:RETRIEVAL_TOP_K - len(spread)]
+    return passages
 
 
 def translate_text(text: str, target_language: str) -> str:
@@ -66,58 +94,163 @@ def translate_text(text: str, target_language: str) -> str:
     if not text or not target_language:
         return text
     try:
-        result = translate_client.translate(text, target_language=target_language)
-        return result['translatedText']
+        return translator.translate(text, target_language)
     except Exception as e:
-        print(f"Warning: Translation to '{target_language}' failed: {str(e)}")
+        logging.warning(f"Translation to '{target_language}' failed, replying untranslated: {str(e)}")
         return text
 
 
-def generate_chat_response(
-    prompt: str,
-    document_text: str | None = None,
-    file_data: bytes | None = None,
-    mime_type: str | None = None,
-    target_language: str | None = None
-) -> str:
-    """
-    Generates a response from the Gemini AI based on the user prompt and optional context.
-    """
-    system_prompt = """
+# A sentence is complete at ., !, ? or the Devanagari danda followed by whitespace, or at a line break
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u0964])\s+|\n")
+
+SYSTEM_PROMPT = """
     You are 'Doqulio', a friendly and helpful AI legal assistant. Your main goal is to demystify complex legal jargon and answer legal questions for users.
 
     1. **If a document is provided:** Analyze and summarize it. Generate a detailed report with key findings. Assess authenticity as a percentage. Highlight clauses needing attention.
-    2. **If NO document is provided:** Answer the user's question directly in clear, simple language.
+    2. **If excerpts from the user's documents are provided:** They are the passages most relevant to the question, not whole documents. Answer from them and name the file each fact comes from.
+    3. **If NO document is provided:** Answer the user's question directly in clear, simple language.
 
     Always be friendly and professional.
     """
 
-    contents = [system_prompt]
+
+def format_passages(passages: list[Passage]) -> str:
+    return "\n".join(f"[{passage.filename}]\n{passage.text.strip()}\n" for passage in passages)
+
+
+def build_chat_contents(
+    prompt: str,
+    document_text: str | None = None,
+    file_data: bytes | None = None,
+    mime_type: str | None = None,
+    passages: list[Passage] | None = None
+) -> list:
+    """Prompt parts for one chat turn: system prompt, optional document or retrieved passages, the question."""
+    contents = [SYSTEM_PROMPT]
 
     if document_text:
         contents.append(f"--- DOCUMENT CONTEXT ---\n{document_text}\n--- END OF DOCUMENT ---\n")
+
+    if passages:
+        contents.append(f"--- EXCERPTS FROM THE USER'S DOCUMENTS ---\n{format_passages(passages)}--- END OF EXCERPTS ---\n")
     
     if file_data and mime_type:
-        if "image" in mime_type:
-            contents.append(Image.open(io.BytesIO(file_data)))
-        elif "pdf" in mime_type:
+        # Images and PDFs are sent inline; Gemini reads both natively
+        if "image" in mime_type or "pdf" in mime_type:
             contents.append({
                 'mime_type': mime_type,
                 'data': file_data
             })
 
     contents.append(f"User's question: {prompt}")
+    return contents
+
+
+@instrumented("chat")
+async def generate_chat_response(
+    prompt: str,
+    document_text: str | None = None,
+    file_data: bytes | None = None,
+    mime_type: str | None = None,
+    target_language: str | None = None,
+    passages: list[Passage] | None = None
+) -> str:
+    """
+    Generates a response from the Gemini AI based on the user prompt and optional context.
+    """
+    contents = build_chat_contents(prompt, document_text, file_data, mime_type, passages)
+    BYTES_IN.inc("chat", amount=len(file_data or b"") + len((document_text or "").encode("utf-8")))
 
     try:
-        response = model.generate_content(contents)
-        generated_text = response.text
+        with stage("chat", "llm"):
+            generated_text = await gemini_client.generate(contents)
 
         if target_language:
-            return translate_text(generated_text, target_language)
-        
+            with stage("chat", "translation"):
+                generated_text = await asyncio.to_thread(translate_text, generated_text, target_language)
+
+        BYTES_OUT.inc("chat", amount=len(generated_text.encode("utf-8")))
         return generated_text
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Error communicating with AI service: {str(e)}"
         )
+
+
+def split_complete_sentences(buffer: str) -> tuple[str, str]:
+    """Splits `buffer` into (complete sentences, unfinished remainder)."""
+    last_end = 0
+    for match in SENTENCE_BOUNDARY.finditer(buffer):
+        last_end = match.end()
+    return buffer[:last_end], buffer[last_end:]
+
+
+async def _translate_keeping_whitespace(text: str, target_language: str) -> str:
+    # The Translation API trims whitespace, which would glue sentences and lines together
+    stripped = text.strip()
+    if not stripped:
+        return text
+    leading = text[:len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()):]
+    translated = await asyncio.to_thread(translate_text, stripped, target_language)
+    return f"{leading}{translated}{trailing}"
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_chat_response(
+    prompt: str,
+    document_text: str | None = None,
+    file_data: bytes | None = None,
+    mime_type: str | None = None,
+    target_language: str | None = None,
+    passages: list[Passage] | None = None
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of `generate_chat_response`, as server-sent events.
+    `token` events carry text as Gemini produces it; with a target language
+    each sentence is translated as soon as it is complete. A final `metrics`
+    event reports time to first token and total time, then `done`; failures
+    mid-stream end with an `error` event.
+    """
+    contents = build_chat_contents(prompt, document_text, file_data, mime_type, passages)
+    started = time.perf_counter()
+    first_token_ms = None
+    chars = 0
+    buffer = ""
+
+    async def emit(text: str) -> str:
+        nonlocal first_token_ms, chars
+        if first_token_ms is None:
+            first_token_ms = (time.perf_counter() - started) * 1000
+        chars += len(text)
+        return sse_event("token", {"text": text})
+
+    try:
+        async for fragment in gemini_client.stream_generate(contents):
+            if not target_language:
+                yield await emit(fragment)
+                continue
+            buffer += fragment
+            complete, buffer = split_complete_sentences(buffer)
+            if complete:
+                yield await emit(await _translate_keeping_whitespace(complete, target_language))
+        if buffer:
+            yield await emit(await _translate_keeping_whitespace(buffer, target_language) if target_language else buffer)
+    except Exception as e:
+        logging.error(f"Chat stream failed: {e}")
+        yield sse_event("error", {"detail": f"Error communicating with AI service: {str(e)}"})
+        return
+
+    total_ms = (time.perf_counter() - started) * 1000
+    logging.info(f"Chat stream: time to first token {first_token_ms or 0:.0f}ms, total {total_ms:.0f}ms, {chars} chars")
+    yield sse_event("metrics", {
+        "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+        "total_ms": round(total_ms, 1),
+        "chars": chars,
+        "translated": bool(target_language),
+    })
+    yield sse_event("done", {})
@@ -1,50 +1,67 @@
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from PyPDF2 import PdfReader
-from core.config import GEMINI_API_KEY
-from .service import parse_and_redact, process_document, upload_file_to_gcs
-import requests
-import tempfile
-import os
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
+from core.config import ANALYZE_MAX_CONCURRENCY, ANALYZE_TIMEOUT, ANALYSIS_MODE
+from core.config import ANALYSIS_CHUNK_TOKENS, ANALYSIS_MAP_CONCURRENCY
+from core.chunking import split_into_chunks, map_reduce
+from core.cache import analysis_cache_key
+from core.concurrency import gather_settled
+from core.llm import gemini_client
+from core.jobs import job_queue, JobContext, JobQueueFull
+from core.metrics import BYTES_IN, instrumented, stage
+from core.uploads import SpooledUpload, spool_upload
+from core.extraction import extraction
+from core.workers import worker_pool
+from .service import (
+    parse_and_redact,
+    iter_redacted_text,
+    redact_text,
+    process_document,
+    upload_file_to_gcs,
+    analysis_cache,
+    record_cached_analysis,
+    index_for_chat,
+    ANALYSIS_PROMPT_VERSION,
+)
+import asyncio
+from typing import Awaitable, Callable
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
+SUPPORTED_ANALYZE_TYPES = [
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "text/plain",
+]
+ANALYZE_JOB_STAGES = ["upload", "extraction", "analysis"]
+
 # -------------------- Helpers --------------------
-def read_pdf(file_path: str) -> str:
-    """Extract text from a PDF file"""
-    try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text
-    except Exception as e:
-        raise ValueError(f"Failed to read PDF: {e}")
+async def call_gemini(prompt: str) -> str:
+    """Send prompt to Gemini API through the shared pooled client"""
+    return await gemini_client.generate(prompt) or "No response"
 
 
-def call_gemini(prompt: str) -> str:
-    """Send prompt to Gemini API"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
-    headers = {"Content-Type": "application/json"}
-    data = {"contents": [{"parts": [{"text": prompt}]}]}
+def _part_note(index: int, total: int) -> str:
+    return f"(This is part {index + 1} of {total} of the document.)\n" if total > 1 else ""
 
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code != 200:
-        raise ValueError(f"Gemini API request failed: {response.status_code}, {response.text}")
 
-    result = response.json()
-    return (
-        result.get("candidates", [{}])[0]
-        .get("content", {})
-        .get("parts", [{}])[0]
-        .get("text", "No response")
-    )
+async def _map_reduce_text(text: str, map_prompt, reduce_prompt) -> str:
+    """Runs a free-text prompt over each chunk in parallel and combines the answers."""
+    chunks = split_into_chunks(text, ANALYSIS_CHUNK_TOKENS)
+
+    async def run_chunk(index: int, chunk: str) -> str:
+        return await call_gemini(map_prompt(chunk, _part_note(index, len(chunks))))
 
+    async def combine(answers: list[str]) -> str:
+        parts = "\n\n".join(f"--- Part {i + 1} ---\n{answer}" for i, answer in enumerate(answers))
+        return await call_gemini(reduce_prompt(parts))
 
-def summarize_document(text: str) -> str:
-    prompt = f"""
+    return await map_reduce(chunks, run_chunk, combine, ANALYSIS_MAP_CONCURRENCY, ANALYZE_TIMEOUT)
+
+
+def _summary_prompt(text: str, part_note: str = "") -> str:
+    return f"""
 Summarize the following legal document focusing on:
 
 1. Key parties
@@ -53,19 +70,174 @@ Summarize the following legal document focusing on:
 4. Risks and liabilities
 5. Termination/renewal clauses
 
-Document:
+{part_note}Document:
 {text}
 """
-    return call_gemini(prompt)
 
 
-def check_risk(text: str) -> str:
-    prompt = f"""
-Identify potential legal, compliance, or financial risks in the following document. Be specific:
+def _combine_summaries_prompt(parts: str) -> str:
+    return f"""
+The following are summaries of consecutive parts of one legal document.
+Combine them into a single summary of the whole document focusing on the same points:
+key parties, important dates and deadlines, main obligations, risks and liabilities,
+and termination/renewal clauses. Do not repeat information.
+
+{parts}
+"""
 
+
+def _risk_prompt(text: str, part_note: str = "") -> str:
+    return f"""
+Identify potential legal, compliance, or financial risks in the following document. Be specific:
+{part_note}
 {text}
 """
-    return call_gemini(prompt)
+
+
+def _combine_risks_prompt(parts: str) -> str:
+    return f"""
+The following are risk analyses of consecutive parts of one document.
+Merge them into one specific list of the legal, compliance and financial risks, without duplicates:
+
+{parts}
+"""
+
+
+async def summarize_document(text: str) -> str:
+    return await _map_reduce_text(text, _summary_prompt, _combine_summaries_prompt)
+
+
+async def check_risk(text: str) -> str:
+    return await _map_reduce_text(text, _risk_prompt, _combine_risks_prompt)
+
+
+async def _no_progress(stage: str) -> None:
+    pass
+
+
+@instrumented("analyze")
+async def run_analysis(
+    upload: SpooledUpload,
+    document_type: str,
+    user_id: str,
+    analysis_mode: str = ANALYSIS_MODE,
+    progress: Callable[[str], Awaitable[None]] = _no_progress
+) -> dict:
+    """
+    The /documents/analyze pipeline; `progress` is awaited with each stage name (background jobs).
+    Takes ownership of `upload` and deletes its spool file when done.
+    """
+    BYTES_IN.inc("analyze", amount=upload.size)
+    with upload:
+        return await _analyze_upload(upload, document_type, user_id, analysis_mode, progress)
+
+
+async def _analyze_upload(upload: SpooledUpload, document_type: str, user_id: str, analysis_mode: str, progress) -> dict:
+    filename, mime_type = upload.filename, upload.content_type
+
+    # ✅ Upload to GCS once, streamed from the spool file (skipped when these bytes are already stored)
+    await progress("upload")
+    with stage("analyze", "upload"):
+        gcs_url = await asyncio.to_thread(upload_file_to_gcs, user_id, upload)
+
+    # ✅ Same bytes + type + model + prompt + extraction backend seen before: skip extraction and LLM calls
+    prompt_version = ANALYSIS_PROMPT_VERSION if analysis_mode != "legacy" else f"{ANALYSIS_PROMPT_VERSION}+legacy"
+    extractor = extraction.default_backend(mime_type) if extraction.supports(mime_type) else ""
+    cache_key = analysis_cache_key(upload.sha256, document_type, gemini_client.model, prompt_version, extractor)
+    with stage("analyze", "cache_lookup"):
+        cached = await analysis_cache.get(cache_key, user_id)
+    if cached is not None:
+        doc_id = await record_cached_analysis(
+            user_id=user_id,
+            filename=filename,
+            document_type=document_type,
+            mime_type=mime_type,
+            gcs_url=gcs_url,
+            analysis_report=cached.get("analysis_report"),
+            prompt_version=cached.get("prompt_version", prompt_version)
+        )
+        if cached.get("redacted_text"):
+            await asyncio.to_thread(index_for_chat, user_id, filename, cached["redacted_text"])
+        return {
+            "filename": filename,
+            "document_type": document_type,
+            "mime_type": mime_type,
+            **cached,
+            "doc_id": doc_id,
+            "gcs_url": gcs_url,
+            "uploaded_at": datetime.utcnow().isoformat(),
+            "errors": {},
+            "cached": True
+        }
+
+    # ✅ Extract text once; the report, legacy summaries and redaction all share it
+    await progress("extraction")
+    with stage("analyze", "extraction"):
+        extracted = await asyncio.to_thread(extraction.extract_upload, upload)
+        redacted_text = await asyncio.to_thread(redact_text, extracted.text)
+    stages = {
+        "report": lambda: process_document(
+            user_id=user_id,
+            upload=upload,
+            document_type=document_type,
+            gcs_url=gcs_url,
+            redacted_content=redacted_text
+        ),
+    }
+    if analysis_mode == "legacy":
+        text = extracted.text
+        stages["summary"] = lambda: summarize_document(text)
+        stages["risk_analysis"] = lambda: check_risk(text)
+
+    # ✅ AI stages run concurrently; a failed branch is reported in
+    # "errors" instead of discarding the others
+    await progress("analysis")
+    with stage("analyze", "analysis"):
+        results, errors = await gather_settled(
+            stages,
+            max_concurrency=ANALYZE_MAX_CONCURRENCY,
+            timeout=ANALYZE_TIMEOUT,
+        )
+    if not results:
+        raise ValueError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+    report = results.get("report") or {}
+    analysis_report = report.get("analysis_report") or {}
+    analysis = {
+        "summary": results.get("summary", analysis_report.get("summary")),
+        "risk_analysis": results.get("risk_analysis", analysis_report.get("riskAnalysis")),
+        "analysis_report": report.get("analysis_report"),
+        "prompt_version": prompt_version,
+        "redacted_text": redacted_text,
+    }
+    # Only complete results are cached; partial failures are retried next time
+    if not errors:
+        await analysis_cache.set(cache_key, analysis, user_id)
+
+    # ✅ Return full response to frontend
+    return {
+        "filename": filename,
+        "document_type": document_type,
+        "mime_type": mime_type,
+        **analysis,
+        "doc_id": report.get("doc_id"),
+        "gcs_url": gcs_url,
+        "uploaded_at": datetime.utcnow().isoformat(),
+        "errors": errors,
+        "cached": False
+    }
+
+
+async def run_analyze_job(ctx: JobContext, payload: dict) -> dict:
+    return await run_analysis(
+        payload["upload"],
+        payload["document_type"],
+        ctx.user_id,
+        payload["analysis_mode"],
+        progress=ctx.progress
+    )
+
+
+job_queue.register("analyze", run_analyze_job, ANALYZE_JOB_STAGES)
 
 
 # -------------------- Endpoints --------------------
@@ -75,86 +247,100 @@ async def redact_document(
     document_type: str = Form(...)
 ):
     """Redacts sensitive info and returns clean text"""
+    upload = await spool_upload(file)
     try:
-        suffix = os.path.splitext(file.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(await file.read())
-            local_path = tmp.name
-
-        redacted_text = parse_and_redact(local_path, file.content_type)
-        os.remove(local_path)
+        with upload:
+            # Parsing and redaction are CPU-bound; they run in a worker process, off the event loop
+            redacted_text = await worker_pool.run(parse_and_redact, upload.path, file.content_type)
 
         return {
             "filename": file.filename,
             "document_type": document_type,
             "redacted_text": redacted_text,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/redact/stream")
+async def redact_document_stream(file: UploadFile = File(...)):
+    """Streams redacted text page by page; memory stays bounded for very large documents"""
+    upload = await spool_upload(file)
+    try:
+        pages = iter_redacted_text(upload.path, file.content_type)
+        # Pull the first chunk now so unsupported or corrupt files fail with a 400
+        first = await asyncio.to_thread(next, pages, "")
+    except Exception as e:
+        upload.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def body():
+        yield first
+        yield from pages
+
+    return StreamingResponse(
+        body(),
+        media_type="text/plain; charset=utf-8",
+        background=BackgroundTask(upload.close),
+    )
+
 @router.post("/analyze")
 async def analyze_document(
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    user_id: str = Form(...)
+    user_id: str = Form(...),
+    analysis_mode: str = Form(ANALYSIS_MODE),
+    job: bool = Form(False)
 ):
-    """Upload to GCS, redact, summarize, risk analysis, store metadata"""
-    if file.content_type not in [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "text/plain",
-    ]:
+    """Upload to GCS, redact, summarize, risk analysis, store metadata.
+
+    analysis_mode="combined" (default) produces everything from one structured
+    Gemini call; "legacy" also runs the separate summary and risk prompts.
+    With job=true the work runs in the background: returns 202 and a job ID
+    whose result is the same JSON (see /jobs).
+    """
+    if file.content_type not in SUPPORTED_ANALYZE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Unsupported file type. Only PDF, DOCX, and TXT are supported."
         )
 
-    try:
-        # ✅ Read file bytes ONCE
-        file_bytes = await file.read()
-        suffix = os.path.splitext(file.filename)[1]
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(file_bytes)
-            local_path = tmp.name
+    # ✅ Stream the upload to a spool file in fixed-size chunks, hashing as it arrives
+    upload = await spool_upload(file)
 
-        # ✅ Upload to GCS
-        gcs_path = f"docs/{user_id}/{file.filename}"
-        gcs_url = upload_file_to_gcs(file_bytes, gcs_path, file.content_type)
-
-        # ✅ Extract text
-        text = read_pdf(local_path)
-        redacted_text = parse_and_redact(local_path, file.content_type)
-
-        # ✅ AI summaries
-        summary = summarize_document(text)
-        risks = check_risk(text)
-
-        os.remove(local_path)
-
-        # ✅ Store metadata in DB (if needed)
-        process_document(
-            user_id=user_id,
-            file_data=file_bytes,
-            filename=file.filename,
-            document_type=document_type,
-            mime_type=file.content_type
-        )
-
-        # ✅ Return full response to frontend
-        return {
-            "filename": file.filename,
-            "document_type": document_type,
-            "mime_type": file.content_type,
-            "summary": summary,
-            "risk_analysis": risks,
-            "redacted_text": redacted_text,
-            "gcs_url": gcs_url,
-            "uploaded_at": datetime.utcnow().isoformat()
-        }
+    if job:
+        try:
+            queued = await job_queue.submit(
+                "analyze",
+                user_id,
+                payload={
+                    "upload": upload,
+                    "document_type": document_type,
+                    "analysis_mode": analysis_mode,
+                },
+                meta={"filename": file.filename, "document_type": document_type},
+            )
+        except JobQueueFull as e:
+            upload.close()
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Too many jobs queued: {e}", headers={"Retry-After": "30"})
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+            "job_id": queued["job_id"],
+            "status": queued["status"],
+            "status_url": f"/jobs/{queued['job_id']}?user_id={user_id}",
+            "events_url": f"/jobs/{queued['job_id']}/events?user_id={user_id}",
+        })
 
+    try:
+        return await run_analysis(upload, document_type, user_id, analysis_mode)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/cache/stats")
+async def analysis_cache_stats():
+    """Hit/miss counters and memory usage of the analysis cache"""
+    return analysis_cache.stats()
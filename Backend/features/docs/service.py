@@ -1,32 +1,41 @@
  
 import json
-import datetime,re,pdfplumber
-from docx import Document
-from firebase_admin import firestore
-from core.gcs import upload_file, download_file
-import google.generativeai as gemini
-from core.firebase import db  # <- import the already initialized db ///////
-from core.config import GEMINI_API_KEY
-from google.cloud import storage
+import datetime,re
+from core.gcs import ContentStore
+from core.file_index import LISTED_BUCKET, file_index
+from core.llm import gemini_client
+from core.clients import clients  # <- shared Firestore client, built on first use
+from core.config import GEMINI_API_KEY, ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_BACKEND, ANALYSIS_CACHE_DIR
+from core.config import ANALYSIS_CHUNK_TOKENS, ANALYSIS_MAP_CONCURRENCY, ANALYZE_TIMEOUT
+from core.chunking import split_into_chunks, map_reduce
+from core.cache import AnalysisCache, DiskCacheStore, FirestoreCacheStore
+from core.uploads import SpooledUpload
+from core.extraction import extraction
+from core.metrics import BYTES_IN, CACHE_LOOKUPS, instrumented, stage
+from core.redaction import redactor  # <- single-pass PII patterns live in core/redaction.py
+from core.retrieval import retrieval_index
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status 
-import tempfile
-import os
-# --- Patterns for redaction --- ########
-patterns = {
-    "email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-    "phone": r"\b\d{10}\b",
-    "aadhaar": r"\b\d{4}\s\d{4}\s\d{4}\b",
-    "pan": r"[A-Z]{5}[0-9]{4}[A-Z]{1}",
-     "pincode": r"\b\d{6}\b",  # Indian postal codes
-    "house_no": r"\b(?:Flat|House|Plot|No\.?|#)\s?\d+[A-Za-z0-9/-]*\b",
-    "street": r"\b(?:Street|St|Road|Rd|Nagar|Colony|Avenue|Ave|Lane|Ln|Block)\b.*"
-}
+import asyncio
+import logging
+from typing import Iterator
 
-db = firestore.client()
-gemini.api_key = ".."
+BUCKET_NAME = LISTED_BUCKET
+# File bytes are stored once per content hash; docs/{user_id}/{filename} points at them
+content_store = ContentStore(BUCKET_NAME, index=file_index)  # uploads show up in /docs/{user_id} listings
 
-storage_client = storage.Client()
-BUCKET_NAME = "docquliobucket"
+# --- Content-addressed analysis cache (see core/cache.py) ---
+if ANALYSIS_CACHE_BACKEND == "firestore":
+    _cache_store = FirestoreCacheStore()
+elif ANALYSIS_CACHE_BACKEND == "disk":
+    _cache_store = DiskCacheStore(ANALYSIS_CACHE_DIR)
+else:
+    _cache_store = None
+analysis_cache = AnalysisCache(ANALYSIS_CACHE_MAX_BYTES, _cache_store)
+CACHE_LOOKUPS.source(lambda: {
+    ("analysis", "memory_hit"): analysis_cache.memory_hits,
+    ("analysis", "store_hit"): analysis_cache.store_hits,
+    ("analysis", "miss"): analysis_cache.misses,
+})
 
 # ... other functions ...
 
@@ -34,51 +43,43 @@ BUCKET_NAME = "docquliobucket"
 
 def redact_text(text: str) -> str:
     """Apply regex patterns to redact sensitive info"""
-    for _, pattern in patterns.items():
-        text = re.sub(pattern, "[HIDDEN]", text)
-    return text
+    return redactor.redact(text).text
 
 
-def extract_text_from_file(local_path: str, mime_type: str) -> str:
-    """Read file from local path and extract text based on type"""
-    if mime_type == "application/pdf":
-        text = ""
-        with pdfplumber.open(local_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text
+def iter_text_from_file(local_path: str, mime_type: str) -> Iterator[str]:
+    """Yield the text of a file page by page (PDF), paragraph by paragraph (DOCX) or block by block (text)"""
+    return extraction.iter_text(local_path, mime_type)
 
-    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        doc = Document(local_path)
-        return "\n".join([p.text for p in doc.paragraphs])
 
-    elif mime_type.startswith("text/"):
-        with open(local_path, "r", encoding="utf-8") as f:
-            return f.read()
+def extract_text_from_file(local_path: str, mime_type: str) -> str:
+    """Read file from local path and extract text based on type (default backend per type, see core/extraction.py)"""
+    return extraction.extract(local_path, mime_type).text
+
 
-    else:
-        raise ValueError(f"Unsupported file type: {mime_type}")
+def iter_redacted_text(local_path: str, mime_type: str) -> Iterator[str]:
+    """Stream redacted text page by page; matches split across pages are still redacted"""
+    return redactor.redact_stream(iter_text_from_file(local_path, mime_type))
 
 
 def parse_and_redact(local_path: str, mime_type: str) -> str:
     """Main function to parse and redact document"""
-    raw_text = extract_text_from_file(local_path, mime_type)
-    return redact_text(raw_text)
+    return "".join(iter_redacted_text(local_path, mime_type))
+
+
+def index_for_chat(user_id: str, filename: str, redacted_text: str):
+    """Makes the redacted text searchable from /chat (see core/retrieval.py); failures are logged, not raised"""
+    try:
+        retrieval_index.add(user_id, filename, redacted_text)
+    except Exception as e:
+        logging.error(f"Could not index {filename} for chat: {e}")
 
 
 
 
-def upload_file_to_gcs(file_data: bytes, file_name: str, mime_type: str) -> str:
-    """Uploads a file to GCS and returns its public URL."""
+def upload_file_to_gcs(user_id: str, upload: SpooledUpload) -> str:
+    """Stores an upload as docs/{user_id}/{filename} and returns its public URL; bytes already in GCS are not sent again."""
     try:
-        bucket = storage_client.bucket(BUCKET_NAME)
-        blob = bucket.blob(file_name)
-        
-        blob.upload_from_string(file_data, content_type=mime_type)
-        
-        # Make the file publicly accessible
-        
-        return f"https://storage.googleapis.com/{BUCKET_NAME}/{file_name}"
+        return content_store.put_file(user_id, upload.filename, upload.path, upload.content_type, upload.sha256, upload.size).url
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,112 +88,209 @@ def upload_file_to_gcs(file_data: bytes, file_name: str, mime_type: str) -> str:
 
 def download_file_from_gcs(blob_name: str, local_path: str):
     try:
-        bucket = storage_client.bucket(BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-        blob.download_to_filename(local_path)
-        return local_path
+        return content_store.download(blob_name, local_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"GCS download failed: {str(e)}"
         )
 
-# --- Main Service Function ---
-def process_document(user_id: str, file_data: bytes, filename: str, document_type: str, mime_type: str):
+# --- Structured analysis prompt ---
+# Bump the version whenever the prompt or schema changes so stored reports stay comparable
+ANALYSIS_PROMPT_VERSION = "analysis-v3"
+
+ANALYSIS_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {
+            "summary": {"type": "STRING"},
+            "riskAnalysis": {"type": "STRING"},
+            "keyPoints": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "risks": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "recommendations": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "legalTerms": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "term": {"type": "STRING"},
+                        "definition": {"type": "STRING"}
+                    }
+                }
+            },
+            "confidence": {"type": "INTEGER"}
+        },
+        "required": ["summary", "riskAnalysis", "keyPoints", "risks", "recommendations", "legalTerms", "confidence"]
+    }
+}
+
+
+def build_analysis_prompt(document_type: str, content: str, part: tuple[int, int] | None = None) -> str:
+    """Single prompt covering everything /documents/analyze returns (for one chunk when `part` is set)."""
+    scope = f"This is part {part[0]} of {part[1]} of the document; analyze only this part.\n" if part else ""
+    return f"""
+    Analyze the following {document_type} document and provide a structured JSON response.
+    {scope}
+    1. **Summary**: A concise, executive summary covering the key parties, important dates and deadlines, main obligations and termination/renewal clauses.
+    2. **Risk Analysis**: A short narrative of the specific legal, compliance and financial risks in the document.
+    3. **Key Points**: A list of the most important clauses or facts.
+    4. **Risks**: A list of potential legal or financial risks.
+    5. **Recommendations**: A list of recommendations for the user.
+    6. **Legal Terms**: A list of key legal terms with simple, clear definitions.
+    7. **Confidence**: A numerical confidence score (0-100) indicating the reliability of the analysis.
+
+    Document content:
+    ---
+    {content}
+    ---
     """
-    Handles the entire document analysis pipeline.
-    This function is the core business logic.
+
+
+def build_reduce_prompt(document_type: str, reports: list[dict]) -> str:
+    """Combines per-chunk analyses of one document into a single report."""
+    return f"""
+    The following JSON objects are analyses of consecutive parts of one {document_type} document.
+    Combine them into a single structured JSON response for the whole document with the same fields:
+    one executive summary and one risk analysis covering all parts, the key points, risks and
+    recommendations without duplicates, the distinct legal terms, and an overall confidence score (0-100).
+
+    Partial analyses:
+    ---
+    {json.dumps(reports, ensure_ascii=False)}
+    ---
     """
-    gcs_path = f"docs/{user_id}/{filename}"
 
-    # Step 1: Upload file to GCS
-    gcs_url = upload_file_to_gcs(file_data, gcs_path, mime_type)
 
-    # Step 2: Save initial metadata in Firestore
-    doc_ref = db.collection("users").document(user_id).collection("documents").document()
-    doc_ref.set({
+def merge_analysis_reports(reports: list[dict]) -> dict:
+    """Deterministic reduce, used when the combining call fails."""
+    def unique(items):
+        seen, out = set(), []
+        for item in items:
+            key = json.dumps(item, sort_keys=True).lower()
+            if key not in seen:
+                seen.add(key)
+                out.append(item)
+        return out
+
+    terms = {}
+    for report in reports:
+        for term in report.get("legalTerms", []):
+            terms.setdefault(str(term.get("term", "")).lower(), term)
+    return {
+        "summary": "\n\n".join(r.get("summary", "") for r in reports if r.get("summary")),
+        "riskAnalysis": "\n\n".join(r.get("riskAnalysis", "") for r in reports if r.get("riskAnalysis")),
+        "keyPoints": unique(p for r in reports for p in r.get("keyPoints", [])),
+        "risks": unique(p for r in reports for p in r.get("risks", [])),
+        "recommendations": unique(p for r in reports for p in r.get("recommendations", [])),
+        "legalTerms": list(terms.values()),
+        "confidence": min((r.get("confidence", 0) for r in reports), default=0),
+    }
+
+
+async def analyze_content(document_type: str, content: str) -> dict:
+    """
+    Structured analysis of the whole document.
+    Long documents are split on section/clause boundaries, the chunks are
+    analyzed in parallel and the partial reports combined into the same schema.
+    """
+    chunks = split_into_chunks(content, ANALYSIS_CHUNK_TOKENS)
+
+    async def analyze_chunk(index: int, chunk: str) -> dict:
+        part = (index + 1, len(chunks)) if len(chunks) > 1 else None
+        prompt = build_analysis_prompt(document_type, chunk, part)
+        return json.loads(await gemini_client.generate(prompt, generation_config=ANALYSIS_GENERATION_CONFIG))
+
+    async def combine(reports: list[dict]) -> dict:
+        try:
+            prompt = build_reduce_prompt(document_type, reports)
+            return json.loads(await gemini_client.generate(prompt, generation_config=ANALYSIS_GENERATION_CONFIG))
+        except Exception as e:
+            logging.warning(f"Combining {len(reports)} chunk analyses failed, merging locally: {e}")
+            return merge_analysis_reports(reports)
+
+    return await map_reduce(chunks, analyze_chunk, combine, ANALYSIS_MAP_CONCURRENCY, ANALYZE_TIMEOUT)
+
+
+async def record_cached_analysis(user_id: str, filename: str, document_type: str, mime_type: str, gcs_url: str, analysis_report: dict | None, prompt_version: str = ANALYSIS_PROMPT_VERSION) -> str:
+    """Stores the document metadata for a cache hit without re-running the pipeline."""
+    doc_ref = clients.firestore().collection("users").document(user_id).collection("documents").document()
+    await asyncio.to_thread(doc_ref.set, {
         "filename": filename,
         "document_type": document_type,
         "mime_type": mime_type,
         "gcs_url": gcs_url,
         "uploaded_at": datetime.datetime.utcnow(),
-        "analysis_report": None
+        "status": "complete",
+        "analysis_report": analysis_report,
+        "prompt_version": prompt_version,  # the version the cached entry was produced with (e.g. "+legacy")
+        "from_cache": True
     })
+    return doc_ref.id
 
-    # Step 3: Extract and redact content
-    local_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{filename.split('.')[-1]}") as temp_file:
-            temp_file.write(file_data)
-            local_path = temp_file.name
-        content = extract_text_from_file(local_path, mime_type)
-        redacted_content = redact_text(content)
-    except Exception as e:
-        doc_ref.update({"status": "failed", "error": f"Text extraction failed: {str(e)}"})
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Text extraction failed: {str(e)}")
-    finally:
-        if local_path and os.path.exists(local_path):
-            os.remove(local_path)
-
-    # Step 4: Call Gemini for structured report
-    prompt = f"""
-    Analyze the following {document_type} document and provide a structured JSON response.
-
-    1. **Summary**: A concise, executive summary of the document's content.
-    2. **Key Points**: A list of the most important clauses or facts.
-    3. **Risks**: A list of potential legal or financial risks.
-    4. **Recommendations**: A list of recommendations for the user.
-    5. **Legal Terms**: A list of key legal terms with simple, clear definitions.
-    6. **Confidence**: A numerical confidence score (0-100) indicating the reliability of the analysis.
 
-    Document content:
-    ---
-    {redacted_content}
-    ---
+# --- Main Service Function ---
+@instrumented("process_document")
+async def process_document(user_id: str, upload: SpooledUpload, document_type: str, gcs_url: str | None = None, redacted_content: str | None = None):
     """
-    generation_config = {
-        "response_mime_type": "application/json",
-        "response_schema": {
-            "type": "OBJECT",
-            "properties": {
-                "summary": {"type": "STRING"},
-                "keyPoints": {"type": "ARRAY", "items": {"type": "STRING"}},
-                "risks": {"type": "ARRAY", "items": {"type": "STRING"}},
-                "recommendations": {"type": "ARRAY", "items": {"type": "STRING"}},
-                "legalTerms": {
-                    "type": "ARRAY",
-                    "items": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "term": {"type": "STRING"},
-                            "definition": {"type": "STRING"}
-                        }
-                    }
-                },
-                "confidence": {"type": "INTEGER"}
-            }
-        }
-    }
+    Handles the entire document analysis pipeline.
+    This function is the core business logic.
+    Pass `gcs_url` when the caller has already stored the file and
+    `redacted_content` when it has already extracted and redacted the text.
+    """
+    filename, mime_type = upload.filename, upload.content_type
+    BYTES_IN.inc("process_document", amount=upload.size)
+
+    # Step 1: Upload file to GCS (blocking client calls run off the event loop
+    # so concurrent analysis stages keep making progress)
+    if gcs_url is None:
+        with stage("process_document", "upload"):
+            gcs_url = await asyncio.to_thread(upload_file_to_gcs, user_id, upload)
+
+    # Step 2: Save initial metadata in Firestore
+    doc_ref = clients.firestore().collection("users").document(user_id).collection("documents").document()
+    with stage("process_document", "metadata"):
+        await asyncio.to_thread(doc_ref.set, {
+            "filename": filename,
+            "document_type": document_type,
+            "mime_type": mime_type,
+            "gcs_url": gcs_url,
+            "uploaded_at": datetime.datetime.utcnow(),
+            "analysis_report": None
+        })
+
+    # Step 3: Extract and redact content straight from the spooled upload
+    if redacted_content is None:
+        try:
+            with stage("process_document", "extraction"):
+                content = (await asyncio.to_thread(extraction.extract_upload, upload)).text
+                redacted_content = await asyncio.to_thread(redact_text, content)
+        except Exception as e:
+            await asyncio.to_thread(doc_ref.update, {"status": "failed", "error": f"Text extraction failed: {str(e)}"})
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Text extraction failed: {str(e)}")
+    with stage("process_document", "indexing"):
+        await asyncio.to_thread(index_for_chat, user_id, filename, redacted_content)
 
+    # Step 4: Call Gemini for structured report (one schema-constrained call per chunk)
     try:
-        model = gemini.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt, generation_config=generation_config)
-        analysis_report_json = response.text
-        analysis_report_dict = json.loads(analysis_report_json)
+        with stage("process_document", "analysis"):
+            analysis_report_dict = await analyze_content(document_type, redacted_content)
         
         # Step 5: Update Firestore with the complete report
-        doc_ref.update({
+        await asyncio.to_thread(doc_ref.update, {
             "status": "complete",
             "analysis_report": analysis_report_dict,
+            "prompt_version": ANALYSIS_PROMPT_VERSION,
             "summary_generated_at": datetime.datetime.utcnow()
         })
     except Exception as e:
-        doc_ref.update({"status": "failed", "error": f"Gemini analysis failed: {str(e)}"})
+        await asyncio.to_thread(doc_ref.update, {"status": "failed", "error": f"Gemini analysis failed: {str(e)}"})
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Gemini analysis failed: {str(e)}")
 
     # Step 6: Return results
     return {
         "doc_id": doc_ref.id,
         "gcs_url": gcs_url,
-        "analysis_report": analysis_report_dict
+        "analysis_report": analysis_report_dict,
+        "prompt_version": ANALYSIS_PROMPT_VERSION
     }
\ No newline at end of file
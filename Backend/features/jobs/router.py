@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from core.jobs import job_queue, JobNotFound, JOB_COMPLETE, JOB_FAILED, RESULT_ARTIFACT
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def _public(job: dict) -> dict:
+    """Job fields returned to clients; the result is fetched separately."""
+    fields = {key: value for key, value in job.items() if key != "result"}
+    return json.loads(json.dumps(fields, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)))
+
+
+async def _get_job(job_id: str, user_id: str) -> dict:
+    job = await job_queue.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/stats")
+async def job_queue_stats():
+    """Worker count and queue depth on this instance"""
+    return job_queue.stats()
+
+
+@router.get("/{job_id}")
+async def get_job_status(job_id: str, user_id: str = Query(...)):
+    """Poll a job: status (queued/running/complete/failed), current stage and progress"""
+    return _public(await _get_job(job_id, user_id))
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, user_id: str = Query(...)):
+    """Server-sent events: one `data:` message per change, the last one complete or failed"""
+    await _get_job(job_id, user_id)
+
+    async def events():
+        try:
+            async for job in job_queue.watch(job_id, user_id):
+                yield f"event: {job['status']}\ndata: {json.dumps(_public(job))}\n\n"
+        except JobNotFound:
+            yield "event: failed\ndata: {\"error\": \"Job not found\"}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, user_id: str = Query(...)):
+    """JSON result of a finished job (the same body the synchronous endpoint returns)"""
+    job = await _get_job(job_id, user_id)
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Job failed: {job.get('error')}")
+    if job["status"] != JOB_COMPLETE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job['status']}")
+    if job.get("result") is not None:
+        return job["result"]  # finished before results were stored as artifacts
+    artifact = await job_queue.get_artifact(job_id, user_id, job.get("result_artifact") or RESULT_ARTIFACT)
+    if artifact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job result not found")
+    return json.loads(artifact[0])
+
+
+@router.get("/{job_id}/report.pdf")
+async def get_job_report(job_id: str, user_id: str = Query(...)):
+    """PDF report produced by a finished verification job"""
+    job = await _get_job(job_id, user_id)
+    if job["status"] != JOB_COMPLETE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job['status']}")
+    artifact = await job_queue.get_artifact(job_id, user_id, "report.pdf")
+    if artifact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="This job has no PDF report")
+    data, content_type = artifact
+    filename = job.get("meta", {}).get("report_filename", f"report_{job_id}.pdf")
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -1,29 +1,28 @@
-from fastapi import APIRouter, HTTPException
-from google.cloud import storage
+import asyncio
 
-router = APIRouter(prefix="/docs", tags=["Media"])  # changed prefix for clarity
+from fastapi import APIRouter, Query, Response
+from core.config import LISTING_MAX_PAGE_SIZE, LISTING_PAGE_SIZE
+from features.media.service import list_all_user_docs, list_user_docs as list_docs_page, parse_fields
 
-BUCKET_NAME = "docquliobucket"
-storage_client = storage.Client()
+router = APIRouter(prefix="/docs", tags=["Media"])  # changed prefix for clarity
 
 @router.get("/{user_id}")
-async def list_user_docs(user_id: str):
+async def list_user_docs(
+    user_id: str,
+    response: Response,
+    page_size: int | None = Query(None, ge=1, le=LISTING_MAX_PAGE_SIZE, description="Page through the listing; omit for every file"),
+    page_token: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. filename,gcs_url"),
+):
     """
-    List all docs for a given user_id stored in GCS under docs/{user_id}/
+    List a user's docs, newest first: all of them, or one page at a time when
+    page_size or page_token is given. The body stays a plain list; the next
+    page's token is in the X-Next-Page-Token header.
     """
-    try:
-        bucket = storage_client.bucket(BUCKET_NAME)
-        blobs = bucket.list_blobs(prefix=f"docs/{user_id}/")
-
-        files = []
-        for blob in blobs:
-            # Avoid returning empty 'folder' placeholder
-            if not blob.name.endswith("/"):
-                files.append({
-                    "filename": blob.name.split("/")[-1],
-                    "gcs_url": f"https://storage.googleapis.com/{BUCKET_NAME}/{blob.name}"
-                })
-
-        return files
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    selected = parse_fields(fields)
+    if page_size is None and page_token is None:
+        return await asyncio.to_thread(list_all_user_docs, user_id, selected)
+    files, next_token = await asyncio.to_thread(list_docs_page, user_id, page_size or LISTING_PAGE_SIZE, page_token, selected)
+    if next_token:
+        response.headers["X-Next-Page-Token"] = next_token
+    return files
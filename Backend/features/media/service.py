@@ -1,26 +1,80 @@
 # features/Media/service.py
-from google.cloud import storage
+import logging
+
 from fastapi import HTTPException
+from core.clients import clients
+from core.config import LISTING_MAX_PAGE_SIZE
+from core.file_index import FILE_FIELDS, LISTED_BUCKET, file_index
+from core.gcs import ContentStore
+
+BUCKET_NAME = LISTED_BUCKET
+content_store = ContentStore(BUCKET_NAME)
 
-BUCKET_NAME = "docquliobucket"
-storage_client = storage.Client()
+def parse_fields(fields: str | None) -> list[str]:
+    """Comma-separated field names from the query string; all fields when empty."""
+    if not fields:
+        return list(FILE_FIELDS)
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in FILE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(FILE_FIELDS)}")
+    return selected
+
+def backfill_index(user_id: str):
+    """
+    One-time walk of docs/{user_id}/ in GCS for files stored before the index existed.
+    Later uploads are recorded by ContentStore, so this runs once per user.
+    """
+    bucket = clients.storage().bucket(BUCKET_NAME)
+    content_sizes: dict[str, int | None] = {}
+    count = 0
+    for blob in bucket.list_blobs(prefix=f"docs/{user_id}/"):
+        if blob.name.endswith("/"):  # skip empty "folders"
+            continue
+        metadata = blob.metadata or {}
+        size = blob.size
+        content_object = metadata.get("content_object")
+        if content_object:
+            # Pointers are empty; the content object holds the bytes
+            if content_object not in content_sizes:
+                content = bucket.get_blob(content_object)
+                content_sizes[content_object] = content.size if content is not None else None
+            size = content_sizes[content_object]
+        file_index.record(
+            user_id,
+            blob.name,
+            blob.content_type,
+            size,
+            metadata.get("content_sha256"),
+            content_store.url_for(blob),  # pointer -> content object
+            last_modified=blob.updated,
+        )
+        count += 1
+    file_index.mark_ready(user_id)
+    logging.info(f"Indexed {count} existing files for user {user_id}")
 
-def list_user_docs(user_id: str):
+def list_user_docs(user_id: str, page_size: int, page_token: str | None = None, fields: list[str] | None = None):
     """
-    Return all documents for a specific user from GCS (docs/{user_id}/)
+    One page of a user's documents, newest first, from the file index.
+    Returns (files, next_page_token); next_page_token is None on the last page. Blocking.
     """
     try:
-        bucket = storage_client.bucket(BUCKET_NAME)
-        blobs = bucket.list_blobs(prefix=f"docs/{user_id}/")
-
-        files = []
-        for blob in blobs:
-            if not blob.name.endswith("/"):  # skip empty "folders"
-                files.append({
-                    "filename": blob.name.split("/")[-1],
-                    "gcs_url": f"https://storage.googleapis.com/{BUCKET_NAME}/{blob.name}"
-                })
-
-        return files
+        if not page_token and not file_index.is_ready(user_id):
+            backfill_index(user_id)
+        records, next_token = file_index.list(user_id, page_size, page_token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"GCS error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Listing error: {str(e)}")
+
+    fields = fields or list(FILE_FIELDS)
+    return [{name: record.get(name) for name in fields} for record in records], next_token
+
+
+def list_all_user_docs(user_id: str, fields: list[str] | None = None) -> list[dict]:
+    """Every document of a user, newest first, read from the index in the largest pages. Blocking."""
+    files, token = list_user_docs(user_id, LISTING_MAX_PAGE_SIZE, None, fields)
+    while token:
+        page, token = list_user_docs(user_id, LISTING_MAX_PAGE_SIZE, token, fields)
+        files.extend(page)
+    return files
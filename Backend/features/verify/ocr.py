@@ -0,0 +1,219 @@
+# ocr.py
+
+import asyncio
+import logging
+import os
+import tempfile
+import unicodedata
+from collections import deque
+from typing import NamedTuple
+
+from core.clients import clients
+from core.config import OCR_MAX_CONCURRENCY, OCR_BATCH_SIZE
+from core.workers import WorkerPool, worker_pool
+from features.verify.preprocess import OcrImageOptions, render_page_for_ocr, prepare_photo
+
+
+# Which path produced a page's text
+SOURCE_TEXT_LAYER = "text_layer"
+SOURCE_OCR = "ocr"
+SOURCE_BLANK = "blank"
+
+# A native text layer is trusted when it has at least this many characters
+# and most of them are letters, digits or whitespace (not mojibake/glyph ids)
+MIN_TEXT_LAYER_CHARS = 40
+MIN_TEXT_LAYER_QUALITY = 0.7
+
+# Pages classified (and rendered, when they need OCR) per worker task
+CLASSIFY_CHUNK_PAGES = 4
+
+
+class OcrPage(NamedTuple):
+    """Text recognised on one page (1-based), or the reason it failed."""
+    page_number: int
+    text: str
+    error: str | None = None
+    source: str = SOURCE_OCR
+    bytes_sent: int = 0  # image bytes uploaded to Vision for this page
+
+
+def _text_layer_is_usable(text: str) -> bool:
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_LAYER_CHARS:
+        return False
+    # Letters, marks and numbers: Indic vowel signs (Mn/Mc) are not isalnum() but are real text
+    good = sum(1 for ch in stripped if unicodedata.category(ch)[0] in "LMN" or ch.isspace() or ch in ".,;:()'\"-/%&₹$\u0964\u0965")
+    return good / len(stripped) >= MIN_TEXT_LAYER_QUALITY and "\ufffd" not in stripped
+
+
+def _classify_page(pdf_document, page_index: int, options: OcrImageOptions) -> tuple[str, str | bytes]:
+    """
+    Decides how to read a page: its embedded text layer, OCR of a rendered
+    image, or nothing at all. Returns (source, text) or (SOURCE_OCR, image bytes).
+    """
+    page = pdf_document.load_page(page_index)
+    text = page.get_text("text")
+    if _text_layer_is_usable(text):
+        return SOURCE_TEXT_LAYER, text
+    if not text.strip() and not page.get_images() and not page.get_drawings():
+        return SOURCE_BLANK, ""
+    return SOURCE_OCR, render_page_for_ocr(page, options)
+
+
+def classify_pages(pdf_path: str, start: int, stop: int, options: OcrImageOptions) -> list[tuple[str | None, str | bytes, str | None]]:
+    """
+    `_classify_page` for pages [start, stop) of the PDF at `pdf_path`; runs
+    in a worker process. Returns (source, text or image, error) per page.
+    """
+    import fitz  # PyMuPDF, imported on first use; it is slow to load
+    results = []
+    with fitz.open(pdf_path) as pdf_document:
+        for page_index in range(start, stop):
+            try:
+                results.append((*_classify_page(pdf_document, page_index, options), None))
+            except Exception as e:
+                results.append((None, "", f"Rendering failed: {e}"))
+    return results
+
+
+def _page_count(pdf_path: str) -> int:
+    import fitz
+    with fitz.open(pdf_path) as pdf_document:
+        return len(pdf_document)
+
+
+class OcrPipeline:
+    """
+    Reads PDF pages, OCRing only the ones that need it.
+    Digitally-born pages use their native text layer and blank pages are
+    skipped; the rest are rendered and grouped into Vision
+    `batch_annotate_images` requests, with at most `max_concurrency` batches
+    in flight while later pages are still being classified. Classifying and
+    rendering run in worker processes, one page range per worker ahead of
+    the range being batched; the next range starts only once a batch can be
+    handed to Vision, so rendered images never pile up behind a slow OCR
+    service. A batch is also closed early when its images would exceed the
+    per-request byte budget.
+    Results come back in page order with per-page errors, the path each page
+    took and the bytes sent for it.
+    """
+
+    def __init__(self, vision_client=None, max_concurrency: int = OCR_MAX_CONCURRENCY, batch_size: int = OCR_BATCH_SIZE, options: OcrImageOptions | None = None, workers: WorkerPool | None = None):
+        self._vision_client = vision_client
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = max(1, min(batch_size, 16))
+        self.options = options or OcrImageOptions()
+        self.workers = workers or worker_pool
+
+    @property
+    def vision_client(self):
+        # The shared Vision client unless one was passed in; built on first OCR request
+        return self._vision_client or clients.vision()
+
+    def _annotate(self, images: list[bytes]) -> list[tuple[str, str | None]]:
+        """Blocking Vision call for one batch; returns (text, error) per image."""
+        from google.cloud import vision
+        requests = [
+            vision.AnnotateImageRequest(
+                image=vision.Image(content=image),
+                features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+            )
+            for image in images
+        ]
+        response = self.vision_client.batch_annotate_images(requests=requests)
+        results = []
+        for item in response.responses:
+            if item.error.message:
+                results.append(("", f"Vision API Error: {item.error.message}"))
+            else:
+                results.append((item.full_text_annotation.text if item.full_text_annotation else "", None))
+        return results
+
+    async def _ocr_batch(self, semaphore: asyncio.Semaphore, batch: list[tuple[int, bytes]]) -> list[OcrPage]:
+        async with semaphore:
+            try:
+                results = await asyncio.to_thread(self._annotate, [image for _, image in batch])
+            except Exception as e:
+                logging.error(f"OCR batch for pages {[n for n, _ in batch]} failed: {e}")
+                return [OcrPage(page_number, "", f"OCR request failed: {e}") for page_number, _ in batch]
+        if len(results) != len(batch):
+            # Never let zip() drop pages: each image without a response is reported as failed
+            logging.error(f"Vision returned {len(results)} responses for {len(batch)} pages {[n for n, _ in batch]}")
+            results = results[:len(batch)] + [("", "Vision returned no result for this page")] * (len(batch) - len(results))
+        return [
+            OcrPage(page_number, text, error, SOURCE_OCR, len(image))
+            for (page_number, image), (text, error) in zip(batch, results)
+        ]
+
+    async def _classify(self, pdf_path: str, start: int, stop: int) -> list[tuple[str | None, str | bytes, str | None]]:
+        try:
+            return await self.workers.run(classify_pages, pdf_path, start, stop, self.options)
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e) or type(e).__name__
+            return [(None, "", f"Rendering failed: {error}")] * (stop - start)
+
+    async def _hand_off(self, tasks: list[asyncio.Task], semaphore: asyncio.Semaphore, batch: list[tuple[int, bytes]]):
+        """Queues a batch for Vision once fewer than `max_concurrency` batches are unfinished."""
+        while True:
+            running = [task for task in tasks if not task.done()]
+            if len(running) < self.max_concurrency:
+                break
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        tasks.append(asyncio.create_task(self._ocr_batch(semaphore, batch)))
+
+    async def extract_pdf(self, content: bytes) -> list[OcrPage]:
+        # Workers open the PDF from a file rather than each being sent the whole document
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(content)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = []
+        classified: deque[tuple[int, asyncio.Task]] = deque()
+        batch: list[tuple[int, bytes]] = []
+        batch_bytes = 0
+        try:
+            page_count = await asyncio.to_thread(_page_count, tmp.name)
+            ranges = deque((start, min(start + CLASSIFY_CHUNK_PAGES, page_count)) for start in range(0, page_count, CLASSIFY_CHUNK_PAGES))
+            # One range per worker process is classified ahead; range N+k starts only after range N's pages are handed on
+            ahead = max(1, self.workers.processes)
+            while ranges or classified:
+                while ranges and len(classified) < ahead:
+                    start, stop = ranges.popleft()
+                    classified.append((start, asyncio.create_task(self._classify(tmp.name, start, stop))))
+                start, task = classified.popleft()
+                for page_index, (source, payload, error) in enumerate(await task, start):
+                    if error is not None:
+                        tasks.append(asyncio.create_task(self._done(OcrPage(page_index + 1, "", error))))
+                        continue
+                    if source != SOURCE_OCR:
+                        tasks.append(asyncio.create_task(self._done(OcrPage(page_index + 1, payload, None, source))))
+                        continue
+                    if batch and batch_bytes + len(payload) > self.options.byte_budget:
+                        await self._hand_off(tasks, semaphore, batch)
+                        batch, batch_bytes = [], 0
+                    batch.append((page_index + 1, payload))
+                    batch_bytes += len(payload)
+                    if len(batch) == self.batch_size:
+                        await self._hand_off(tasks, semaphore, batch)
+                        batch, batch_bytes = [], 0
+            if batch:
+                tasks.append(asyncio.create_task(self._ocr_batch(semaphore, batch)))
+            pages = [page for result in await asyncio.gather(*tasks) for page in result]
+        finally:
+            for _, task in classified:
+                task.cancel()
+            for task in tasks:
+                task.cancel()
+            os.remove(tmp.name)
+        return sorted(pages, key=lambda page: page.page_number)
+
+    async def extract_image(self, content: bytes) -> list[OcrPage]:
+        try:
+            image = await self.workers.run(prepare_photo, content, self.options)
+        except Exception as e:
+            return [OcrPage(1, "", f"Image preprocessing failed: {e}")]
+        semaphore = asyncio.Semaphore(1)
+        return await self._ocr_batch(semaphore, [(1, image)])
+
+    @staticmethod
+    async def _done(page: OcrPage) -> list[OcrPage]:
+        return [page]
@@ -0,0 +1,261 @@
+# pii.py
+
+import asyncio
+import json
+import logging
+import re
+
+from core.config import PII_REVIEW_CONTEXT_CHARS, PII_REVIEW_BATCH_SIZE, PII_REVIEW_WINDOW_CHARS
+from core.redaction import RedactionEngine, RedactionResult, RedactionSpan
+
+PLACEHOLDER = "[REDACTED]"
+
+_DATE = (
+    r"\d{1,2}[/.\- ]\d{1,2}[/.\- ]\d{2,4}"
+    r"|\d{1,2}(?:st|nd|rd|th)?\s+[A-Z][a-z]{2,8},?\s+\d{4}"
+    r"|[A-Z][a-z]{2,8}\s+\d{1,2},?\s+\d{4}"
+)
+_NAME_WORD = r"[A-Z](?:[a-z'-]+|[A-Z]*\.?)"  # "Rahul", "O'Neil", "K.", "RAO"
+_PROPER_NAME = rf"{_NAME_WORD}(?:[ \t]+{_NAME_WORD}){{0,3}}"
+
+# Letters, vowel signs and digits of the supported Indian scripts: Devanagari,
+# Bengali/Assamese, Gurmukhi, Gujarati, Odia, Tamil, Telugu, Kannada,
+# Malayalam (U+0900-U+0D7F, without the dandas) and Arabic for Urdu
+INDIC_LETTERS = "\u0620-\u06ff\u0900-\u0963\u0966-\u0d7f"
+_INDIC_WORD = rf"[{INDIC_LETTERS}]+"
+# These scripts have no capital letters, so only labelled values ("पता: ...") are candidates
+_INDIC_VALUE = rf"(?:\d+[A-Za-z/-]*[ \t]+)?{_INDIC_WORD}(?:[ \t]+(?:{_INDIC_WORD}|\d+)){{0,5}}"
+_NON_LATIN_LETTER = re.compile(rf"[{INDIC_LETTERS}]")
+_LETTER = re.compile(rf"[A-Za-z{INDIC_LETTERS}]")
+# Share of letters outside the Latin script above which a document is reviewed in whole windows
+NON_LATIN_SHARE = 0.2
+# langdetect codes of the supported languages written in Indian scripts
+NON_LATIN_LANGUAGES = frozenset("hi mr sa ne bn as pa gu or ta te kn ml ur".split())
+
+# --- Always redacted, decided locally (priority order, see RedactionEngine) ---
+SENSITIVE_DETECTORS = {
+    "email": r"@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "card_number": r"\b\d{4}(?:[\s-]\d{4}){3}\b",
+    "aadhaar": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
+    "ssn": r"\b\d{3}-\d{2}-\d{4}\b",
+    "pan": r"\b[A-Z]{5}\d{4}[A-Z]\b",
+    "voter_id": r"\b[A-Z]{3}\d{7}\b",
+    "driving_licence": r"\b[A-Z]{2}[- ]?\d{2}[- ]?(?:19|20)\d{2}[- ]?\d{7}\b",
+    "passport": r"\b[A-Z]\d{7}\b",
+    "phone": r"(?:\+\d{1,3}[\s-]?)?\b[6-9]\d{4}[\s-]?\d{5}\b",
+    "account_number": r"\b\d{9,18}\b",
+    # Only dates introduced as a birth date; invoice/agreement dates stay readable
+    "date_of_birth": rf"\b(?:DOB|D\.O\.B\.?|Date of [Bb]irth|Born(?: on)?)\s*[:\-]?\s*(?P<date_of_birth_value>{_DATE})",
+}
+SENSITIVE_FIRST_CHARS = "0-9A-Z@+"
+
+# --- Candidates the LLM decides on: whether a name/address is personal depends on context ---
+# Tuned for recall; a candidate the review keeps costs a few tokens, a missed one leaks
+AMBIGUOUS_DETECTORS = {
+    "person_name": rf"\b(?:Mr|Mrs|Ms|Miss|Dr|Shri|Smt|Sri|Kumari)\.?\s+(?P<person_name_value>{_PROPER_NAME})",
+    "party_name": (
+        r"\b(?:Name|Borrower|Lender|Applicant|Guarantor|Witness|Tenant|Landlord|Buyer|Seller|Employee|S/o|D/o|W/o|C/o)"
+        rf"\s*[:\-]\s*(?P<party_name_value>{_PROPER_NAME})"
+    ),
+    "address": r"\b(?:Address|[Rr]esiding (?:at|in)|[Rr]esident of)\s*[:\-]?\s*(?P<address_value>[^\n]{3,160})",
+    "house_no": r"(?:\b(?:Flat|House|Plot|No\.?)|#)\s?\d+[A-Za-z0-9/-]*\b",
+    "street": r"\b(?:[A-Z][\w.'-]*\s+){0,3}(?:Street|St|Road|Rd|Nagar|Colony|Avenue|Ave|Lane|Ln|Block)\b",
+    # Any "label: value" in an Indian script, e.g. "उधारकर्ता: राहुल शर्मा" or "पता: 12 गांधी मार्ग"
+    "indic_value": rf"{_INDIC_WORD}\s*[:\-]\s*(?P<indic_value_value>{_INDIC_VALUE})",
+    # Untitled names: runs of two to four capitalised words ("Rahul Sharma", "Apex Finance Ltd")
+    "name_run": r"\b[A-Z][a-z'-]+(?:[ \t]+[A-Z][a-z'-]+){1,3}\b",
+}
+AMBIGUOUS_FIRST_CHARS = f"A-Zr#{INDIC_LETTERS}"
+NAME_DETECTORS = frozenset({"person_name", "party_name", "name_run"})
+
+REVIEW_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"redact": {"type": "ARRAY", "items": {"type": "INTEGER"}}},
+        "required": ["redact"],
+    },
+}
+
+
+def _merge(spans: list[RedactionSpan]) -> list[RedactionSpan]:
+    """Sorts spans and folds overlapping ones together."""
+    merged: list[RedactionSpan] = []
+    for span in sorted(spans):
+        if merged and span.start < merged[-1].end:
+            last = merged[-1]
+            merged[-1] = RedactionSpan(last.start, max(last.end, span.end), last.type)
+        else:
+            merged.append(span)
+    return merged
+
+
+def _mask(text: str, spans: list[RedactionSpan]) -> str:
+    """Same-length copy of `text` with the given spans starred out, so offsets still line up."""
+    parts = []
+    pos = 0
+    for span in spans:
+        parts.append(text[pos:span.start])
+        parts.append("*" * (span.end - span.start))
+        pos = span.end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def build_review_prompt(windows: list[dict], language: str) -> str:
+    return f"""
+    You are a data privacy expert reviewing short excerpts from a document in the language '{language}'.
+    In each excerpt the candidate is wrapped in [[ ]]; text already hidden is shown as ***.
+    Decide which candidates must be redacted:
+    1. REDACT full street addresses and house numbers of individuals (a city or country alone may stay).
+    2. REDACT names of individuals mentioned incidentally.
+    3. DO NOT REDACT the name of the document's main subject (e.g. the invoice recipient or the borrower),
+       company/organization names, or business addresses and contact details.
+    Candidates:
+    {json.dumps(windows, ensure_ascii=False)}
+    Return JSON {{"redact": [ids of the candidates to redact]}}.
+    """
+
+
+WINDOW_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"redact": {"type": "ARRAY", "items": {"type": "STRING"}}},
+        "required": ["redact"],
+    },
+}
+
+
+def build_window_prompt(excerpt: str, language: str) -> str:
+    return f"""
+    You are a data privacy expert reviewing part of a document in the language '{language}'.
+    Text already hidden is shown as ***.
+    Find the personal information that must be redacted:
+    1. REDACT full street addresses and house numbers of individuals (a city or country alone may stay).
+    2. REDACT names of individuals mentioned incidentally.
+    3. DO NOT REDACT the name of the document's main subject (e.g. the invoice recipient or the borrower),
+       company/organization names, or business addresses and contact details.
+    Text:
+    ---
+    {excerpt}
+    ---
+    Return JSON {{"redact": [each text to redact, copied exactly as it appears above]}}.
+    """
+
+
+def is_latin_script(text: str, language: str) -> bool:
+    """False for the Indian languages and for text whose letters are mostly in their scripts."""
+    if language.split("-")[0] in NON_LATIN_LANGUAGES:
+        return False
+    letters = len(_LETTER.findall(text))
+    return not letters or len(_NON_LATIN_LETTER.findall(text)) / letters <= NON_LATIN_SHARE
+
+
+
+class HybridRedactor:
+    """
+    Local-first PII redaction for verification reports.
+    IDs, account/card numbers, phones, emails and dates of birth are found by
+    RedactionEngine and hidden without any network call. Only names and
+    addresses, where the right answer depends on context, go to the LLM, each
+    as a small window around its first occurrence, so LLM tokens scale with
+    the ambiguous content rather than the document length. If the review call
+    fails the candidates are redacted anyway.
+
+    Names in Indian scripts cannot be spotted by capitalisation, so documents
+    not in the Latin script are instead sent whole, in `window_chars` windows,
+    for the LLM to pick out names and addresses; where a window's review
+    fails, the local candidates in it are redacted.
+    """
+
+    def __init__(self, llm, context_chars: int = PII_REVIEW_CONTEXT_CHARS, batch_size: int = PII_REVIEW_BATCH_SIZE, window_chars: int = PII_REVIEW_WINDOW_CHARS):
+        self.llm = llm
+        self.context_chars = context_chars
+        self.batch_size = max(1, batch_size)
+        self.window_chars = max(window_chars, 2 * context_chars + 1)
+        self.sensitive = RedactionEngine(SENSITIVE_DETECTORS, PLACEHOLDER, SENSITIVE_FIRST_CHARS)
+        self.ambiguous = RedactionEngine(AMBIGUOUS_DETECTORS, PLACEHOLDER, AMBIGUOUS_FIRST_CHARS)
+
+    def _candidates(self, text: str, sensitive: list[RedactionSpan]) -> dict[tuple[str, str], list[RedactionSpan]]:
+        """Ambiguous spans grouped by (kind, value), skipping ones already hidden locally."""
+        groups: dict[tuple[str, str], list[RedactionSpan]] = {}
+        covered = iter(sensitive)
+        current = next(covered, None)
+        for span in self.ambiguous.scan(text):
+            while current is not None and current.end <= span.start:
+                current = next(covered, None)
+            if current is not None and current.start <= span.start and span.end <= current.end:
+                continue
+            kind = {"indic_value": "name or address"}.get(span.type, "name" if span.type in NAME_DETECTORS else "address")
+            value = " ".join(text[span.start:span.end].split())
+            groups.setdefault((kind, value), []).append(span)
+        return groups
+
+    async def _review(self, windows: list[dict], language: str) -> set[int]:
+        """Asks the LLM which of these candidates to redact; on failure, all of them."""
+        try:
+            response = await self.llm.generate(build_review_prompt(windows, language), generation_config=REVIEW_GENERATION_CONFIG)
+            ids = json.loads(response).get("redact", [])
+            return {int(i) for i in ids}
+        except Exception as e:
+            logging.warning(f"PII review failed, redacting {len(windows)} candidates locally: {e}")
+            return {window["id"] for window in windows}
+
+    async def _review_window(self, excerpt: str, language: str) -> list[str] | None:
+        """Asks the LLM for the texts to redact in one window; None if the call fails."""
+        try:
+            response = await self.llm.generate(build_window_prompt(excerpt, language), generation_config=WINDOW_GENERATION_CONFIG)
+            return [str(value) for value in json.loads(response).get("redact", [])]
+        except Exception as e:
+            logging.warning(f"PII window review failed, redacting its candidates locally: {e}")
+            return None
+
+    async def _review_windows(self, text: str, sensitive: list[RedactionSpan], groups: dict, language: str) -> list[RedactionSpan]:
+        masked = _mask(text, sensitive)
+        # Windows overlap by the review context, so a name cut at one edge is whole in the next window
+        step = self.window_chars - self.context_chars
+        starts = range(0, max(1, len(text) - self.context_chars), step)
+        decisions = await asyncio.gather(*(self._review_window(masked[start:start + self.window_chars], language) for start in starts))
+        spans = []
+        for start, values in zip(starts, decisions):
+            stop = start + self.window_chars
+            if values is None:
+                spans.extend(span for occurrences in groups.values() for span in occurrences if start <= span.start < stop)
+                continue
+            excerpt = masked[start:stop]
+            for value in {value.strip() for value in values}:
+                if not value or "*" in value:
+                    continue
+                found = excerpt.find(value)
+                while found != -1:
+                    spans.append(RedactionSpan(start + found, start + found + len(value), "llm"))
+                    found = excerpt.find(value, found + len(value))
+        return spans
+
+    async def redact(self, text: str, language: str = "en") -> RedactionResult:
+        if not text:
+            return RedactionResult("", [])
+        sensitive = self.sensitive.scan(text)
+        groups = self._candidates(text, sensitive)
+        spans = list(sensitive)
+
+        if not is_latin_script(text, language):
+            spans.extend(await self._review_windows(text, sensitive, groups, language))
+        elif groups:
+            masked = _mask(text, sensitive)
+            windows = []
+            for index, ((kind, _), occurrences) in enumerate(groups.items()):
+                first = occurrences[0]
+                before = masked[max(0, first.start - self.context_chars):first.start]
+                after = masked[first.end:first.end + self.context_chars]
+                windows.append({"id": index, "type": kind, "excerpt": f"{before}[[{masked[first.start:first.end]}]]{after}"})
+            batches = [windows[i:i + self.batch_size] for i in range(0, len(windows), self.batch_size)]
+            decisions = await asyncio.gather(*(self._review(batch, language) for batch in batches))
+            approved = set().union(*decisions)
+            for index, occurrences in enumerate(groups.values()):
+                if index in approved:
+                    spans.extend(occurrences)
+
+        spans = _merge(spans)
+        return RedactionResult(self.sensitive.apply(text, spans), spans)
@@ -0,0 +1,102 @@
+# preprocess.py
+
+import math
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from core.config import (
+    OCR_TARGET_PIXELS,
+    OCR_MIN_DPI,
+    OCR_MAX_DPI,
+    OCR_GRAYSCALE,
+    OCR_IMAGE_FORMAT,
+    OCR_JPEG_QUALITY,
+    OCR_REQUEST_BYTE_BUDGET,
+)
+
+# Re-encoding attempts when an image alone is over the byte budget
+MAX_SHRINK_ATTEMPTS = 4
+
+
+class OcrImageTooLarge(ValueError):
+    """An image could not be brought under the per-request byte budget."""
+
+
+class OcrImageOptions:
+    """How images are prepared before they are sent to Vision."""
+
+    def __init__(
+        self,
+        target_pixels: int = OCR_TARGET_PIXELS,
+        min_dpi: int = OCR_MIN_DPI,
+        max_dpi: int = OCR_MAX_DPI,
+        grayscale: bool = OCR_GRAYSCALE,
+        image_format: str = OCR_IMAGE_FORMAT,
+        jpeg_quality: int = OCR_JPEG_QUALITY,
+        byte_budget: int = OCR_REQUEST_BYTE_BUDGET,
+    ):
+        if image_format not in ("auto", "jpeg", "png"):
+            raise ValueError(f"Unsupported OCR image format: {image_format}")
+        self.target_pixels = target_pixels
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.grayscale = grayscale
+        self.image_format = image_format
+        self.jpeg_quality = jpeg_quality
+        self.byte_budget = byte_budget
+
+
+def page_dpi(page, options: OcrImageOptions) -> int:
+    """DPI that renders this page at roughly `target_pixels`, clamped to [min_dpi, max_dpi]."""
+    area_sq_inches = (page.rect.width / 72) * (page.rect.height / 72)
+    if area_sq_inches <= 0:
+        return options.min_dpi
+    dpi = math.sqrt(options.target_pixels / area_sq_inches)
+    return int(max(options.min_dpi, min(options.max_dpi, dpi)))
+
+
+def _encode_pixmap(pix, options: OcrImageOptions) -> bytes:
+    # Rendered pages are mostly flat background and sharp glyphs, which PNG compresses best
+    if options.image_format == "jpeg":
+        return pix.tobytes("jpg", jpg_quality=options.jpeg_quality)
+    return pix.tobytes("png")
+
+
+def render_page_for_ocr(page, options: OcrImageOptions) -> bytes:
+    """Rasterises a PDF page at adaptive DPI, grayscale if configured, within the byte budget."""
+    import fitz  # PyMuPDF
+    colorspace = fitz.csGRAY if options.grayscale else fitz.csRGB
+    dpi = page_dpi(page, options)
+    for _ in range(MAX_SHRINK_ATTEMPTS):
+        image = _encode_pixmap(page.get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False), options)
+        if len(image) <= options.byte_budget:
+            return image
+        # Bytes scale roughly with pixel count, i.e. with dpi squared
+        dpi = max(36, int(dpi * math.sqrt(options.byte_budget / len(image)) * 0.9))
+    raise OcrImageTooLarge(f"Page image is {len(image)} bytes, over the {options.byte_budget} byte budget")
+
+
+def prepare_photo(content: bytes, options: OcrImageOptions) -> bytes:
+    """Orients, converts and downscales an uploaded photo/scan to the pixel and byte budgets."""
+    with Image.open(BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("L" if options.grayscale else "RGB")
+
+    scale = min(1.0, math.sqrt(options.target_pixels / (image.width * image.height)))
+    for _ in range(MAX_SHRINK_ATTEMPTS):
+        if scale < 1.0:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            resized = image.resize(size, Image.LANCZOS)
+        else:
+            resized = image
+        buffer = BytesIO()
+        if options.image_format in ("auto", "jpeg"):
+            resized.save(buffer, format="JPEG", quality=options.jpeg_quality, optimize=True)
+        else:
+            resized.save(buffer, format="PNG", optimize=True)
+        data = buffer.getvalue()
+        if len(data) <= options.byte_budget:
+            return data
+        scale *= math.sqrt(options.byte_budget / len(data)) * 0.9
+    raise OcrImageTooLarge(f"Image is {len(data)} bytes, over the {options.byte_budget} byte budget")
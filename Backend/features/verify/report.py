@@ -0,0 +1,186 @@
+# report.py
+
+import logging
+import os
+import threading
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Paragraph
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from core.config import REPORT_FONTS_DIR
+from features.verify.schemas import VerificationReport
+
+# Font family for each report language
+LANGUAGE_FONT_MAP = {
+    'hi': 'NotoSansDevanagari',    # Hindi
+    'bn': 'NotoSansBengali',      # Bengali
+    'mr': 'NotoSansDevanagari',    # Marathi (uses Devanagari script)
+    'te': 'NotoSansTelugu',       # Telugu
+    'ta': 'NotoSansTamil',        # Tamil
+    'gu': 'NotoSansGujarati',     # Gujarati
+    'kn': 'NotoSansKannada',      # Kannada
+    'ml': 'NotoSansMalayalam',    # Malayalam
+    'pa': 'NotoSansGurmukhi',     # Punjabi (uses Gurmukhi script)
+    'en': 'Poppins'              # English
+}
+HEADER_FAMILY = 'Poppins'
+# Built into every PDF reader; used when a family's TTF files are missing
+FALLBACK_FAMILY = 'Helvetica'
+
+
+def font_files(family: str, fonts_dir: str = REPORT_FONTS_DIR) -> tuple[str, str]:
+    """(regular, bold) TTF paths: fonts/Poppins/ or fonts/Noto_Sans_<Script>/static/."""
+    if family.startswith('NotoSans'):
+        font_dir = os.path.join(fonts_dir, f'Noto_Sans_{family[len("NotoSans"):]}', 'static')
+    else:
+        font_dir = os.path.join(fonts_dir, family)
+    return os.path.join(font_dir, f'{family}-Regular.ttf'), os.path.join(font_dir, f'{family}-Bold.ttf')
+
+
+class FontRegistry:
+    """
+    Registers each font family with ReportLab once, on first use.
+    TTF parsing is the expensive part of a report, so a family is parsed
+    the first time a report needs it and reused by every later report;
+    families that cannot be loaded resolve to Helvetica without retrying.
+    """
+
+    def __init__(self, fonts_dir: str = REPORT_FONTS_DIR):
+        self.fonts_dir = fonts_dir
+        self._resolved: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def family(self, family: str) -> str:
+        """Name to pass to ReportLab for `family` (regular; bold is '<name>-Bold')."""
+        resolved = self._resolved.get(family)
+        if resolved is not None:
+            return resolved
+        with self._lock:
+            if family not in self._resolved:
+                self._resolved[family] = self._register(family)
+            return self._resolved[family]
+
+    def for_language(self, language_code: str) -> str:
+        return self.family(LANGUAGE_FONT_MAP.get(language_code, HEADER_FAMILY))
+
+    def _register(self, family: str) -> str:
+        regular, bold = font_files(family, self.fonts_dir)
+        if not (os.path.exists(regular) and os.path.exists(bold)):
+            logging.warning(f"Font files for {family} not found in {os.path.dirname(regular)}; using {FALLBACK_FAMILY}")
+            return FALLBACK_FAMILY
+        try:
+            pdfmetrics.registerFont(TTFont(family, regular))
+            pdfmetrics.registerFont(TTFont(f'{family}-Bold', bold))
+            pdfmetrics.registerFontFamily(family, normal=family, bold=f'{family}-Bold')
+        except Exception as e:
+            logging.warning(f"Font registration failed for {family}: {e}; using {FALLBACK_FAMILY}")
+            return FALLBACK_FAMILY
+        logging.info(f"Registered {family} font family")
+        return family
+
+
+class ReportTemplate:
+    """
+    Layout of the verification PDF.
+    Everything that does not depend on the report (fonts, paragraph styles
+    per family, page geometry and label positions) is computed once and
+    shared. ReportLab canvases cannot share drawn content, so the header
+    and labels are still drawn per document; they are a few text operators.
+    """
+
+    TITLE = "Document Verification Report"
+
+    def __init__(self, fonts: FontRegistry, pagesize=letter):
+        self.fonts = fonts
+        self.width, self.height = pagesize
+        self.pagesize = pagesize
+        self.value_x = inch + 1.7 * inch
+        self.value_width = self.width - 3.7 * inch
+        self.details_width = self.width - 2 * inch
+        self._base_body = getSampleStyleSheet()['BodyText']
+        self._styles: dict[str, ParagraphStyle] = {}
+
+    def body_style(self, family: str) -> ParagraphStyle:
+        style = self._styles.get(family)
+        if style is None:
+            style = ParagraphStyle(f'BodyText-{family}', parent=self._base_body, fontName=family, leading=14)
+            self._styles[family] = style
+        return style
+
+    def _bold(self, family: str) -> str:
+        return f'{family}-Bold' if family != FALLBACK_FAMILY else 'Helvetica-Bold'
+
+    def render(self, report_data: VerificationReport) -> BytesIO:
+        """Generates a PDF report using language-specific fonts."""
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=self.pagesize)
+        width, height = self.width, self.height
+
+        header_bold = self._bold(self.fonts.family(HEADER_FAMILY))
+        style_body = self.body_style(self.fonts.for_language(report_data.report_language))
+
+        # --- PDF Header ---
+        c.setFont(header_bold, 16)
+        c.drawString(inch, height - inch, self.TITLE)
+        c.line(inch, height - inch - 5, width - inch, height - inch - 5)
+
+        # --- Report Metadata ---
+        report_items = [
+            ("Filename:", report_data.filename),
+            ("Storage URL:", report_data.storage_url or "N/A"),
+            ("Source Language:", report_data.detected_language.upper()),
+            ("Report Language:", report_data.report_language.upper()),
+            ("Verification Status:", str(report_data.verification_status)),
+            ("Confidence Score:", f"{report_data.confidence_score}%"),
+            ("Summary:", report_data.summary)
+        ]
+
+        text_y = height - 1.75 * inch
+        for label, value in report_items:
+            c.setFont(header_bold, 11)
+            c.drawString(inch, text_y, label)
+
+            p = Paragraph(escape(str(value)), style_body)
+            p_width, p_height = p.wrapOn(c, self.value_width, height)
+            p.drawOn(c, self.value_x, text_y - (p_height / 2) + 2)
+
+            text_y -= (p_height + 0.25 * inch)
+
+        # --- Analysis Details Section ---
+        c.setFont(header_bold, 11)
+        c.drawString(inch, text_y, "Analysis Details:")
+        text_y -= 0.25 * inch
+
+        p_details = Paragraph(escape(report_data.analysis_details).replace('\n', '<br/>'), style_body)
+        p_width_details, p_height_details = p_details.wrapOn(c, self.details_width, height)
+
+        if text_y - p_height_details < inch:
+            c.showPage()
+            text_y = height - inch
+            c.setFont(header_bold, 11)
+            c.drawString(inch, text_y, "Analysis Details (Continued):")
+            text_y -= 0.25 * inch
+
+        p_details.drawOn(c, inch, text_y - p_height_details)
+
+        c.showPage()
+        c.save()
+        buffer.seek(0)
+        return buffer
+
+
+# Shared by every request; fonts load lazily on first use
+font_registry = FontRegistry()
+report_template = ReportTemplate(font_registry)
+
+
+def render_report(report_data: VerificationReport) -> bytes:
+    """The report's PDF bytes; a module-level function so worker processes can run it (see core/workers.py)."""
+    return report_template.render(report_data).getvalue()
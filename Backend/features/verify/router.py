@@ -1,28 +1,16 @@
 # router.py
 
+import asyncio
 import logging
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from typing import Dict, Any
 
 # Import the service and schemas
-from features.verification.service import verification_service
-from features.verification.schemas import VerificationReport, ReportLanguage
-
-
-# --- NEW: Mapping from full language name to ISO code ---
-LANGUAGE_CODE_MAP = {
-    "English": "en",
-    "Hindi": "hi",
-    "Bengali": "bn",
-    "Marathi": "mr",
-    "Telugu": "te",
-    "Tamil": "ta",
-    "Gujarati": "gu",
-    "Kannada": "kn",
-    "Malayalam": "ml",
-    "Punjabi": "pa",
-}
+from features.verify.service import verification_service
+from features.verify.schemas import VerificationReport, ReportLanguage, LANGUAGE_CODE_MAP
+from core.jobs import job_queue, JobContext, JobQueueFull
+from core.uploads import spool_upload
 
 
 router = APIRouter(
@@ -30,6 +18,37 @@ router = APIRouter(
     tags=["Document Verification"]
 )
 
+VERIFY_JOB_STAGES = ["ocr", "redaction", "upload", "analysis", "report"]
+
+
+def report_filename(language_code: str, filename: str) -> str:
+    safe_filename = "".join(c for c in filename if c.isalnum() or c in ('.', '_')).rstrip()
+    return f"verification_report_{language_code}_{safe_filename}.pdf"
+
+
+async def run_verify_job(ctx: JobContext, payload: dict) -> dict:
+    """
+    Background version of /documents/verify: the PDF is kept as the job's `report.pdf` artifact.
+    The upload waits in the queue as its spool file; the bytes are read only once the job runs.
+    """
+    with payload["upload"] as upload:
+        file_content = await asyncio.to_thread(upload.read_bytes)
+    report_data = await verification_service.verify_document(
+        file_content=file_content,
+        filename=payload["filename"],
+        description=payload["description"],
+        output_language=payload["language_code"],
+        user_id=ctx.user_id,
+        progress=ctx.progress
+    )
+    await ctx.progress("report")
+    pdf_buffer = await asyncio.to_thread(verification_service.generate_pdf_report, report_data)
+    await ctx.save_artifact("report.pdf", pdf_buffer.getvalue(), "application/pdf")
+    return report_data.model_dump(mode="json")
+
+
+job_queue.register("verify", run_verify_job, VERIFY_JOB_STAGES)
+
 @router.post(
     "/verify",
     summary="Verify a document and get a translated PDF report",
@@ -46,13 +65,15 @@ async def verify_document_endpoint(
         ReportLanguage.ENGLISH, # Default value
         description="Select the language for the final analysis report."
     ),
-        user_id: str = Form(..., description="Firebase user ID for organizing docs in GCS")
+        user_id: str = Form(..., description="Firebase user ID for organizing docs in GCS"),
+    job: bool = Form(False, description="Run in the background and return a job ID instead of the PDF.")
 
 ):
     """
     Handles file upload, calls the verification service with a target language from the dropdown, and returns a PDF report.
         - Stores only the redacted file in GCS: docs/{user_id}/{filename}.txt
         - Returns the PDF report as a downloadable file.
+        - With job=true, returns 202 and a job ID; the PDF is fetched from /jobs/{job_id}/report.pdf.
         - Logs key events and errors for monitoring.
     """
     try:
@@ -62,28 +83,54 @@ async def verify_document_endpoint(
             f"User: {user_id}, Language: {output_language.value} ({language_code})"
         )
 
-        file_content = await file.read()
+        # Streamed in chunks with the upload size limit; OCR needs the bytes themselves
+        upload = await spool_upload(file)
 
-        report_data: VerificationReport = verification_service.verify_document(
+        if job:
+            try:
+                queued = await job_queue.submit(
+                    "verify",
+                    user_id,
+                    payload={
+                        "upload": upload,  # the job deletes the spool file once it has read it
+                        "filename": file.filename,
+                        "description": description,
+                        "language_code": language_code,
+                    },
+                    meta={"filename": file.filename, "report_filename": report_filename(language_code, file.filename)},
+                )
+            except JobQueueFull as e:
+                upload.close()
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Too many jobs queued: {e}", headers={"Retry-After": "30"})
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+                "job_id": queued["job_id"],
+                "status": queued["status"],
+                "status_url": f"/jobs/{queued['job_id']}?user_id={user_id}",
+                "events_url": f"/jobs/{queued['job_id']}/events?user_id={user_id}",
+            })
+
+        with upload:
+            file_content = upload.read_bytes()
+
+        report_data: VerificationReport = await verification_service.verify_document(
             file_content=file_content,
             filename=file.filename,
             description=description,
             output_language=language_code,
             user_id=user_id
         )
-        pdf_buffer = verification_service.generate_pdf_report(report_data)
-        
-        safe_filename = "".join(c for c in file.filename if c.isalnum() or c in ('.', '_')).rstrip()
-        report_filename = f"verification_report_{language_code}_{safe_filename}.pdf"
+        pdf_buffer = await asyncio.to_thread(verification_service.generate_pdf_report, report_data)
 
         logging.info(f"Successfully generated '{language_code}' report for {file.filename}.")
 
         return StreamingResponse(
             pdf_buffer,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={report_filename}"}
+            headers={"Content-Disposition": f"attachment; filename={report_filename(language_code, file.filename)}"}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"An unexpected error occurred during document verification for {file.filename}: {e}", exc_info=True)
         raise HTTPException(
@@ -109,14 +156,16 @@ async def simple_analyze_endpoint(
     try:
         logging.info(f"Received request for simple analysis of document: {file.filename}")
 
-        file_content = await file.read()
+        # Streamed in chunks with the upload size limit; OCR needs the bytes themselves
+        with await spool_upload(file) as upload:
+            file_content = upload.read_bytes()
         status_map = {
     "VERIFIED": "authentic",
     "SUSPICIOUS": "suspicious",
     "INDETERMINATE": "fake",
     "ERROR": "fake"
 }
-        analysis_result = verification_service.simple_analyze(
+        analysis_result = await verification_service.simple_analyze(
             file_content=file_content,
             filename=file.filename,
             description=description
@@ -133,6 +182,8 @@ async def simple_analyze_endpoint(
 
         logging.info(f"Successfully completed simple analysis for {file.filename}.")
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"An unexpected error occurred during simple analysis for {file.filename}: {e}", exc_info=True)
         raise HTTPException(
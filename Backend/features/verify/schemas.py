@@ -16,7 +16,21 @@ class ReportLanguage(str, Enum):
     KANNADA = "Kannada"
     MALAYALAM = "Malayalam"
     PUNJABI = "Punjabi"
-    
+
+# --- NEW: Mapping from full language name to ISO code ---
+LANGUAGE_CODE_MAP = {
+    "English": "en",
+    "Hindi": "hi",
+    "Bengali": "bn",
+    "Marathi": "mr",
+    "Telugu": "te",
+    "Tamil": "ta",
+    "Gujarati": "gu",
+    "Kannada": "kn",
+    "Malayalam": "ml",
+    "Punjabi": "pa",
+}
+
 class VerificationStatus(str, Enum):
     """Enumeration for the verification status of a document."""
     VERIFIED = "VERIFIED"
@@ -59,4 +73,16 @@ class VerificationReport(BaseModel):
     extracted_text: str = Field(
         ..., 
         description="The full, redacted text extracted from the document."
+    )
+    ocr_errors: list[str] = Field(
+        default_factory=list,
+        description="Per-page OCR failures, e.g. 'Page 3: Vision API Error: ...'. Empty when every page was read."
+    )
+    page_sources: list[str] = Field(
+        default_factory=list,
+        description="How each page was read, in page order: 'text_layer' (embedded PDF text), 'ocr' or 'blank' (skipped)."
+    )
+    ocr_bytes_sent: list[int] = Field(
+        default_factory=list,
+        description="Image bytes uploaded to Vision for each page, in page order (0 when no OCR was needed)."
     )
\ No newline at end of file
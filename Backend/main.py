@@ -1,13 +1,18 @@
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import your routers
 from features.auth.router import router as auth_router
-from features.documents.router import router as docs_router
+from features.docs.router import router as docs_router
 from features.chat.router import router as chat_router
-from features.verification.router import router as verification_router
-from features.Media.router import router as media_router
+from features.verify.router import router as verification_router
+from features.media.router import router as media_router
+from features.jobs.router import router as jobs_router
+from core.llm import gemini_client
+from core.jobs import job_queue
+from core.metrics import CONTENT_TYPE, registry
+from core.workers import worker_pool
 
 app = FastAPI(title="Docqulio Chatbot API")
 
@@ -19,6 +24,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Page-Token"],  # read by the paged media gallery
 )
 
 # Register routers
@@ -27,12 +33,31 @@ app.include_router(docs_router)
 app.include_router(chat_router)
 app.include_router(verification_router)
 app.include_router(media_router)
+app.include_router(jobs_router)
+
+# Spawn the worker processes (and load the parsers into them) while the server starts,
+# not during the first upload
+@app.on_event("startup")
+async def start_workers():
+    worker_pool.start(preload=("core.extraction", "features.docs.service", "features.verify.ocr", "features.verify.report"))
+
+# Close pooled HTTP connections on shutdown
+@app.on_event("shutdown")
+async def close_clients():
+    await job_queue.shutdown()
+    await gemini_client.aclose()
+    worker_pool.shutdown()
 
 # Health check endpoint
 @app.get("/")
 def root():
     return {"message": "Backend running ✅"}
 
+# Prometheus scrape target: per-stage latency histograms, byte/token/page counters, in-flight gauges
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 @app.get("/test-integration")
 def test_integration():
     return {"status": "success", "message": "Connection successful!"}
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the backend the way main.py does: `core...` and `features...` from Backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Modules that create API clients at import time only need these to be set
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("GCS_BUCKET_NAME", "test-bucket")
@@ -0,0 +1,39 @@
+import asyncio
+
+from features.verify.ocr import OcrPipeline, _text_layer_is_usable
+
+# Scored 0.66 and 0.64 when only isalnum() counted, below MIN_TEXT_LAYER_QUALITY
+HINDI = "इस अनुबंध की शर्तों के अनुसार उधारकर्ता को निर्धारित तिथि पर ब्याज सहित पूरी राशि लौटानी होगी।"
+TAMIL = "கடன் வாங்குபவர் ஒவ்வொரு மாதமும் வட்டியுடன் தவணையை செலுத்த வேண்டும்."
+ENGLISH = "This Loan Agreement is made between the Borrower and the Lender on 1 April 2024."
+
+
+def test_indic_text_layers_are_usable():
+    # Vowel signs are marks (Mn/Mc), not alphanumerics; they must still count as text
+    assert _text_layer_is_usable(HINDI)
+    assert _text_layer_is_usable(TAMIL)
+    assert _text_layer_is_usable(ENGLISH)
+
+
+def test_garbled_text_layers_are_not_usable():
+    assert not _text_layer_is_usable("short")
+    assert not _text_layer_is_usable("\x01\x02\x03\x04 " * 20)
+    assert not _text_layer_is_usable(ENGLISH + "\ufffd")
+
+
+class ShortVisionClient:
+    """Answers a batch with one response fewer than the images sent."""
+
+    def batch_annotate_images(self, requests):
+        from google.cloud import vision
+        responses = [vision.AnnotateImageResponse(full_text_annotation={"text": f"page text {i}"}) for i in range(len(requests) - 1)]
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+
+def test_pages_missing_from_a_vision_response_are_reported():
+    pipeline = OcrPipeline(ShortVisionClient())
+    batch = [(1, b"image-1"), (2, b"image-2"), (3, b"image-3")]
+    pages = asyncio.run(pipeline._ocr_batch(asyncio.Semaphore(1), batch))
+    assert [page.page_number for page in pages] == [1, 2, 3]
+    assert [page.error is None for page in pages] == [True, True, False]
+    assert pages[2].text == "" and "no result" in pages[2].error
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import re
+
+from features.verify.pii import HybridRedactor, is_latin_script
+
+ENGLISH = "This agreement is made between Rahul Sharma, residing in Pune."
+HINDI = "उधारकर्ता: राहुल शर्मा, पता: 12 गांधी मार्ग, पुणे"
+
+
+class ApprovingReview:
+    """Review stub that redacts every candidate; in window reviews, the names and addresses of HINDI."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        if generation_config["response_schema"]["properties"]["redact"]["items"]["type"] == "INTEGER":
+            return json.dumps({"redact": [int(i) for i in re.findall(r'"id": (\d+)', prompt)]})
+        return json.dumps({"redact": ["राहुल शर्मा", "12 गांधी मार्ग"]})
+
+
+class FailingReview:
+    async def generate(self, prompt, generation_config=None):
+        raise RuntimeError("review unavailable")
+
+
+def redact(llm, text, language):
+    return asyncio.run(HybridRedactor(llm).redact(text, language)).text
+
+
+def test_untitled_english_name_and_address_are_candidates():
+    assert redact(ApprovingReview(), ENGLISH, "en") == "This agreement is made between [REDACTED], residing in [REDACTED]"
+
+
+def test_hindi_document_is_reviewed_in_whole_windows():
+    review = ApprovingReview()
+    assert redact(review, HINDI, "hi") == "उधारकर्ता: [REDACTED], पता: [REDACTED], पुणे"
+    assert len(review.prompts) == 1 and HINDI in review.prompts[0]
+
+
+def test_failed_review_redacts_local_candidates():
+    assert redact(FailingReview(), ENGLISH, "en") == "This agreement is made between [REDACTED], residing in [REDACTED]"
+    assert redact(FailingReview(), HINDI, "hi") == "उधारकर्ता: [REDACTED], पता: [REDACTED], पुणे"
+
+
+def test_script_detection_does_not_trust_the_language_code_alone():
+    assert is_latin_script(ENGLISH, "en")
+    assert not is_latin_script(HINDI, "en")
+    assert not is_latin_script(ENGLISH, "hi")
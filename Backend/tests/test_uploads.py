@@ -0,0 +1,67 @@
+import asyncio
+import os
+import tracemalloc
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from core.gcs import ContentStore, LocalBackend
+from core.uploads import spool_upload
+
+SIZE_MB = 32
+CHUNK_SIZE = 1024 * 1024
+# Spooling and storing stream in chunks, so the peak must not grow with the file
+PEAK_LIMIT_BYTES = 8 * CHUNK_SIZE
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "scan.pdf"
+    block = os.urandom(CHUNK_SIZE)
+    with open(path, "wb") as f:
+        for i in range(SIZE_MB):
+            f.write(block[:-8] + i.to_bytes(8, "big"))
+    return str(path)
+
+
+def upload_file(path: str) -> UploadFile:
+    # What FastAPI hands the endpoint: the request body already spooled by Starlette
+    return UploadFile(file=open(path, "rb"), filename="scan.pdf", headers=Headers({"content-type": "application/pdf"}))
+
+
+def test_spool_and_store_peak_memory_is_bounded(source, tmp_path):
+    storage_root = str(tmp_path / "storage")
+    store = ContentStore("test", backend=LocalBackend(storage_root, chunk_size=CHUNK_SIZE))
+    file = upload_file(source)
+
+    async def accept():
+        with await spool_upload(file, max_bytes=SIZE_MB * CHUNK_SIZE, chunk_size=CHUNK_SIZE, spool_dir=str(tmp_path)) as upload:
+            return await asyncio.to_thread(store.put_file, "u", upload.filename, upload.path, upload.content_type, upload.sha256, upload.size)
+
+    tracemalloc.start()
+    try:
+        stored = asyncio.run(accept())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        file.file.close()
+
+    assert stored.uploaded
+    assert os.path.getsize(os.path.join(storage_root, *stored.content_object.split("/"))) == SIZE_MB * CHUNK_SIZE
+    assert peak < PEAK_LIMIT_BYTES, f"peak {peak / CHUNK_SIZE:.1f} MB for a {SIZE_MB} MB upload"
+
+
+def test_oversized_upload_is_rejected_with_413_before_it_is_all_read(source, tmp_path):
+    max_bytes = SIZE_MB * CHUNK_SIZE // 4
+    file = upload_file(source)
+    try:
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(spool_upload(file, max_bytes=max_bytes, chunk_size=CHUNK_SIZE, spool_dir=str(tmp_path)))
+        read = file.file.tell()
+    finally:
+        file.file.close()
+
+    assert raised.value.status_code == 413
+    assert read <= max_bytes + CHUNK_SIZE
+    assert os.listdir(tmp_path) == ["scan.pdf"]  # the partial spool file was removed
@@ -10,9 +10,10 @@ import { useAuth } from '../contexts/AuthContext';
 // 1. Updated interfaces to use the secure `access_url` from the backend
 interface GCSFile {
   filename: string;
-  access_url: string; 
+  access_url?: string;
+  gcs_url?: string;
   content_type: string;
-  size: number;
+  size: number | null;
   last_modified: string;
 }
 
@@ -27,16 +28,53 @@ interface MediaFile {
 }
 
 const API_URL = 'http://localhost:8000'; // Your backend URL
+const PAGE_SIZE = 50; // Files fetched per request; "Load more" follows X-Next-Page-Token
+
+const formatSize = (size: number | null): string => {
+  if (size === null || size === undefined) return '—';
+  if (size < 1024) return `${size} B`;
+  if (size < 1024 * 1024) return `${(size / 1024).toFixed(1)} KB`;
+  return `${(size / (1024 * 1024)).toFixed(1)} MB`;
+};
+
+// Map the raw API data to the MediaFile interface for the UI
+const toMediaFile = (file: GCSFile): MediaFile => {
+  const url = file.access_url ?? file.gcs_url ?? '';
+  return {
+    id: url || file.filename, // The URL is unique enough for a key
+    name: file.filename,
+    type: file.content_type?.startsWith('image/') ? 'image' : 'document',
+    size: formatSize(file.size),
+    uploadDate: new Date(file.last_modified),
+    access_url: url,
+    category: 'user-input',
+  };
+};
 
 const MediaGallery: React.FC = () => {
   const { user } = useAuth();
 
   const [files, setFiles] = useState<MediaFile[]>([]);
   const [isLoading, setIsLoading] = useState<boolean>(true);
+  const [isLoadingMore, setIsLoadingMore] = useState<boolean>(false);
+  const [nextPageToken, setNextPageToken] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState<'all' | 'document' | 'image'>('all');
   
+  // One page of the listing, newest first, and the token for the next page (null on the last one)
+  const fetchPage = async (uid: string, pageToken: string | null) => {
+    const params = new URLSearchParams({ page_size: String(PAGE_SIZE) });
+    if (pageToken) params.set('page_token', pageToken);
+    const response = await fetch(`${API_URL}/docs/${uid}?${params}`);
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Failed to fetch files.');
+    }
+    const data: GCSFile[] = await response.json();
+    return { files: data.map(toMediaFile), next: response.headers.get('X-Next-Page-Token') };
+  };
+
   useEffect(() => {
     const fetchFiles = async () => {
       if (!user) {
@@ -49,39 +87,9 @@ const MediaGallery: React.FC = () => {
       setError(null);
 
       try {
-        const response = await fetch(`${API_URL}/docs/${user.uid}`);
-        if (!response.ok) {
-          const errorData = await response.json();
-          throw new Error(errorData.detail || 'Failed to fetch files.');
-        }
-
-        const data: GCSFile[] = await response.json();
-
-        // Map the raw API data to the MediaFile interface for the UI
-        const formattedFiles = data.map((file): MediaFile => {
-          const isImage = file.content_type.startsWith('image/');
-          
-          let formattedSize: string;
-          if (file.size < 1024) {
-            formattedSize = `${file.size} B`;
-          } else if (file.size < 1024 * 1024) {
-            formattedSize = `${(file.size / 1024).toFixed(1)} KB`;
-          } else {
-            formattedSize = `${(file.size / (1024 * 1024)).toFixed(1)} MB`;
-          }
-
-          return {
-            id: file.access_url, // The signed URL is unique enough for a key
-            name: file.filename,
-            type: isImage ? 'image' : 'document',
-            size: formattedSize,
-            uploadDate: new Date(file.last_modified),
-            access_url: file.access_url,
-            category: 'user-input',
-          };
-        });
-
-        setFiles(formattedFiles);
+        const page = await fetchPage(user.uid, null);
+        setFiles(page.files);
+        setNextPageToken(page.next);
       } catch (err: any) {
         setError(err.message || 'An unexpected error occurred.');
         console.error("Fetch error:", err);
@@ -93,6 +101,21 @@ const MediaGallery: React.FC = () => {
     fetchFiles();
   }, [user]);
 
+  const loadMore = async () => {
+    if (!user || !nextPageToken) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage(user.uid, nextPageToken);
+      setFiles(prev => [...prev, ...page.files]);
+      setNextPageToken(page.next);
+    } catch (err: any) {
+      setError(err.message || 'An unexpected error occurred.');
+      console.error("Fetch error:", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const filteredFiles = useMemo(() => {
     return files
       .filter(file => file.name.toLowerCase().includes(searchTerm.toLowerCase()))
@@ -273,6 +296,20 @@ const MediaGallery: React.FC = () => {
               ))}
             </motion.div>
 
+            {nextPageToken && (
+              <div className="flex justify-center mt-8">
+                <motion.button
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                  className="flex items-center px-6 py-3 space-x-2 text-sm font-medium text-blue-600 rounded-xl bg-blue-50 dark:bg-blue-900/20 hover:bg-blue-100 dark:hover:bg-blue-900/30 disabled:opacity-50"
+                  whileHover={{ scale: 1.05 }}
+                >
+                  {isLoadingMore && <Loader className="w-4 h-4 animate-spin" />}
+                  <span>{isLoadingMore ? 'Loading...' : 'Load more'}</span>
+                </motion.button>
+              </div>
+            )}
+
             {filteredFiles.length === 0 && !isLoading && (
               <motion.div 
                 className="py-16 text-center"